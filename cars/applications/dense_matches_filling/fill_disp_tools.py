@@ -36,7 +36,7 @@ from typing import Dict, Tuple
 import matplotlib.pyplot as plt
 import numpy as np
 import xarray as xr
-from numba import njit
+from numba import njit, prange
 from rasterio.fill import fillnodata
 from scipy.linalg import lstsq
 from scipy.ndimage import (
@@ -47,8 +47,10 @@ from scipy.ndimage import (
     measurements,
     median_filter,
 )
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from scipy.spatial.distance import cdist
-from shapely import affinity
+from shapely import STRtree, affinity, unary_union
 from skimage.segmentation import find_boundaries
 
 # Cars import
@@ -440,7 +442,7 @@ def make_raster_interpolation(
     return interpol_raster
 
 
-@njit()
+@njit(parallel=True)
 def fill_disp_pandora(
     disp: np.ndarray, msk_fill_disp: np.ndarray, nb_directions: int
 ):
@@ -509,11 +511,14 @@ def fill_disp_pandora(
                 [0.5, 1.0],
             ]
         )
-    for col in range(ncol):
+    # Neighbors are read in the input maps only: lines are independent
+    for col in prange(ncol):  # pylint: disable=not-an-iterable
+        # Neighbors buffer, reused for all the pixels of the line
+        valid_neighbors = np.zeros(nb_directions, dtype=np.float32)
         for row in range(nrow):
             if msk_fill_disp[col, row]:
-                valid_neighbors = find_valid_neighbors(
-                    dirs, disp, msk_fill_disp, row, col, nb_directions
+                fill_valid_neighbors(
+                    dirs, disp, msk_fill_disp, row, col, valid_neighbors
                 )
                 # Median of the 8/16 pixels
                 out_disp[col, row] = np.nanmedian(valid_neighbors)
@@ -552,12 +557,43 @@ def find_valid_neighbors(
     :return: valid neighbors
     :rtype: 2D np.array
     """
+    valid_neighbors = np.zeros(nb_directions, dtype=np.float32)
+    fill_valid_neighbors(dirs, disp, valid, row, col, valid_neighbors)
+    return valid_neighbors
+
+
+@njit()
+def fill_valid_neighbors(
+    dirs: np.ndarray,
+    disp: np.ndarray,
+    valid: np.ndarray,
+    row: int,
+    col: int,
+    valid_neighbors: np.ndarray,
+):
+    """
+    Find valid neighbors along directions, in given buffer
+
+    :param dirs: directions
+    :type dirs: 2D np.array (row, col)
+    :param disp: disparity map
+    :type disp: 2D np.array (row, col)
+    :param valid: validity mask
+    :type valid: 2D np.array (row, col)
+    :param row: row current value
+    :type row: int
+    :param col: col current value
+    :type col: int
+    :param valid_neighbors: buffer of valid neighbors, one per direction,
+        overwritten
+    :type valid_neighbors: 1D np.array
+    """
     ncol, nrow = disp.shape
     # Maximum path length
     max_path_length = max(nrow, ncol)
     # For each directions
-    valid_neighbors = np.zeros(nb_directions, dtype=np.float32)
-    for direction in range(nb_directions):
+    for direction in range(valid_neighbors.shape[0]):
+        valid_neighbors[direction] = 0
         # Find the first valid pixel in the current path
         for i in range(1, max_path_length):
             tmp_row = row + int(dirs[direction][0] * i)
@@ -578,7 +614,6 @@ def find_valid_neighbors(
             if not valid[tmp_col, tmp_row]:
                 valid_neighbors[direction] = disp[tmp_col, tmp_row]
                 break
-    return valid_neighbors
 
 
 def estimate_poly_with_disp(poly, dmin=0, dmax=0):
@@ -605,7 +640,7 @@ def estimate_poly_with_disp(poly, dmin=0, dmax=0):
     return poly
 
 
-def get_corresponding_holes(tile_poly, holes_poly_list):
+def get_corresponding_holes(tile_poly, holes_poly_list, holes_tree=None):
     """
     Get list of holes situated in tile
 
@@ -613,54 +648,66 @@ def get_corresponding_holes(tile_poly, holes_poly_list):
     :type tile_poly: Polygon
     :param holes_poly_list: envelop of holes
     :type holes_poly_list: list(Polygon)
+    :param holes_tree: spatial index of holes_poly_list, built if None
+    :type holes_tree: STRtree
 
 
     :return: list of holes envelops
     :rtype: list(Polygon)
 
     """
+    if holes_tree is None:
+        holes_tree = STRtree(holes_poly_list)
 
-    corresponding_holes = []
-    for poly in holes_poly_list:
-        if tile_poly.intersects(poly):
-            corresponding_holes.append(poly)
+    corresponding_holes_ids = holes_tree.query(
+        tile_poly, predicate="intersects"
+    )
 
-    return corresponding_holes
+    # keep holes order
+    return [holes_poly_list[pos] for pos in np.sort(corresponding_holes_ids)]
 
 
-def get_corresponding_tiles(tiles_polygones, corresponding_holes, epi_disp_map):
+def get_corresponding_tiles(
+    tiles_polygones, corresponding_holes, epi_disp_map, tiles_tree=None
+):
     """
     Get list of tiles intersecting with holes
 
     :param tiles_polygones: envelop of tiles
-    :type tiles_polygones: list(Polygon)
+    :type tiles_polygones: dict((row, col): Polygon)
     :param corresponding_holes: envelop of holes
     :type corresponding_holes: list(Polygon)
     :param epi_disp_map: disparity map cars dataset
     :type epi_disp_map: CarsDataset
+    :param tiles_tree: spatial index of tiles_polygones values,
+        built if None
+    :type tiles_tree: STRtree
 
 
     :return: list of tiles to use (window, overlap, xr.Dataset)
     :rtype: list(tuple)
 
     """
-    corresponding_tiles_row_col = []
-    corresponding_tiles = []
+    tiles_row_col = list(tiles_polygones.keys())
 
-    for key_tile, poly_tile in tiles_polygones.items():
-        for poly_hole in corresponding_holes:
-            if poly_tile.intersects(poly_hole):
-                if key_tile not in corresponding_tiles_row_col:
-                    corresponding_tiles_row_col.append(key_tile)
-
-    for row, col in corresponding_tiles_row_col:
-        corresponding_tiles.append(
-            (
-                epi_disp_map.tiling_grid[row, col],
-                epi_disp_map.overlaps[row, col],
-                epi_disp_map[row, col],
-            )
+    if tiles_tree is None:
+        tiles_tree = STRtree(list(tiles_polygones.values()))
+
+    corresponding_tiles = []
+    if len(corresponding_holes) > 0:
+        _, tiles_ids = tiles_tree.query(
+            np.array(corresponding_holes, dtype=object), predicate="intersects"
         )
+        # keep tiles order
+        for pos in np.unique(tiles_ids):
+            row, col = tiles_row_col[pos]
+            corresponding_tiles.append(
+                (
+                    epi_disp_map.tiling_grid[row, col],
+                    epi_disp_map.overlaps[row, col],
+                    epi_disp_map[row, col],
+                )
+            )
 
     return corresponding_tiles
 
@@ -692,7 +739,8 @@ def get_polygons_from_cars_ds(cars_ds):
 
 def merge_intersecting_polygones(list_poly):
     """
-    Merge polygons that intersects each other
+    Merge polygons that intersects each other, directly or through
+    other polygons
 
     :param list_poly: list of holes
     :type list_poly: list(Polygon)
@@ -702,31 +750,31 @@ def merge_intersecting_polygones(list_poly):
     :rtype: list(Polygon)
     """
 
-    new_list_poly = list_poly
-
-    merged_list = []
-
-    while len(new_list_poly) > 0:
-        current_poly = new_list_poly[0]
-
-        new_poly = current_poly
-        to_delete = [0]
+    if len(list_poly) == 0:
+        return []
 
-        for element_id in range(1, len(new_list_poly)):
-            if new_poly.intersects(new_list_poly[element_id]):
-                # Delete from list
-                to_delete.append(element_id)
-                # Merge with current
-                new_poly = new_poly.union(new_list_poly[element_id])
+    # graph of intersecting polygons
+    poly_array = np.array(list_poly, dtype=object)
+    first_ids, second_ids = STRtree(poly_array).query(
+        poly_array, predicate="intersects"
+    )
+    intersection_graph = coo_matrix(
+        (np.ones(first_ids.shape[0], dtype=bool), (first_ids, second_ids)),
+        shape=(len(list_poly), len(list_poly)),
+    )
+    _, labels = connected_components(intersection_graph, directed=False)
 
-        # Add new poly to merged list
-        merged_list.append(new_poly)
+    # group polygons by connected component, ordered by first polygon
+    sorted_ids = np.argsort(labels, kind="stable")
+    components = np.split(sorted_ids, np.cumsum(np.bincount(labels))[:-1])
+    components.sort(key=lambda component: component[0])
 
-        # Delete element
-        for _ in range(len(to_delete)):
-            # Start with last ones
-            pos = to_delete.pop()
-            new_list_poly.pop(pos)
+    merged_list = []
+    for component in components:
+        if component.shape[0] == 1:
+            merged_list.append(list_poly[component[0]])
+        else:
+            merged_list.append(unary_union(poly_array[component]))
 
     return merged_list
 
@@ -29,6 +29,7 @@ import logging
 
 # Third party imports
 from json_checker import Checker, Or
+from shapely import STRtree
 from shapely.geometry import Polygon
 
 # CARS imports
@@ -303,6 +304,10 @@ class PlaneFill(
                             ]
                         )
 
+                # Spatial indexes of holes and tiles
+                holes_tree = STRtree(merged_poly_list)
+                tiles_tree = STRtree(list(tiles_polygones.values()))
+
                 # Generate disparity maps
                 for col in range(epipolar_disparity_map.shape[1]):
                     for row in range(epipolar_disparity_map.shape[0]):
@@ -311,7 +316,9 @@ class PlaneFill(
                             # Get intersecting holes poly
                             corresponding_holes = (
                                 fd_tools.get_corresponding_holes(
-                                    tile_poly, merged_poly_list
+                                    tile_poly,
+                                    merged_poly_list,
+                                    holes_tree=holes_tree,
                                 )
                             )
 
@@ -322,6 +329,7 @@ class PlaneFill(
                                     tiles_polygones,
                                     corresponding_holes,
                                     epipolar_disparity_map,
+                                    tiles_tree=tiles_tree,
                                 )
                             )
 
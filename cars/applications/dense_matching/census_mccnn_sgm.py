@@ -56,6 +56,8 @@ class CensusMccnnSgm(
     Census SGM & MCCNN SGM matching class
     """
 
+    task_name = "compute_disparity"
+
     def __init__(self, conf=None):
         """
         Init function of DenseMatching
@@ -471,6 +473,11 @@ class CensusMccnnSgm(
                     * epipolar_disparity_map.shape[0]
                 )
             )
+            # Broadcast correlator configuration, shared by all tiles
+            corr_config = self.orchestrator.cluster.scatter(
+                self.corr_config, broadcast=True
+            )
+
             # Generate disparity maps
             for col in range(epipolar_disparity_map.shape[1]):
                 for row in range(epipolar_disparity_map.shape[0]):
@@ -487,7 +494,7 @@ class CensusMccnnSgm(
                         )(
                             epipolar_images_left[row, col],
                             epipolar_images_right[row, col],
-                            self.corr_config,
+                            corr_config,
                             disp_min=disp_min,
                             disp_max=disp_max,
                             saving_info=full_saving_info,
@@ -37,6 +37,8 @@ class DenseMatching(ApplicationTemplate, metaclass=ABCMeta):
 
     available_applications: Dict = {}
     default_application = "census_sgm"
+    # name of the function of tasks, used by cluster to measure its memory
+    task_name = None
 
     def __new__(cls, conf=None):  # pylint: disable=W0613
         """
@@ -24,7 +24,11 @@ This module is responsible for the dense matching algorithms:
 # pylint: disable=too-many-lines
 
 # Standard imports
+import json
 import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, List
 
 # Third party imports
@@ -44,6 +48,46 @@ from cars.applications.dense_matching import (
 from cars.core import constants as cst
 from cars.core import constants_disparity as cst_disp
 
+# Maximum number of pandora state machines kept by process
+PANDORA_MACHINES_SIZE = 4
+
+# Pandora state machines of each thread, indexed by pipeline and thread,
+# least recently used first
+PANDORA_MACHINES = OrderedDict()
+PANDORA_MACHINES_LOCK = threading.Lock()
+
+# Warning of transitions when a trigger is bound again to a machine
+TRANSITIONS_REBIND_MSG = (
+    "%sSkip binding of '%s' to model due to model override policy."
+)
+
+
+class ReboundTriggersFilter(logging.Filter):  # pylint: disable=R0903
+    """
+    Filter the warnings logged by transitions when the "may_" triggers
+    of a reused pandora state machine are bound again: pandora.run adds
+    the run transitions of the machine at each run
+    """
+
+    def filter(self, record):
+        """
+        Check if record is logged
+
+        :param record: log record
+        :type record: logging.LogRecord
+        :return: False for the warnings of rebound pandora triggers
+        :rtype: bool
+        """
+        return not (
+            record.msg == TRANSITIONS_REBIND_MSG
+            and isinstance(record.args, tuple)
+            and len(record.args) == 2
+            and str(record.args[1]).startswith("may_")
+        )
+
+
+REBOUND_TRIGGERS_FILTER = ReboundTriggersFilter()
+
 
 def get_margins(disp_min, disp_max, corr_cfg):
     """
@@ -457,29 +501,37 @@ def compute_disparity(
             )
 
     # Load pandora plugin
-    for entry_point in iter_entry_points(group="pandora.plugin"):
-        entry_point.load()
+    load_pandora_plugins()
 
     # Update nodata values
     left_dataset.attrs[cst.EPI_NO_DATA_IMG] = corr_cfg["input"]["nodata_left"]
     right_dataset.attrs[cst.EPI_NO_DATA_IMG] = corr_cfg["input"]["nodata_right"]
 
-    # Instantiate pandora state machine
-    pandora_machine = PandoraMachine()
+    # Get pandora state machine, reused between tiles
+    machine_key = get_pandora_machine_key(corr_cfg["pipeline"])
+    pandora_machine = get_pandora_machine(machine_key)
 
     # check datasets
     check_dataset(left_dataset)
     check_dataset(right_dataset)
 
     # Run the Pandora pipeline
-    ref, _ = pandora.run(
-        pandora_machine,
-        left_dataset,
-        right_dataset,
-        int(disp_min),
-        int(disp_max),
-        corr_cfg["pipeline"],
-    )
+    try:
+        ref, _ = pandora.run(
+            pandora_machine,
+            left_dataset,
+            right_dataset,
+            int(disp_min),
+            int(disp_max),
+            corr_cfg["pipeline"],
+        )
+    except Exception:
+        # machine state is unknown after a failure: it is not reused
+        with PANDORA_MACHINES_LOCK:
+            PANDORA_MACHINES.pop(machine_key, None)
+        raise
+    finally:
+        release_pandora_machine(pandora_machine)
 
     disp_dataset = create_disp_dataset(
         ref,
@@ -493,6 +545,86 @@ def compute_disparity(
     return disp_dataset
 
 
+@lru_cache(maxsize=None)
+def load_pandora_plugins():
+    """
+    Load pandora plugins, once per process
+
+    :return: names of loaded plugins
+    :rtype: tuple
+    """
+    plugins = []
+    for entry_point in iter_entry_points(group="pandora.plugin"):
+        entry_point.load()
+        plugins.append(entry_point.name)
+    return tuple(plugins)
+
+
+def get_pandora_machine_key(pipeline_cfg):
+    """
+    Get key of the pandora state machine used by current thread
+    to run pipeline
+
+    :param pipeline_cfg: pandora pipeline configuration
+    :type pipeline_cfg: dict
+    :return: pipeline representation and thread identifier
+    :rtype: tuple
+    """
+    return (
+        json.dumps(pipeline_cfg, sort_keys=True, default=str),
+        threading.get_ident(),
+    )
+
+
+def get_pandora_machine(machine_key):
+    """
+    Get pandora state machine, created on first call.
+    Machine returns to its initial state at the end of pandora.run,
+    and is reused for next tiles of the same thread:
+    a machine can't run several pipelines at the same time.
+    Only the PANDORA_MACHINES_SIZE last used machines are kept.
+    Once a machine is reused, the warnings of transitions about its
+    rebound triggers are filtered
+
+    :param machine_key: key given by get_pandora_machine_key
+    :type machine_key: tuple
+    :return: pandora state machine
+    :rtype: PandoraMachine
+    """
+    with PANDORA_MACHINES_LOCK:
+        if machine_key in PANDORA_MACHINES:
+            PANDORA_MACHINES.move_to_end(machine_key)
+            logging.getLogger("transitions.core").addFilter(
+                REBOUND_TRIGGERS_FILTER
+            )
+        else:
+            PANDORA_MACHINES[machine_key] = PandoraMachine()
+            while len(PANDORA_MACHINES) > PANDORA_MACHINES_SIZE:
+                PANDORA_MACHINES.popitem(last=False)
+        return PANDORA_MACHINES[machine_key]
+
+
+def release_pandora_machine(pandora_machine):
+    """
+    Remove references to images, cost volumes and disparity maps
+    of last run from pandora state machine, to free their memory
+
+    :param pandora_machine: pandora state machine
+    :type pandora_machine: PandoraMachine
+    """
+    for attribute in [
+        "img_left_pyramid",
+        "img_right_pyramid",
+        "left_img",
+        "right_img",
+        "left_cv",
+        "right_cv",
+        "left_disparity",
+        "right_disparity",
+    ]:
+        setattr(pandora_machine, attribute, None)
+
+
 def optimal_tile_size_pandora_plugin_libsgm(
     disp_min: int,
     disp_max: int,
@@ -75,6 +75,9 @@ class MappingToTerrainTiles(
         self.save_points_cloud_as_csv = self.used_config.get(
             "save_points_cloud_as_csv", False
         )
+        self.save_points_cloud_as_npy = self.used_config.get(
+            "save_points_cloud_as_npy", False
+        )
 
         # Init orchestrator
         self.orchestrator = None
@@ -109,11 +112,15 @@ class MappingToTerrainTiles(
         overloaded_conf["save_points_cloud_as_csv"] = conf.get(
             "save_points_cloud_as_csv", False
         )
+        overloaded_conf["save_points_cloud_as_npy"] = conf.get(
+            "save_points_cloud_as_npy", False
+        )
 
         points_cloud_fusion_schema = {
             "method": str,
             "save_points_cloud_as_laz": bool,
             "save_points_cloud_as_csv": bool,
+            "save_points_cloud_as_npy": bool,
         }
 
         # Check conf
@@ -305,7 +312,11 @@ class MappingToTerrainTiles(
 
             # Save objects
 
-            if self.save_points_cloud_as_csv or self.save_points_cloud_as_laz:
+            if (
+                self.save_points_cloud_as_csv
+                or self.save_points_cloud_as_laz
+                or self.save_points_cloud_as_npy
+            ):
                 # Points cloud file name
                 # TODO in input conf file
                 pc_file_name = os.path.join(
@@ -391,6 +402,7 @@ class MappingToTerrainTiles(
                             margins=margins,
                             save_pc_as_laz=self.save_points_cloud_as_laz,
                             save_pc_as_csv=self.save_points_cloud_as_csv,
+                            save_pc_as_npy=self.save_points_cloud_as_npy,
                             saving_info=full_saving_info,
                         )
 
@@ -449,6 +461,7 @@ def compute_point_cloud_wrapper(
     margins: float = 0,
     save_pc_as_laz: bool = False,
     save_pc_as_csv: bool = False,
+    save_pc_as_npy: bool = False,
     saving_info=None,
 ):
     """
@@ -480,6 +493,8 @@ def compute_point_cloud_wrapper(
     :type save_pc_as_laz: bool
     :param save_pc_as_csv: save point cloud as csv
     :type save_pc_as_csv: bool
+    :param save_pc_as_npy: save point cloud as npy
+    :type save_pc_as_npy: bool
     :param saving_info: informations about CarsDataset ID.
     :type saving_info: dict
 
@@ -548,6 +563,7 @@ def compute_point_cloud_wrapper(
         "color_type": color_type,
         "save_points_cloud_as_laz": save_pc_as_laz,
         "save_points_cloud_as_csv": save_pc_as_csv,
+        "save_points_cloud_as_npy": save_pc_as_npy,
     }
     cars_dataset.fill_dataframe(
         pc_pandas, saving_info=saving_info, attributes=attributes
@@ -781,6 +781,11 @@ def get_tiles_corresponding_tiles_tif(
         list_corresp_cars_ds, cars_ds_name="epi_pc_corresp"
     )
 
+    # Broadcast terrain tiling grid, shared by all point clouds
+    terrain_tiling_grid_future = cars_orchestrator.cluster.scatter(
+        terrain_tiling_grid, broadcast=True
+    )
+
     for row_fake_cars_ds in range(list_corresp_cars_ds.shape[0]):
         # Update saving info for row and col
         full_saving_info_pc = ocht.update_saving_infos(
@@ -796,7 +801,7 @@ def get_tiles_corresponding_tiles_tif(
             compute_correspondance_single_pc_terrain, nout=1
         )(
             list_epipolar_points_cloud_with_loc[row_fake_cars_ds],
-            terrain_tiling_grid,
+            terrain_tiling_grid_future,
             margins=margins,
             saving_info=full_saving_info_pc,
         )
@@ -932,89 +932,3 @@ def filter_cloud(
     cloud = cloud.drop(index=cloud.index.values[index_elt_to_remove])
 
     return cloud, removed_elt_pos_infos
-
-
-def add_cloud_filtering_msk(
-    clouds_list: List[xr.Dataset],
-    elt_pos_infos: pandas.DataFrame,
-    mask_label: str,
-    mask_value: int = 255,
-):
-    """
-    Add a uint16 mask labeled 'mask_label' to the clouds in clouds_list.
-    (in-line function)
-
-    TODO only used in tests
-
-    :param clouds_list: Input list of clouds
-    :param elt_pos_infos: pandas dataframe
-        composed of cst.POINTS_CLOUD_COORD_EPI_GEOM_I,
-        cst.POINTS_CLOUD_COORD_EPI_GEOM_J, cst.POINTS_CLOUD_IDX_IM_EPI columns
-        as computed in the create_combined_cloud function.
-        Those information are used to retrieve the point position
-        in its original epipolar image.
-    :param mask_label: label to give to the mask in the datasets
-    :param mask_value: filtered elements value in the mask
-    """
-
-    # Verify that the elt_pos_infos is consistent
-    if (
-        elt_pos_infos is None
-        or cst.POINTS_CLOUD_COORD_EPI_GEOM_I not in elt_pos_infos.columns
-        or cst.POINTS_CLOUD_COORD_EPI_GEOM_J not in elt_pos_infos.columns
-        or cst.POINTS_CLOUD_IDX_IM_EPI not in elt_pos_infos.columns
-    ):
-        logging.warning(
-            "Cannot generate filtered elements mask, "
-            "no information about the point's"
-            " original position in the epipolar image is given"
-        )
-
-    else:
-        elt_index = elt_pos_infos.loc[:, cst.POINTS_CLOUD_IDX_IM_EPI].to_numpy()
-
-        min_elt_index = np.min(elt_index)
-        max_elt_index = np.max(elt_index)
-
-        if min_elt_index < 0 or max_elt_index > len(clouds_list) - 1:
-            raise RuntimeError(
-                "Index indicated in the elt_pos_infos pandas. "
-                "DataFrame is not coherent with the clouds list given in input"
-            )
-
-        # create and add mask to each element of clouds_list
-        for cloud_idx, cloud_item in enumerate(clouds_list):
-            if mask_label not in cloud_item:
-                nb_row = cloud_item.coords[cst.ROW].data.shape[0]
-                nb_col = cloud_item.coords[cst.COL].data.shape[0]
-                msk = np.zeros((nb_row, nb_col), dtype=np.uint16)
-            else:
-                msk = cloud_item[mask_label].values
-
-            cur_elt_index = np.argwhere(elt_index == cloud_idx)
-
-            for elt_pos in range(cur_elt_index.shape[0]):
-                i = int(
-                    elt_pos_infos.loc[
-                        cur_elt_index[elt_pos],
-                        cst.POINTS_CLOUD_COORD_EPI_GEOM_I,
-                    ].iat[0]
-                )
-                j = int(
-                    elt_pos_infos.loc[
-                        cur_elt_index[elt_pos],
-                        cst.POINTS_CLOUD_COORD_EPI_GEOM_J,
-                    ].iat[0]
-                )
-
-                try:
-                    msk[i, j] = mask_value
-                except Exception as index_error:
-                    raise RuntimeError(
-                        "Point at location ({},{}) is not accessible "
-                        "in an image of size ({},{})".format(
-                            i, j, msk.shape[0], msk.shape[1]
-                        )
-                    ) from index_error
-
-            cloud_item[mask_label] = ([cst.ROW, cst.COL], msk)
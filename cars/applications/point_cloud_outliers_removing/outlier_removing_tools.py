@@ -30,11 +30,17 @@ from typing import List, Tuple, Union
 import numpy as np
 import pandas
 import xarray as xr
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from scipy.spatial import cKDTree  # pylint: disable=no-name-in-module
 
 # CARS imports
 from cars.core import constants as cst
 
+# Number of points queried at once in statistical filtering:
+# the k neighbors distances and indexes use (k + 1) * 16 bytes per point
+STATISTICAL_QUERY_CHUNK_SIZE = 100000
+
 # ##### Small components filtering ######
 
 
@@ -44,6 +50,7 @@ def small_components_filtering(
     nb_pts_threshold: int,
     clusters_distance_threshold: float = None,
     filtered_elt_pos: bool = False,
+    workers: int = 1,
 ) -> Tuple[pandas.DataFrame, Union[None, pandas.DataFrame]]:
     """
     Filter points cloud to remove small clusters of points
@@ -61,12 +68,18 @@ def small_components_filtering(
     :param filtered_elt_pos: if filtered_elt_pos is set to True,
         the removed points positions in their original
         epipolar images are returned, otherwise it is set to None
+    :param workers: number of threads used by the tree queries
+        (-1 to use all the available cores)
     :return: Tuple made of the filtered cloud and
         the removed elements positions in their epipolar images
     """
     cloud_xyz = cloud.loc[:, [cst.X, cst.Y, cst.Z]].values
     index_elt_to_remove = detect_small_components(
-        cloud_xyz, connection_val, nb_pts_threshold, clusters_distance_threshold
+        cloud_xyz,
+        connection_val,
+        nb_pts_threshold,
+        clusters_distance_threshold,
+        workers=workers,
     )
 
     return filter_cloud(cloud, index_elt_to_remove, filtered_elt_pos)
@@ -77,6 +90,7 @@ def detect_small_components(
     connection_val: float,
     nb_pts_threshold: int,
     clusters_distance_threshold: float = None,
+    workers: int = 1,
 ) -> List[int]:
     """
     Determine the indexes of the points of cloud_xyz to filter.
@@ -98,78 +112,66 @@ def detect_small_components(
     :param clusters_distance_threshold: distance to use
         to consider if two points clusters are far from each other or not
         (set to None to deactivate this level of filtering)
+    :param workers: number of threads used by the tree queries
+        (-1 to use all the available cores)
     :return: list of the points to filter indexes
     """
-    cloud_tree = cKDTree(cloud_xyz)
-
-    # extract connected components
-    processed = [False] * len(cloud_xyz)
-    connected_components = []
-    for idx, xyz_point in enumerate(cloud_xyz):
-        # if point has already been added to a cluster
-        if processed[idx]:
-            continue
-
-        # get point neighbors
-        neighbors_list = cloud_tree.query_ball_point(xyz_point, connection_val)
-
-        # add them to the current cluster
-        seed = []
-        seed.extend(neighbors_list)
-        for neigh_idx in neighbors_list:
-            processed[neigh_idx] = True
-
-        # iteratively add all the neighbors of the points
-        # which were added to the current cluster (if there are some)
-        while len(neighbors_list) != 0:
-            all_neighbors = cloud_tree.query_ball_point(
-                cloud_xyz[neighbors_list], connection_val
-            )
+    if cloud_xyz.shape[0] == 0:
+        return []
 
-            # flatten neighbors
-            new_neighbors = []
-            for neighbor_item in all_neighbors:
-                new_neighbors.extend(neighbor_item)
-
-            # retrieve only new neighbors
-            neighbors_list = list(set(new_neighbors) - set(seed))
-
-            # add them to the current cluster
-            seed.extend(neighbors_list)
-            for neigh_idx in neighbors_list:
-                processed[neigh_idx] = True
+    cloud_tree = cKDTree(cloud_xyz)
 
-        connected_components.append(seed)
+    # extract connected components from the graph of connected points
+    connected_pairs = cloud_tree.query_pairs(
+        connection_val, output_type="ndarray"
+    )
+    connection_graph = coo_matrix(
+        (
+            np.ones(connected_pairs.shape[0], dtype=bool),
+            (connected_pairs[:, 0], connected_pairs[:, 1]),
+        ),
+        shape=(cloud_xyz.shape[0], cloud_xyz.shape[0]),
+    )
+    _, cluster_labels = connected_components(connection_graph, directed=False)
 
     # determine clusters to remove
-    cluster_to_remove = []
-    for _, connected_components_item in enumerate(connected_components):
-        if len(connected_components_item) < nb_pts_threshold:
-            if clusters_distance_threshold is not None:
-                # search if the current cluster has any neighbors
-                # in the clusters_distance_threshold radius
-                all_neighbors = cloud_tree.query_ball_point(
-                    cloud_xyz[connected_components_item],
-                    clusters_distance_threshold,
-                )
-
-                # flatten neighbors
-                new_neighbors = []
-                for neighbor_item in all_neighbors:
-                    new_neighbors.extend(neighbor_item)
+    clusters_size = np.bincount(cluster_labels)
+    small_clusters_points = np.flatnonzero(
+        clusters_size[cluster_labels] < nb_pts_threshold
+    )
 
-                # retrieve only new neighbors
-                neighbors_list = list(
-                    set(new_neighbors) - set(connected_components_item)
-                )
+    if clusters_distance_threshold is not None and small_clusters_points.size:
+        # search if the small clusters have any neighbors
+        # of another cluster in the clusters_distance_threshold radius
+        points_labels = cluster_labels[small_clusters_points]
+        nb_neighbors = cloud_tree.query_ball_point(
+            cloud_xyz[small_clusters_points],
+            clusters_distance_threshold,
+            return_length=True,
+            workers=workers,
+        )
+        # more neighbors than cluster points: other clusters are close
+        has_neighbors = nb_neighbors > clusters_size[points_labels]
+
+        # check the other points with neighbors distance matrix
+        undecided = np.flatnonzero(~has_neighbors)
+        neighbors = cKDTree(
+            cloud_xyz[small_clusters_points[undecided]]
+        ).sparse_distance_matrix(
+            cloud_tree, clusters_distance_threshold, output_type="ndarray"
+        )
+        other_cluster = (
+            points_labels[undecided[neighbors["i"]]]
+            != cluster_labels[neighbors["j"]]
+        )
+        has_neighbors[undecided[neighbors["i"][other_cluster]]] = True
 
-                # if there are no new neighbors, the cluster will be removed
-                if len(neighbors_list) == 0:
-                    cluster_to_remove.extend(connected_components_item)
-            else:
-                cluster_to_remove.extend(connected_components_item)
+        # if there are no new neighbors, the cluster will be removed
+        small_clusters_points = small_clusters_points[
+            ~np.isin(points_labels, np.unique(points_labels[has_neighbors]))
+        ]
 
-    return cluster_to_remove
+    return small_clusters_points.tolist()
 
 
 # ##### statistical filtering ######
@@ -180,6 +182,7 @@ def statistical_outliers_filtering(
     k: int,
     std_factor: float,
     filtered_elt_pos: bool = False,
+    workers: int = 1,
 ) -> Tuple[pandas.DataFrame, Union[None, pandas.DataFrame]]:
     """
     Filter points cloud to remove statistical outliers
@@ -193,17 +196,25 @@ def statistical_outliers_filtering(
     :param filtered_elt_pos: if filtered_elt_pos is set to True,
         the removed points positions in their original
         epipolar images are returned, otherwise it is set to None
+    :param workers: number of threads used by the tree queries
+        (-1 to use all the available cores)
     :return: Tuple made of the filtered cloud and
         the removed elements positions in their epipolar images
     """
     cloud_xyz = cloud.loc[:, [cst.X, cst.Y, cst.Z]].values
-    index_elt_to_remove = detect_statistical_outliers(cloud_xyz, k, std_factor)
+    index_elt_to_remove = detect_statistical_outliers(
+        cloud_xyz, k, std_factor, workers=workers
+    )
 
     return filter_cloud(cloud, index_elt_to_remove, filtered_elt_pos)
 
 
 def detect_statistical_outliers(
-    cloud_xyz: np.ndarray, k: int, std_factor: float = 3.0
+    cloud_xyz: np.ndarray,
+    k: int,
+    std_factor: float = 3.0,
+    workers: int = 1,
+    chunk_size: int = STATISTICAL_QUERY_CHUNK_SIZE,
 ) -> List[int]:
     """
     Determine the indexes of the points of cloud_xyz to filter.
@@ -220,16 +231,28 @@ def detect_statistical_outliers(
     :param k: number of neighbors
     :param std_factor: multiplication factor to use
         to compute the distance threshold
+    :param workers: number of threads used by the tree queries
+        (-1 to use all the available cores)
+    :param chunk_size: number of points queried at once, bounding the
+        memory used by the neighbors distances and indexes
     :return: list of the points to filter indexes
     """
-    # compute for each points, all the distances to their k neighbors
     cloud_tree = cKDTree(cloud_xyz)
-    neighbors_distances, _ = cloud_tree.query(cloud_xyz, k + 1)
 
-    # Compute the mean of those distances for each point
-    # Mean is not used directly as each line
-    #           contained the distance value to the point itself
-    mean_neighbors_distances = np.sum(neighbors_distances, axis=1)
+    mean_neighbors_distances = np.empty(cloud_xyz.shape[0])
+    for start in range(0, cloud_xyz.shape[0], chunk_size):
+        end = min(start + chunk_size, cloud_xyz.shape[0])
+        # compute for each points, all the distances to their k neighbors
+        neighbors_distances, _ = cloud_tree.query(
+            cloud_xyz[start:end], k + 1, workers=workers
+        )
+
+        # Compute the mean of those distances for each point
+        # Mean is not used directly as each line
+        #           contained the distance value to the point itself
+        mean_neighbors_distances[start:end] = np.sum(
+            neighbors_distances, axis=1
+        )
     mean_neighbors_distances /= k
 
     # compute mean and standard deviation of those mean distances
@@ -362,8 +385,29 @@ def add_cloud_filtering_msk(
                 "DataFrame is not coherent with the clouds list given in input"
             )
 
+        coord_i = (
+            elt_pos_infos.loc[:, cst.POINTS_CLOUD_COORD_EPI_GEOM_I]
+            .to_numpy()
+            .astype(int)
+        )
+        coord_j = (
+            elt_pos_infos.loc[:, cst.POINTS_CLOUD_COORD_EPI_GEOM_J]
+            .to_numpy()
+            .astype(int)
+        )
+
+        # group the elements positions by cloud index
+        elt_index = elt_index.astype(int)
+        sorted_elt_pos = np.argsort(elt_index, kind="stable")
+        clouds_elt_pos = np.split(
+            sorted_elt_pos,
+            np.cumsum(np.bincount(elt_index, minlength=len(clouds_list)))[:-1],
+        )
+
         # create and add mask to each element of clouds_list
-        for cloud_idx, cloud_item in enumerate(clouds_list):
+        for cloud_item, cur_elt_pos in zip(  # noqa: B905
+            clouds_list, clouds_elt_pos
+        ):
             if mask_label not in cloud_item:
                 nb_row = cloud_item.coords[cst.ROW].data.shape[0]
                 nb_col = cloud_item.coords[cst.COL].data.shape[0]
@@ -371,30 +415,27 @@ def add_cloud_filtering_msk(
             else:
                 msk = cloud_item[mask_label].values
 
-            cur_elt_index = np.argwhere(elt_index == cloud_idx)
-
-            for elt_pos in range(cur_elt_index.shape[0]):
-                i = int(
-                    elt_pos_infos.loc[
-                        cur_elt_index[elt_pos],
-                        cst.POINTS_CLOUD_COORD_EPI_GEOM_I,
-                    ].iat[0]
+            cur_i = coord_i[cur_elt_pos]
+            cur_j = coord_j[cur_elt_pos]
+            try:
+                msk[cur_i, cur_j] = mask_value
+            except IndexError as index_error:
+                # report the first point out of the image
+                out_of_image = (
+                    (cur_i >= msk.shape[0])
+                    | (cur_i < -msk.shape[0])
+                    | (cur_j >= msk.shape[1])
+                    | (cur_j < -msk.shape[1])
                 )
-                j = int(
-                    elt_pos_infos.loc[
-                        cur_elt_index[elt_pos],
-                        cst.POINTS_CLOUD_COORD_EPI_GEOM_J,
-                    ].iat[0]
-                )
-
-                try:
-                    msk[i, j] = mask_value
-                except Exception as index_error:
-                    raise RuntimeError(
-                        "Point at location ({},{}) is not accessible "
-                        "in an image of size ({},{})".format(
-                            i, j, msk.shape[0], msk.shape[1]
-                        )
-                    ) from index_error
+                first_out = np.flatnonzero(out_of_image)[0]
+                raise RuntimeError(
+                    "Point at location ({},{}) is not accessible "
+                    "in an image of size ({},{})".format(
+                        cur_i[first_out],
+                        cur_j[first_out],
+                        msk.shape[0],
+                        msk.shape[1],
+                    )
+                ) from index_error
 
             cloud_item[mask_label] = ([cst.ROW, cst.COL], msk)
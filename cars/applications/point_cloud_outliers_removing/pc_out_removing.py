@@ -144,6 +144,7 @@ class PointCloudOutliersRemoving(ApplicationTemplate, metaclass=ABCMeta):
         merged_points_cloud,
         save_points_cloud_as_laz,
         save_points_cloud_as_csv,
+        save_points_cloud_as_npy,
         app_name=None,
     ):
         """
@@ -155,6 +156,8 @@ class PointCloudOutliersRemoving(ApplicationTemplate, metaclass=ABCMeta):
         :type save_points_cloud_as_laz: bool
         :param save_points_cloud_as_csv: true if save as csv
         :type save_points_cloud_as_csv: bool
+        :param save_points_cloud_as_npy: true if save as npy
+        :type save_points_cloud_as_npy: bool
         :param app_name: application name for file names
         :type app_name: str
 
@@ -174,7 +177,11 @@ class PointCloudOutliersRemoving(ApplicationTemplate, metaclass=ABCMeta):
         filtered_point_cloud.attributes = merged_points_cloud.attributes.copy()
 
         # Save objects
-        if save_points_cloud_as_laz or save_points_cloud_as_csv:
+        if (
+            save_points_cloud_as_laz
+            or save_points_cloud_as_csv
+            or save_points_cloud_as_npy
+        ):
             # Points cloud file name
             # TODO in input conf file
             pc_file_name = os.path.join(
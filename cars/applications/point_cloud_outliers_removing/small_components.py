@@ -80,6 +80,7 @@ class SmallComponents(
         self.clusters_distance_threshold = self.used_config[
             "clusters_distance_threshold"
         ]
+        self.workers = self.used_config["workers"]
 
         # check loader
 
@@ -90,6 +91,9 @@ class SmallComponents(
         self.save_points_cloud_as_csv = self.used_config.get(
             "save_points_cloud_as_csv", False
         )
+        self.save_points_cloud_as_npy = self.used_config.get(
+            "save_points_cloud_as_npy", False
+        )
 
         # Init orchestrator
         self.orchestrator = None
@@ -121,6 +125,9 @@ class SmallComponents(
         overloaded_conf["save_points_cloud_as_csv"] = conf.get(
             "save_points_cloud_as_csv", False
         )
+        overloaded_conf["save_points_cloud_as_npy"] = conf.get(
+            "save_points_cloud_as_npy", False
+        )
 
         # small components
         overloaded_conf["activated"] = conf.get(
@@ -152,16 +159,21 @@ class SmallComponents(
         overloaded_conf["clusters_distance_threshold"] = conf.get(
             "clusters_distance_threshold", None
         )
+        # workers: number of threads used by the tree queries
+        #           (-1 = all the available cores)
+        overloaded_conf["workers"] = conf.get("workers", 1)
 
         points_cloud_fusion_schema = {
             "method": str,
             "save_points_cloud_as_laz": bool,
             "save_points_cloud_as_csv": bool,
+            "save_points_cloud_as_npy": bool,
             "activated": bool,
             "on_ground_margin": int,
             "connection_distance": And(float, lambda x: x > 0),
             "nb_points_threshold": And(int, lambda x: x > 0),
             "clusters_distance_threshold": Or(None, float),
+            "workers": And(int, lambda x: x > 0 or x == -1),
         }
 
         # Check conf
@@ -294,6 +306,7 @@ class SmallComponents(
                 merged_points_cloud,
                 self.save_points_cloud_as_laz,
                 self.save_points_cloud_as_csv,
+                self.save_points_cloud_as_npy,
                 app_name="small_components",
             )
 
@@ -328,8 +341,10 @@ class SmallComponents(
                             self.connection_distance,
                             self.nb_points_threshold,
                             self.clusters_distance_threshold,
+                            self.workers,
                             self.save_points_cloud_as_laz,
                             self.save_points_cloud_as_csv,
+                            self.save_points_cloud_as_npy,
                             saving_info=full_saving_info,
                         )
 
@@ -348,8 +363,10 @@ def small_components_removing_wrapper(
     connection_distance,
     nb_points_threshold,
     clusters_distance_threshold,
+    workers,
     save_points_cloud_as_laz,
     save_points_cloud_as_csv,
+    save_points_cloud_as_npy,
     saving_info=None,
 ):
     """
@@ -363,10 +380,14 @@ def small_components_removing_wrapper(
     :type nb_points_threshold: int
     :param clusters_distance_threshold:
     :type clusters_distance_threshold: float
+    :param workers: number of threads used by the tree queries
+    :type workers: int
     :param save_points_cloud_as_laz: activation of point cloud saving to laz
     :type save_points_cloud_as_laz: bool
     :param save_points_cloud_as_csv: activation of point cloud saving to csv
     :type save_points_cloud_as_csv: bool
+    :param save_points_cloud_as_npy: activation of point cloud saving to npy
+    :type save_points_cloud_as_npy: bool
     :param saving_info: saving infos
     :type saving_info: dict
 
@@ -411,6 +432,7 @@ def small_components_removing_wrapper(
         connection_distance,
         nb_points_threshold,
         clusters_distance_threshold,
+        workers=workers,
     )
     toc = time.process_time()
     logging.debug(
@@ -425,6 +447,7 @@ def small_components_removing_wrapper(
     cloud_attributes["epsg"] = current_epsg
     cloud_attributes["save_points_cloud_as_laz"] = save_points_cloud_as_laz
     cloud_attributes["save_points_cloud_as_csv"] = save_points_cloud_as_csv
+    cloud_attributes["save_points_cloud_as_npy"] = save_points_cloud_as_npy
     cars_dataset.fill_dataframe(
         new_cloud, saving_info=saving_info, attributes=cloud_attributes
     )
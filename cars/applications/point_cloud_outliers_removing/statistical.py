@@ -80,6 +80,7 @@ class Statistical(
         self.activated = self.used_config["activated"]
         self.k = self.used_config["k"]
         self.std_dev_factor = self.used_config["std_dev_factor"]
+        self.workers = self.used_config["workers"]
 
         # check loader
 
@@ -90,6 +91,9 @@ class Statistical(
         self.save_points_cloud_as_csv = self.used_config.get(
             "save_points_cloud_as_csv", False
         )
+        self.save_points_cloud_as_npy = self.used_config.get(
+            "save_points_cloud_as_npy", False
+        )
 
         # Init orchestrator
         self.orchestrator = None
@@ -121,6 +125,9 @@ class Statistical(
         overloaded_conf["save_points_cloud_as_csv"] = conf.get(
             "save_points_cloud_as_csv", False
         )
+        overloaded_conf["save_points_cloud_as_npy"] = conf.get(
+            "save_points_cloud_as_npy", False
+        )
 
         # statistical outlier filtering
         overloaded_conf["activated"] = conf.get(
@@ -131,14 +138,19 @@ class Statistical(
         overloaded_conf["k"] = conf.get("k", 50)
         # stdev_factor: factor to apply in the distance threshold computation
         overloaded_conf["std_dev_factor"] = conf.get("std_dev_factor", 5.0)
+        # workers: number of threads used by the tree queries
+        #           (-1 = all the available cores)
+        overloaded_conf["workers"] = conf.get("workers", 1)
 
         points_cloud_fusion_schema = {
             "method": str,
             "save_points_cloud_as_laz": bool,
             "save_points_cloud_as_csv": bool,
+            "save_points_cloud_as_npy": bool,
             "activated": bool,
             "k": And(int, lambda x: x > 0),
             "std_dev_factor": And(float, lambda x: x > 0),
+            "workers": And(int, lambda x: x > 0 or x == -1),
         }
 
         # Check conf
@@ -266,6 +278,7 @@ class Statistical(
                 merged_points_cloud,
                 self.save_points_cloud_as_laz,
                 self.save_points_cloud_as_csv,
+                self.save_points_cloud_as_npy,
                 app_name="statistical",
             )
 
@@ -305,8 +318,10 @@ class Statistical(
                             merged_points_cloud[row, col],
                             self.k,
                             self.std_dev_factor,
+                            self.workers,
                             self.save_points_cloud_as_laz,
                             self.save_points_cloud_as_csv,
+                            self.save_points_cloud_as_npy,
                             saving_info=full_saving_info,
                         )
 
@@ -324,8 +339,10 @@ def statistical_removing_wrapper(
     cloud,
     statistical_k,
     std_dev_factor,
+    workers,
     save_points_cloud_as_laz,
     save_points_cloud_as_csv,
+    save_points_cloud_as_npy,
     saving_info=None,
 ):
     """
@@ -337,10 +354,14 @@ def statistical_removing_wrapper(
     :type statistical_k: float
     :param std_dev_factor: std factor
     :type std_dev_factor: float
+    :param workers: number of threads used by the tree queries
+    :type workers: int
     :param save_points_cloud_as_laz: activation of point cloud saving to laz
     :type save_points_cloud_as_laz: bool
     :param save_points_cloud_as_csv: activation of point cloud saving to csv
     :type save_points_cloud_as_csv: bool
+    :param save_points_cloud_as_npy: activation of point cloud saving to npy
+    :type save_points_cloud_as_npy: bool
     :param saving_info: saving infos
     :type saving_info: dict
 
@@ -377,7 +398,7 @@ def statistical_removing_wrapper(
     # Filter point cloud
     tic = time.process_time()
     (new_cloud, _) = outlier_removing_tools.statistical_outliers_filtering(
-        new_cloud, statistical_k, std_dev_factor
+        new_cloud, statistical_k, std_dev_factor, workers=workers
     )
     toc = time.process_time()
     logging.debug(
@@ -392,6 +413,7 @@ def statistical_removing_wrapper(
     cloud_attributes["epsg"] = current_epsg
     cloud_attributes["save_points_cloud_as_laz"] = save_points_cloud_as_laz
     cloud_attributes["save_points_cloud_as_csv"] = save_points_cloud_as_csv
+    cloud_attributes["save_points_cloud_as_npy"] = save_points_cloud_as_npy
 
     cars_dataset.fill_dataframe(
         new_cloud, saving_info=saving_info, attributes=cloud_attributes
@@ -140,6 +140,7 @@ class PointCloudRasterization(ApplicationTemplate, metaclass=ABCMeta):
         orchestrator=None,
         dsm_file_name=None,
         color_file_name=None,
+        cog=False,
     ):
         """
         Run PointsCloudRasterisation application.
@@ -155,6 +156,8 @@ class PointCloudRasterization(ApplicationTemplate, metaclass=ABCMeta):
         :type dsm_file_name: str
         :param color_file_name: path of color
         :type color_file_name: str
+        :param cog: save rasters as Cloud Optimized GeoTIFF
+        :type cog: bool
 
         :return: raster DSM
         :rtype: CarsDataset filled with xr.Dataset
@@ -240,6 +240,7 @@ class SimpleGaussian(
         orchestrator=None,
         dsm_file_name=None,
         color_file_name=None,
+        cog=False,
     ):
         """
         Run PointsCloudRasterisation application.
@@ -266,6 +267,8 @@ class SimpleGaussian(
         :type dsm_file_name: str
         :param color_file_name: path of color
         :type color_file_name: str
+        :param cog: save rasters as Cloud Optimized GeoTIFF
+        :type cog: bool
 
         :return: raster DSM. CarsDataset contains:
 
@@ -338,6 +341,7 @@ class SimpleGaussian(
                     dtype=np.float32,
                     nodata=self.dsm_no_data,
                     cars_ds_name="dsm",
+                    cog=cog,
                 )
             if self.save_color:
                 if color_file_name is not None:
@@ -353,6 +357,7 @@ class SimpleGaussian(
                     dtype=self.color_dtype,
                     nodata=self.color_no_data,
                     cars_ds_name="color",
+                    cog=cog,
                 )
             if self.save_stats:
                 out_dsm_mean_file_name = os.path.join(
@@ -374,6 +379,7 @@ class SimpleGaussian(
                     dtype=np.float32,
                     nodata=self.dsm_no_data,
                     cars_ds_name="dsm_mean",
+                    cog=cog,
                 )
                 self.orchestrator.add_to_save_lists(
                     out_dsm_std_file_name,
@@ -382,6 +388,7 @@ class SimpleGaussian(
                     dtype=np.float32,
                     nodata=self.dsm_no_data,
                     cars_ds_name="dsm_std",
+                    cog=cog,
                 )
                 self.orchestrator.add_to_save_lists(
                     out_dsm_n_pts_file_name,
@@ -390,6 +397,7 @@ class SimpleGaussian(
                     dtype=np.uint16,
                     nodata=0,
                     cars_ds_name="dsm_n_pts",
+                    cog=cog,
                 )
                 self.orchestrator.add_to_save_lists(
                     out_dsm_points_in_cell_file_name,
@@ -398,6 +406,7 @@ class SimpleGaussian(
                     dtype=np.uint16,
                     nodata=0,
                     cars_ds_name="dsm_pts_in_cells",
+                    cog=cog,
                 )
             if self.save_classif:
                 out_classif_file_name = os.path.join(
@@ -410,6 +419,7 @@ class SimpleGaussian(
                     dtype=np.float32,
                     nodata=self.msk_no_data,
                     cars_ds_name="dsm_classif",
+                    cog=cog,
                 )
             if self.save_mask:
                 out_msk_file_name = os.path.join(
@@ -422,6 +432,7 @@ class SimpleGaussian(
                     dtype=np.uint16,
                     nodata=self.msk_no_data,
                     cars_ds_name="dsm_mask",
+                    cog=cog,
                 )
 
             if self.save_confidence:
@@ -435,6 +446,7 @@ class SimpleGaussian(
                     dtype=np.float32,
                     nodata=self.msk_no_data,
                     cars_ds_name="confidence",
+                    cog=cog,
                 )
 
             # Get saving infos in order to save tiles when they are computed
@@ -27,6 +27,8 @@ import logging
 
 # Standard imports
 import math
+import threading
+from functools import lru_cache
 
 # Third party imports
 import numpy as np
@@ -40,6 +42,11 @@ from cars.conf import mask_cst as msk_cst
 from cars.core import constants as cst
 from cars.core import datasets, inputs, tiling
 
+# Number of localization grid windows kept in memory by each process
+GRID_CACHE_SIZE = 32
+# Number of rasters kept open by each thread
+RASTER_CACHE_SIZE = 16
+
 
 def epipolar_rectify_images(
     img1,
@@ -103,15 +110,47 @@ def epipolar_rectify_images(
     right_margins[2] = right_region[2] - right_roi[2]
     right_margins[3] = right_region[3] - right_roi[3]
 
-    # Resample left image
-    left_dataset = resample_image(
-        img1,
+    # Resample left image, with color and classification
+    left_imgs = [img1]
+    left_bands_coords = [False]
+    left_interpolators = ["bicubic"]
+
+    if add_color:
+        # Build rectification pipeline for color image, and build datasets
+        if color1 is None:
+            color1 = img1
+
+        if inputs.rasterio_get_size(color1) != inputs.rasterio_get_size(img1):
+            raise RuntimeError(
+                "The image and the color "
+                "haven't the same sizes "
+                "{} != {}".format(
+                    inputs.rasterio_get_size(color1),
+                    inputs.rasterio_get_size(img1),
+                )
+            )
+        left_imgs.append(color1)
+        left_bands_coords.append(cst.BAND_IM)
+        left_interpolators.append("bicubic")
+
+    if classif1:
+        left_imgs.append(classif1)
+        left_bands_coords.append(cst.BAND_CLASSIF)
+        left_interpolators.append("nearest")
+
+    left_datasets = resample_images(
+        left_imgs,
         grid1,
         [epipolar_size_x, epipolar_size_y],
         region=left_region,
         nodata=nodata1,
         mask=mask1,
+        bands_coords=left_bands_coords,
+        interpolators=left_interpolators,
     )
+    left_dataset = left_datasets.pop(0)
+    left_color_dataset = left_datasets.pop(0) if add_color else None
+    left_classif_dataset = left_datasets.pop(0) if classif1 else None
 
     # Update attributes
     left_dataset.attrs[cst.ROI] = np.array(left_roi)
@@ -124,15 +163,28 @@ def epipolar_rectify_images(
     if "disp_max" in margins.attrs:
         left_dataset.attrs[cst.EPI_DISP_MAX] = margins.attrs["disp_max"]
 
-    # Resample right image
-    right_dataset = resample_image(
-        img2,
+    # Resample right image, with classification
+    right_imgs = [img2]
+    right_bands_coords = [False]
+    right_interpolators = ["bicubic"]
+
+    if classif2:
+        right_imgs.append(classif2)
+        right_bands_coords.append(cst.BAND_CLASSIF)
+        right_interpolators.append("nearest")
+
+    right_datasets = resample_images(
+        right_imgs,
         grid2,
         [epipolar_size_x, epipolar_size_y],
         region=right_region,
         nodata=nodata2,
         mask=mask2,
+        bands_coords=right_bands_coords,
+        interpolators=right_interpolators,
     )
+    right_dataset = right_datasets.pop(0)
+    right_classif_dataset = right_datasets.pop(0) if classif2 else None
 
     # Update attributes
     right_dataset.attrs[cst.ROI] = np.array(right_roi)
@@ -145,53 +197,6 @@ def epipolar_rectify_images(
     if "disp_max" in margins.attrs:
         right_dataset.attrs[cst.EPI_DISP_MAX] = margins.attrs["disp_max"]
 
-    left_color_dataset = None
-    if add_color:
-        # Build rectification pipeline for color image, and build datasets
-        if color1 is None:
-            color1 = img1
-
-        if inputs.rasterio_get_size(color1) == inputs.rasterio_get_size(img1):
-            left_color_dataset = resample_image(
-                color1,
-                grid1,
-                [epipolar_size_x, epipolar_size_y],
-                region=left_region,
-                band_coords=cst.BAND_IM,
-            )
-        else:
-            raise RuntimeError(
-                "The image and the color "
-                "haven't the same sizes "
-                "{} != {}".format(
-                    inputs.rasterio_get_size(color1),
-                    inputs.rasterio_get_size(img1),
-                )
-            )
-
-    # resample the mask images
-    left_classif_dataset = None
-    if classif1:
-        left_classif_dataset = resample_image(
-            classif1,
-            grid1,
-            [epipolar_size_x, epipolar_size_y],
-            region=left_region,
-            band_coords=cst.BAND_CLASSIF,
-            interpolator="nearest",
-        )
-
-    right_classif_dataset = None
-    if classif2:
-        right_classif_dataset = resample_image(
-            classif2,
-            grid2,
-            [epipolar_size_x, epipolar_size_y],
-            region=right_region,
-            band_coords=cst.BAND_CLASSIF,
-            interpolator="nearest",
-        )
-
     return (
         left_dataset,
         right_dataset,
@@ -201,6 +206,105 @@ def epipolar_rectify_images(
     )
 
 
+def open_raster(path):
+    """
+    Open raster in read mode, reusing the dataset already opened
+    by the current thread.
+    Returned dataset must not be closed.
+
+    :param path: path to raster
+    :type path: str
+    :return: opened raster
+    :rtype: rasterio.DatasetReader
+    """
+    return cached_open_raster(
+        path, inputs.get_modification_time(path), threading.get_ident()
+    )
+
+
+@lru_cache(maxsize=RASTER_CACHE_SIZE)
+def cached_open_raster(
+    path, modification_time, thread_id
+):  # pylint: disable=unused-argument
+    """
+    Open raster, cached by path, modification time and thread:
+    GDAL datasets can't be shared between threads
+
+    :param path: path to raster
+    :type path: str
+    :param modification_time: raster modification time
+    :type modification_time: int
+    :param thread_id: identifier of the thread using the raster
+    :type thread_id: int
+    :return: opened raster
+    :rtype: rasterio.DatasetReader
+    """
+    return rio.open(path)
+
+
+def read_localization_grid(grid, grid_region):
+    """
+    Read a window of a rectification grid, converted from deformations
+    to localizations in sensor geometry.
+    Returned grid is shared between calls, it must not be modified.
+
+    :param grid: path to the rectification grid
+    :type grid: str
+    :param grid_region: grid window [xmin, ymin, xmax, ymax], included
+    :type grid_region: list of four int
+    :return: localization grid
+    :rtype: numpy.ndarray
+    """
+    return cached_read_localization_grid(
+        grid, inputs.get_modification_time(grid), tuple(grid_region)
+    )
+
+
+@lru_cache(maxsize=GRID_CACHE_SIZE)
+def cached_read_localization_grid(
+    grid, modification_time, grid_region
+):  # pylint: disable=unused-argument
+    """
+    Read localization grid window, cached by path,
+    modification time and window
+
+    :param grid: path to the rectification grid
+    :type grid: str
+    :param modification_time: grid modification time
+    :type modification_time: int
+    :param grid_region: grid window [xmin, ymin, xmax, ymax], included
+    :type grid_region: tuple of four int
+    :return: read only localization grid
+    :rtype: numpy.ndarray
+    """
+    grid_reader = open_raster(grid)
+    oversampling = int(grid_reader.res[0])
+
+    grid_window = Window.from_slices(
+        (grid_region[1], grid_region[3] + 1),
+        (grid_region[0], grid_region[2] + 1),
+    )
+    grid_as_array = grid_reader.read(window=grid_window)
+    grid_as_array = grid_as_array.astype(np.float32)
+    grid_as_array = grid_as_array.astype(np.float64)
+
+    # deformation to localization
+    grid_as_array[0, ...] += np.arange(
+        oversampling * grid_region[0],
+        oversampling * (grid_region[2] + 1),
+        step=oversampling,
+    )
+    grid_as_array[1, ...] += np.arange(
+        oversampling * grid_region[1],
+        oversampling * (grid_region[3] + 1),
+        step=oversampling,
+    ).T[..., np.newaxis]
+
+    grid_as_array.setflags(write=False)
+
+    return grid_as_array
+
+
 def resample_image(
     img,
     grid,
@@ -233,6 +337,64 @@ def resample_image(
     :type interpolator: str ("nearest" "linear" "bco")
     :rtype: xarray.Dataset with resampled image and mask
     """
+    return resample_images(
+        [img],
+        grid,
+        largest_size,
+        region=region,
+        nodata=nodata,
+        mask=mask,
+        bands_coords=[band_coords],
+        interpolators=[interpolator],
+    )[0]
+
+
+def resample_images(
+    imgs,
+    grid,
+    largest_size,
+    region=None,
+    nodata=None,
+    mask=None,
+    bands_coords=None,
+    interpolators=None,
+):
+    """
+    Resample several images in the same sensor geometry,
+    according to grid and largest size.
+
+    The bands of images read in the same sensor window, with the same
+    interpolator, are stacked and resampled together, so that
+    the interpolation weights are computed once.
+
+    :param imgs: Paths to the images to resample
+    :type imgs: list of string
+    :param grid: Path to the rectification grid
+    :type grid: string
+    :param largest_size: Size of full output image
+    :type largest_size: list of two int
+    :param region: A subset of the output image to produce
+    :type region: None (full output is produced) or array of four floats
+                  [xmin,ymin,xmax,ymax]
+    :param nodata: Nodata value to use for the first image
+        (both for input and output)
+    :type nodata: None or float
+    :param mask: Mask of the first image to resample as well
+    :type mask: None or path to mask image
+    :param bands_coords: Force bands coordinate in output datasets,
+        for each image (default False)
+    :type bands_coords: list of boolean or str
+    :param interpolators: interpolator type for each image
+        (default bicubic)
+    :type interpolators: list of str ("nearest" "linear" "bco")
+    :return: datasets with resampled images, and mask for the first one
+    :rtype: list of xarray.Dataset
+    """
+    if bands_coords is None:
+        bands_coords = [False] * len(imgs)
+    if interpolators is None:
+        interpolators = ["bicubic"] * len(imgs)
+
     # Handle region is None
     if region is None:
         region = [0, 0, largest_size[0], largest_size[1]]
@@ -248,141 +410,137 @@ def resample_image(
     largest_size = [int(x) for x in largest_size]
 
     # Build rectification pipelines for images
-    with rio.open(grid) as grid_reader:
-        res_x, res_y = grid_reader.res
-        assert res_x == res_y
-        oversampling = int(res_x)
-        assert res_x == oversampling
-
-        # convert resampled region to grid region with oversampling
-        grid_region = [
-            math.floor(region[0] / oversampling),
-            math.floor(region[1] / oversampling),
-            math.ceil(region[2] / oversampling),
-            math.ceil(region[3] / oversampling),
-        ]
-        grid_window = Window.from_slices(
-            (grid_region[1], grid_region[3] + 1),
-            (grid_region[0], grid_region[2] + 1),
+    res_x, res_y = open_raster(grid).res
+    assert res_x == res_y
+    oversampling = int(res_x)
+    assert res_x == oversampling
+
+    # convert resampled region to grid region with oversampling
+    grid_region = [
+        math.floor(region[0] / oversampling),
+        math.floor(region[1] / oversampling),
+        math.ceil(region[2] / oversampling),
+        math.ceil(region[3] / oversampling),
+    ]
+    grid_as_array = read_localization_grid(grid, grid_region)
+
+    # exact region in resampled grid region
+    out_region = oversampling * np.array(grid_region)
+    ext_region = region - out_region
+
+    # get needed source bounding box
+    left = math.floor(np.amin(grid_as_array[0, ...]))
+    right = math.ceil(np.amax(grid_as_array[0, ...]))
+    top = math.floor(np.amin(grid_as_array[1, ...]))
+    bottom = math.ceil(np.amax(grid_as_array[1, ...]))
+
+    # filter margin for bicubic = 2
+    filter_margin = 2
+    top -= filter_margin
+    bottom += filter_margin
+    left -= filter_margin
+    right += filter_margin
+
+    # extract src according to grid values,
+    # images read in the same window are resampled together
+    resampling_groups = {}
+    imgs_window = [None] * len(imgs)
+    imgs_as_array = [None] * len(imgs)
+    resamps = [None] * len(imgs)
+    for img_idx, img in enumerate(imgs):
+        img_window, x_offset, y_offset = get_sensor_window(
+            open_raster(img), left, right, top, bottom
         )
-        grid_as_array = grid_reader.read(window=grid_window)
-        grid_as_array = grid_as_array.astype(np.float32)
-        grid_as_array = grid_as_array.astype(np.float64)
-
-        # deformation to localization
-        grid_as_array[0, ...] += np.arange(
-            oversampling * grid_region[0],
-            oversampling * (grid_region[2] + 1),
-            step=oversampling,
-        )
-        grid_as_array[1, ...] += np.arange(
-            oversampling * grid_region[1],
-            oversampling * (grid_region[3] + 1),
-            step=oversampling,
-        ).T[..., np.newaxis]
-
-        # get needed source bounding box
-        left = math.floor(np.amin(grid_as_array[0, ...]))
-        right = math.ceil(np.amax(grid_as_array[0, ...]))
-        top = math.floor(np.amin(grid_as_array[1, ...]))
-        bottom = math.ceil(np.amax(grid_as_array[1, ...]))
-
-        # filter margin for bicubic = 2
-        filter_margin = 2
-        top -= filter_margin
-        bottom += filter_margin
-        left -= filter_margin
-        right += filter_margin
-
-    # extract src according to grid values
-    with rio.open(img) as img_reader:
-        transform = img_reader.transform
-        res_x = int(transform[0] / abs(transform[0]))
-        res_y = int(transform[4] / abs(transform[4]))
-
-        (full_left, full_bottom, full_right, full_top) = img_reader.bounds
-
-        left, right, top, bottom = (
-            res_x * left,
-            res_x * right,
-            res_y * top,
-            res_y * bottom,
-        )
-
-        full_bounds_window = from_bounds(
-            full_left, full_bottom, full_right, full_top, transform
+        imgs_window[img_idx] = img_window
+
+        if img_window is None:
+            resamps[img_idx] = np.zeros(
+                (
+                    open_raster(img).count,
+                    region[3] - region[1],
+                    region[2] - region[0],
+                )
+            )
+        else:
+            # Get sensor data
+            imgs_as_array[img_idx] = open_raster(img).read(window=img_window)
+            resampling_groups.setdefault(
+                (
+                    interpolators[img_idx],
+                    img_window.flatten(),
+                    x_offset,
+                    y_offset,
+                ),
+                [],
+            ).append(img_idx)
+
+    first_grid_as_array = None
+    for (
+        interpolator,
+        _,
+        x_offset,
+        y_offset,
+    ), group_idx in resampling_groups.items():
+        # shift grid regarding the img extraction, cached grid is kept
+        shifted_grid_as_array = (
+            grid_as_array
+            - np.array([x_offset, y_offset])[:, np.newaxis, np.newaxis]
         )
-        img_window = from_bounds(left, bottom, right, top, transform)
-        # Crop window to be in image
-        in_sensor = True
-        try:
-            img_window = img_window.intersection(full_bounds_window)
-        except rio.errors.WindowError:
-            # Window not in sensor image
-            logging.debug("Window not in sensor image")
-            in_sensor = False
-
-        # Compute offset
-        tile_bounds = bounds(img_window, transform)
-        tile_bounds_with_res = [
-            res_x * tile_bounds[0],
-            res_y * tile_bounds[1],
-            res_x * tile_bounds[2],
-            res_y * tile_bounds[3],
-        ]
 
-        x_offset = min(tile_bounds_with_res[0], tile_bounds_with_res[2])
-        y_offset = min(tile_bounds_with_res[1], tile_bounds_with_res[3])
+        group_as_array = imgs_as_array[group_idx[0]]
+        if len(group_idx) > 1:
+            group_as_array = np.concatenate(
+                [
+                    imgs_as_array[img_idx].astype(np.float64, copy=False)
+                    for img_idx in group_idx
+                ]
+            )
 
-        if in_sensor:
-            # Get sensor data
-            img_as_array = img_reader.read(window=img_window)
+        resamp = cresample.grid(
+            group_as_array,
+            shifted_grid_as_array,
+            oversampling,
+            interpolator=interpolator,
+            nodata=0,
+        ).astype(np.float32)
+
+        # extract exact region
+        resamp = resamp[
+            ...,
+            ext_region[1] : ext_region[3] - 1,
+            ext_region[0] : ext_region[2] - 1,
+        ]
 
-            # shift grid regarding the img extraction
-            grid_as_array[0, ...] -= x_offset
-            grid_as_array[1, ...] -= y_offset
+        # split bands of each image
+        first_band = 0
+        for img_idx in group_idx:
+            nb_bands = imgs_as_array[img_idx].shape[0]
+            resamps[img_idx] = resamp[first_band : first_band + nb_bands]
+            first_band += nb_bands
 
-            resamp = cresample.grid(
-                img_as_array,
-                grid_as_array,
-                oversampling,
-                interpolator=interpolator,
-                nodata=0,
-            ).astype(np.float32)
-
-            # extract exact region
-            out_region = oversampling * np.array(grid_region)
-            ext_region = region - out_region
-            resamp = resamp[
-                ...,
-                ext_region[1] : ext_region[3] - 1,
-                ext_region[0] : ext_region[2] - 1,
-            ]
-        else:
-            resamp = np.zeros(
-                (img_reader.count, region[3] - region[1], region[2] - region[0])
-            )
+        if 0 in group_idx:
+            first_grid_as_array = shifted_grid_as_array
 
-    # create msk
+    # create msk of first image
     msk = None
     if nodata is not None or mask is not None:
-        if in_sensor:
+        img_as_array = imgs_as_array[0]
+        nodata_msk = msk_cst.NO_DATA_IN_EPIPOLAR_RECTIFICATION
+        if img_as_array is not None:
             # get mask in source geometry
             nodata_index = img_as_array == nodata
 
             if mask is not None:
-                with rio.open(mask) as msk_reader:
-                    msk_as_array = msk_reader.read(window=img_window)
+                msk_as_array = open_raster(mask).read(window=imgs_window[0])
             else:
                 msk_as_array = np.zeros(img_as_array.shape)
 
-            nodata_msk = msk_cst.NO_DATA_IN_EPIPOLAR_RECTIFICATION
             msk_as_array[nodata_index] = nodata_msk
 
             # resample mask
             msk = cresample.grid(
                 msk_as_array,
-                grid_as_array,
+                first_grid_as_array,
                 oversampling,
                 interpolator="nearest",
                 nodata=nodata_msk,
@@ -394,14 +552,76 @@ def resample_image(
                 ext_region[0] : ext_region[2] - 1,
             ]
         else:
-            nodata_msk = msk_cst.NO_DATA_IN_EPIPOLAR_RECTIFICATION
             msk = np.full(
                 (1, region[3] - region[1], region[2] - region[0]),
                 fill_value=nodata_msk,
             )
 
-    dataset = datasets.create_im_dataset(
-        resamp, region, largest_size, img, band_coords, msk
+    datasets_list = []
+    for img_idx, img in enumerate(imgs):
+        datasets_list.append(
+            datasets.create_im_dataset(
+                resamps[img_idx],
+                region,
+                largest_size,
+                img,
+                bands_coords[img_idx],
+                msk if img_idx == 0 else None,
+            )
+        )
+
+    return datasets_list
+
+
+def get_sensor_window(img_reader, left, right, top, bottom):
+    """
+    Get the window of sensor image to read, cropped to the image
+
+    :param img_reader: opened sensor image
+    :type img_reader: rasterio.DatasetReader
+    :param left: left of needed source bounding box
+    :param right: right of needed source bounding box
+    :param top: top of needed source bounding box
+    :param bottom: bottom of needed source bounding box
+    :return: window (None if not in sensor image), x and y offsets
+        of the window
+    :rtype: tuple(Window, float, float)
+    """
+    transform = img_reader.transform
+    res_x = int(transform[0] / abs(transform[0]))
+    res_y = int(transform[4] / abs(transform[4]))
+
+    (full_left, full_bottom, full_right, full_top) = img_reader.bounds
+
+    left, right, top, bottom = (
+        res_x * left,
+        res_x * right,
+        res_y * top,
+        res_y * bottom,
     )
 
-    return dataset
+    full_bounds_window = from_bounds(
+        full_left, full_bottom, full_right, full_top, transform
+    )
+    img_window = from_bounds(left, bottom, right, top, transform)
+    # Crop window to be in image
+    try:
+        img_window = img_window.intersection(full_bounds_window)
+    except rio.errors.WindowError:
+        # Window not in sensor image
+        logging.debug("Window not in sensor image")
+        return None, None, None
+
+    # Compute offset
+    tile_bounds = bounds(img_window, transform)
+    tile_bounds_with_res = [
+        res_x * tile_bounds[0],
+        res_y * tile_bounds[1],
+        res_x * tile_bounds[2],
+        res_y * tile_bounds[3],
+    ]
+
+    x_offset = min(tile_bounds_with_res[0], tile_bounds_with_res[2])
+    y_offset = min(tile_bounds_with_res[1], tile_bounds_with_res[3])
+
+    return img_window, x_offset, y_offset
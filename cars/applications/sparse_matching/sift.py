@@ -101,6 +101,7 @@ class Sift(SparseMatching, short_name="sift"):
         self.sift_edge_threshold = self.used_config["sift_edge_threshold"]
         self.sift_magnification = self.used_config["sift_magnification"]
         self.sift_back_matching = self.used_config["sift_back_matching"]
+        self.sift_matching_method = self.used_config["sift_matching_method"]
 
         # check loader
 
@@ -174,6 +175,9 @@ class Sift(SparseMatching, short_name="sift"):
         overloaded_conf["sift_back_matching"] = conf.get(
             "sift_back_matching", True
         )
+        overloaded_conf["sift_matching_method"] = conf.get(
+            "sift_matching_method", sparse_matching_tools.BRUTE_FORCE_MATCHING
+        )
 
         # Saving files
         overloaded_conf["save_matches"] = conf.get("save_matches", False)
@@ -197,6 +201,9 @@ class Sift(SparseMatching, short_name="sift"):
             "sift_edge_threshold": float,
             "sift_magnification": And(float, lambda x: x > 0),
             "sift_back_matching": bool,
+            "sift_matching_method": And(
+                str, lambda x: x in sparse_matching_tools.MATCHING_METHODS
+            ),
             "save_matches": bool,
         }
 
@@ -489,6 +496,9 @@ class Sift(SparseMatching, short_name="sift"):
                                         edge_threshold=self.sift_edge_threshold,
                                         magnification=self.sift_magnification,
                                         backmatching=self.sift_back_matching,
+                                        matching_method=(
+                                            self.sift_matching_method
+                                        ),
                                         disp_lower_bound=disp_lower_bound,
                                         disp_upper_bound=disp_upper_bound,
                                     )
@@ -703,6 +713,7 @@ def compute_matches(
     edge_threshold=None,
     magnification=None,
     backmatching=None,
+    matching_method=None,
     disp_lower_bound=None,
     disp_upper_bound=None,
 ) -> Dict[str, Tuple[xr.Dataset, xr.Dataset]]:
@@ -750,6 +761,7 @@ def compute_matches(
         edge_threshold=edge_threshold,
         magnification=magnification,
         backmatching=backmatching,
+        matching_method=matching_method,
     )
 
     # Filter matches outside disparity range
@@ -32,6 +32,7 @@ import logging
 import numpy as np
 import pandas
 from cyvlfeat.sift.sift import sift
+from scipy.spatial import cKDTree  # pylint: disable=no-name-in-module
 
 # CARS imports
 import cars.applications.sparse_matching.sparse_matching_constants as sm_cst
@@ -43,6 +44,15 @@ from cars.applications.triangulation import triangulation_tools
 from cars.core import constants as cst
 from cars.core import preprocessing, projection
 
+# Descriptors matching methods
+BRUTE_FORCE_MATCHING = "brute_force"
+KD_TREE_MATCHING = "kd_tree"
+MATCHING_METHODS = [BRUTE_FORCE_MATCHING, KD_TREE_MATCHING]
+
+# Number of left descriptors matched at once with brute force matching:
+# the distance matrix chunk uses 4 * MATCHING_CHUNK_SIZE bytes per right one
+MATCHING_CHUNK_SIZE = 1024
+
 
 def euclidean_matrix_distance(descr1: np.array, descr2: np.array):
     """Compute a matrix containing cross euclidean distance
@@ -56,7 +66,137 @@ def euclidean_matrix_distance(descr1: np.array, descr2: np.array):
     sq_descr1 = np.sum(descr1**2, axis=1)[:, np.newaxis]
     sq_descr2 = np.sum(descr2**2, axis=1)
     dot_descr12 = np.dot(descr1, descr2.T)
-    return np.sqrt(sq_descr1 + sq_descr2 - 2 * dot_descr12)
+    # squared distances may be slightly negative due to rounding
+    return np.sqrt(np.maximum(sq_descr1 + sq_descr2 - 2 * dot_descr12, 0))
+
+
+def brute_force_matching(
+    left_descr: np.ndarray,
+    right_descr: np.ndarray,
+    chunk_size: int = MATCHING_CHUNK_SIZE,
+):
+    """
+    Find nearest neighbors of descriptors with an exhaustive search.
+    The euclidean matrix distance is computed by chunks of left descriptors,
+    in float32, keeping only the two nearest right descriptors of each left
+    one and the nearest left descriptor of each right one.
+
+    :param left_descr: left keypoints descriptors
+    :type left_descr: numpy.ndarray
+    :param right_descr: right keypoints descriptors, at least two
+    :type right_descr: numpy.ndarray
+    :param chunk_size: number of left descriptors processed at once
+    :type chunk_size: int
+    :return: nearest right index and ratio of distances to the first and
+        second nearest right descriptors, for each left descriptor,
+        and nearest left index for each right descriptor
+    :rtype: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    left_descr = left_descr.astype(np.float32, copy=False)
+    right_descr = right_descr.astype(np.float32, copy=False)
+    nb_left = left_descr.shape[0]
+    nb_right = right_descr.shape[0]
+
+    nearest_lr = np.empty(nb_left, dtype=int)
+    ratio_lr = np.empty(nb_left, dtype=np.float32)
+    nearest_rl = np.zeros(nb_right, dtype=int)
+    dist_rl = np.full(nb_right, np.inf, dtype=np.float32)
+
+    for start in range(0, nb_left, chunk_size):
+        end = min(start + chunk_size, nb_left)
+        emd = euclidean_matrix_distance(left_descr[start:end], right_descr)
+
+        # two nearest right descriptors of each left one
+        chunk_nearest_lr = np.argmin(emd, axis=1)
+        nearest_lr[start:end] = chunk_nearest_lr
+        first_second_dist = np.partition(emd, 1, axis=1)
+        ratio_lr[start:end] = first_second_dist[:, 0] / first_second_dist[:, 1]
+
+        # nearest left descriptor of each right one, first one on ties
+        chunk_nearest_rl = np.argmin(emd, axis=0)
+        chunk_dist_rl = emd[chunk_nearest_rl, np.arange(nb_right)]
+        closer = chunk_dist_rl < dist_rl
+        dist_rl[closer] = chunk_dist_rl[closer]
+        nearest_rl[closer] = chunk_nearest_rl[closer] + start
+
+    return nearest_lr, ratio_lr, nearest_rl
+
+
+def kd_tree_matching(left_descr: np.ndarray, right_descr: np.ndarray):
+    """
+    Find nearest neighbors of descriptors with KD-trees search,
+    without computing the euclidean matrix distance.
+
+    :param left_descr: left keypoints descriptors
+    :type left_descr: numpy.ndarray
+    :param right_descr: right keypoints descriptors, at least two
+    :type right_descr: numpy.ndarray
+    :return: nearest right index and ratio of distances to the first and
+        second nearest right descriptors, for each left descriptor,
+        and nearest left index for each right descriptor
+    :rtype: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    neighbors_dist, neighbors_idx = cKDTree(right_descr).query(left_descr, 2)
+    nearest_lr = neighbors_idx[:, 0]
+    ratio_lr = neighbors_dist[:, 0] / neighbors_dist[:, 1]
+
+    _, nearest_rl = cKDTree(left_descr).query(right_descr, 1)
+
+    return nearest_lr, ratio_lr, nearest_rl
+
+
+def match_descriptors(
+    left_descr: np.ndarray,
+    right_descr: np.ndarray,
+    matching_threshold: float = 0.6,
+    backmatching: bool = True,
+    matching_method: str = BRUTE_FORCE_MATCHING,
+):
+    """
+    Match left and right keypoints descriptors, with ratio test
+    and optional backmatching
+
+    :param left_descr: left keypoints descriptors
+    :type left_descr: numpy.ndarray
+    :param right_descr: right keypoints descriptors, at least two
+    :type right_descr: numpy.ndarray
+    :param matching_threshold: threshold for the ratio to nearest second match
+    :type matching_threshold: float
+    :param backmatching: also check that right vs. left gives same match
+    :type backmatching: bool
+    :param matching_method: nearest neighbors search method,
+        "brute_force" or "kd_tree"
+    :type matching_method: str
+    :return: matches left index, right index and distances ratio
+    :rtype: numpy buffer of shape (nb_matches,3)
+    """
+    if matching_method == BRUTE_FORCE_MATCHING:
+        nearest_lr, ratio_lr, nearest_rl = brute_force_matching(
+            left_descr, right_descr
+        )
+    elif matching_method == KD_TREE_MATCHING:
+        nearest_lr, ratio_lr, nearest_rl = kd_tree_matching(
+            left_descr, right_descr
+        )
+    else:
+        raise ValueError(
+            "Matching method {} not supported, available: {}".format(
+                matching_method, MATCHING_METHODS
+            )
+        )
+
+    # stack matches which its distance
+    matches_idx = np.column_stack(
+        (np.arange(left_descr.shape[0]), nearest_lr, ratio_lr)
+    )
+
+    # check backmatching
+    if backmatching is True:
+        back = nearest_rl[nearest_lr] == np.arange(left_descr.shape[0])
+        matches_idx = matches_idx[back]
+
+    # threshold matches
+    return matches_idx[matches_idx[:, -1] < matching_threshold, :]
 
 
 def compute_matches(
@@ -73,6 +213,7 @@ def compute_matches(
     edge_threshold: float = 5.0,
     magnification: float = 2.0,
     backmatching: bool = True,
+    matching_method: str = BRUTE_FORCE_MATCHING,
 ):
     """
     Compute matches between left and right
@@ -104,6 +245,9 @@ def compute_matches(
     :type magnification: float
     :param backmatching: also check that right vs. left gives same match
     :type backmatching: bool
+    :param matching_method: descriptors nearest neighbors search method,
+        "brute_force" or "kd_tree"
+    :type matching_method: str
     :return: matches
     :rtype: numpy buffer of shape (nb_matches,4)
     """
@@ -166,39 +310,13 @@ def compute_matches(
     left_frames[..., 0:2] += left_origin[::-1]
     right_frames[..., 0:2] += right_origin[::-1]
 
-    # compute euclidean matrix distance
-    emd = euclidean_matrix_distance(left_descr, right_descr)
-
-    # get nearest sift (regarding descriptors)
-    idx_nearest_dlr = (np.arange(np.shape(emd)[0]), np.nanargmin(emd, axis=1))
-    idx_nearest_drl = (np.nanargmin(emd, axis=0), np.arange(np.shape(emd)[1]))
-
-    # get absolute distances
-    dist_dlr = emd[idx_nearest_dlr]
-    dist_drl = emd[idx_nearest_drl]
-
-    # get relative distance (ratio to second nearest distance)
-    second_dist_dlr = np.partition(emd, 1, axis=1)[:, 1]
-    dist_dlr /= second_dist_dlr
-    second_dist_drl = np.partition(emd, 1, axis=0)[1, :]
-    dist_drl /= second_dist_drl
-
-    # stack matches which its distance
-    idx_matches_dlr = np.column_stack((*idx_nearest_dlr, dist_dlr))
-    idx_matches_drl = np.column_stack((*idx_nearest_drl, dist_drl))
-
-    # check backmatching
-    if backmatching is True:
-        back = (
-            idx_matches_dlr[:, 0]
-            == idx_matches_drl[idx_matches_dlr[:, 1].astype(int)][:, 0]
-        )
-        matches_idx = idx_matches_dlr[back]
-    else:
-        matches_idx = idx_matches_dlr
-
-    # threshold matches
-    matches_idx = matches_idx[matches_idx[:, -1] < matching_threshold, :]
+    matches_idx = match_descriptors(
+        left_descr,
+        right_descr,
+        matching_threshold=matching_threshold,
+        backmatching=backmatching,
+        matching_method=matching_method,
+    )
 
     # retrieve points: [Y, X, S, TH] X: 1, Y: 0
     # fyi: ``S`` is the scale and ``TH`` is the orientation (in radians)
@@ -218,6 +336,7 @@ def dataset_matching(
     edge_threshold=5.0,
     magnification=2.0,
     backmatching=True,
+    matching_method=BRUTE_FORCE_MATCHING,
 ):
     """
     Compute sift matches between two datasets
@@ -240,6 +359,9 @@ def dataset_matching(
     :type magnification: float
     :param backmatching: also check that right vs. left gives same match
     :type backmatching: bool
+    :param matching_method: descriptors nearest neighbors search method,
+        "brute_force" or "kd_tree"
+    :type matching_method: str
     :return: matches
     :rtype: numpy buffer of shape (nb_matches,4)
     """
@@ -265,6 +387,7 @@ def dataset_matching(
         edge_threshold=edge_threshold,
         magnification=magnification,
         backmatching=backmatching,
+        matching_method=matching_method,
     )
 
     return matches
@@ -46,7 +46,11 @@ from cars.core import constants as cst
 from cars.core import inputs, preprocessing, projection, tiling
 
 # CARS imports
-from cars.core.geometry import AbstractGeometry, read_geoid_file
+from cars.core.geometry import (
+    AbstractGeometry,
+    GeoidInterpolator,
+    read_geoid_file,
+)
 from cars.core.utils import safe_makedirs
 from cars.data_structures import cars_dataset
 from cars.pipelines.sensor_to_dense_dsm import (
@@ -445,8 +449,8 @@ class LineOfSightIntersection(
                     "has been defined in inputs"
                 )
 
-            geoid_data = read_geoid_file(geoid_path)
-            # Broadcast geoid data to all dask workers
+            geoid_data = GeoidInterpolator(read_geoid_file(geoid_path))
+            # Broadcast geoid interpolator to all dask workers
             geoid_data_futures = self.orchestrator.cluster.scatter(
                 geoid_data, broadcast=True
             )
@@ -487,7 +491,7 @@ def compute_points_cloud(
     input_stereo_cfg: dict,
     geometry_loader: str,
     epsg,
-    geoid_data: xr.Dataset = None,
+    geoid_data: GeoidInterpolator = None,
     snap_to_img1: bool = False,
     add_msk_info: bool = False,
     saving_info=None,
@@ -517,7 +521,7 @@ def compute_points_cloud(
     :type geometry_loader: str
     :param geoid_data: Geoid used for altimetric reference. Defaults to None
         for using ellipsoid as altimetric reference.
-    :type geoid_data: str
+    :type geoid_data: GeoidInterpolator
     :param snap_to_img1: If True, Lines of Sight of img2 are moved so as to
                          cross those of img1
     :type snap_to_img1: bool
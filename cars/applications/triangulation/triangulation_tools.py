@@ -38,7 +38,7 @@ from cars.core import constants_disparity as cst_disp
 from cars.core import former_confs_utils
 
 # CARS imports
-from cars.core.geometry import AbstractGeometry
+from cars.core.geometry import AbstractGeometry, GeoidInterpolator
 
 
 def triangulate(
@@ -385,66 +385,26 @@ def add_layer(
 def geoid_offset(points, geoid):
     """
     Compute the point cloud height offset from geoid.
+    Point cloud heights are updated in place.
 
     :param points: point cloud data in lat/lon/alt WGS84 (EPSG 4326)
         coordinates.
-    :type points: xarray.Dataset
-    :param geoid: geoid elevation data.
-    :type geoid: xarray.Dataset
+    :type points: xarray.Dataset or pandas.DataFrame
+    :param geoid: geoid elevation data, or its interpolator
+    :type geoid: xarray.Dataset or GeoidInterpolator
     :return: the same point cloud but using geoid as altimetric reference.
-    :rtype: xarray.Dataset
+    :rtype: xarray.Dataset or pandas.DataFrame
     """
-
-    # deep copy the given point cloud that will be used as output
-    out_pc = points.copy(deep=True)
-
-    # currently assumes that the OTB EGM96 geoid will be used with longitude
-    # ranging from 0 to 360, so we must unwrap longitudes to this range.
-    longitudes = np.copy(out_pc[cst.X].values)
-    longitudes[longitudes < 0] += 360
+    if not isinstance(geoid, GeoidInterpolator):
+        geoid = GeoidInterpolator(geoid)
 
     # perform interpolation using point cloud coordinates.
-    if sum(longitudes.shape) != 0:
-        if (
-            not geoid.lat_min
-            <= out_pc[cst.Y].min()
-            <= out_pc[cst.Y].max()
-            <= geoid.lat_max
-            and geoid.lon_min
-            <= np.min(longitudes)
-            <= np.max(longitudes)
-            <= geoid.lat_max
-        ):
-            raise RuntimeError(
-                "Geoid does not fully cover the area spanned by"
-                " the point cloud."
-            )
-
-        out_pc[cst.Z] = points[cst.Z]
-
-        # interpolate data
-        if isinstance(out_pc, xr.Dataset):
-            ref_interp = geoid.interp(
-                {
-                    "lat": out_pc[cst.Y],
-                    "lon": xr.DataArray(longitudes, dims=(cst.ROW, cst.COL)),
-                }
-            )
-
-            ref_interp_hgt = ref_interp.hgt.values
-
-        else:
-            # one dimension is equal to 1, happens with matches tiangulation
-            ref_interp = geoid.interp(
-                {
-                    "lat": out_pc[cst.Y].values,
-                    "lon": longitudes,
-                }
-            )
-
-            ref_interp_hgt = ref_interp.hgt.values.diagonal()
+    if np.size(points[cst.X]) != 0:
+        ref_interp_hgt = geoid.interpolate(
+            np.asarray(points[cst.X]), np.asarray(points[cst.Y])
+        )
 
         # offset using geoid height
-        out_pc[cst.Z] -= ref_interp_hgt
+        points[cst.Z] -= ref_interp_hgt
 
-    return out_pc
+    return points
@@ -528,3 +528,73 @@ def read_geoid_file(geoid_path: str) -> xr.Dataset:
         )
 
         return geoid
+
+
+class GeoidInterpolator:  # pylint: disable=too-few-public-methods
+    """
+    Bilinear interpolation of geoid heights at points positions, on a
+    grid prepared once and shared between tiles
+    """
+
+    def __init__(self, geoid: xr.Dataset):
+        """
+        Init function of GeoidInterpolator
+
+        :param geoid: geoid elevation data, as read by read_geoid_file
+        :type geoid: xarray.Dataset
+        """
+        latitudes = geoid["lat"].values
+        longitudes = geoid["lon"].values
+        heights = geoid["hgt"].values.astype(np.float64)
+
+        # interpolation grid coordinates must be ascending
+        if latitudes[0] > latitudes[-1]:
+            latitudes = latitudes[::-1]
+            heights = heights[::-1]
+
+        self.lat_min, self.lat_max = latitudes[0], latitudes[-1]
+        self.lon_min, self.lon_max = longitudes[0], longitudes[-1]
+        self.interpolator = interpolate.RegularGridInterpolator(
+            (latitudes, longitudes),
+            np.ascontiguousarray(heights),
+            bounds_error=False,
+            fill_value=np.nan,
+        )
+
+    def interpolate(
+        self, longitudes: np.ndarray, latitudes: np.ndarray
+    ) -> np.ndarray:
+        """
+        Interpolate geoid heights at points positions
+
+        :param longitudes: points longitudes in degrees
+        :type longitudes: np.ndarray
+        :param latitudes: points latitudes in degrees
+        :type latitudes: np.ndarray
+        :return: geoid heights, with the shape of latitudes, nan where
+            positions are nan
+        :rtype: np.ndarray
+        """
+        # currently assumes that the OTB EGM96 geoid will be used with
+        # longitude ranging from 0 to 360, so we must unwrap longitudes
+        # to this range.
+        longitudes = np.where(longitudes < 0, longitudes + 360, longitudes)
+
+        valid = np.isfinite(longitudes) & np.isfinite(latitudes)
+        if np.any(valid) and not (
+            self.lat_min
+            <= np.min(latitudes[valid])
+            <= np.max(latitudes[valid])
+            <= self.lat_max
+            and self.lon_min
+            <= np.min(longitudes[valid])
+            <= np.max(longitudes[valid])
+            <= self.lon_max
+        ):
+            raise RuntimeError(
+                "Geoid does not fully cover the area spanned by"
+                " the point cloud."
+            )
+
+        positions = np.stack((np.ravel(latitudes), np.ravel(longitudes)), -1)
+        return self.interpolator(positions).reshape(np.shape(latitudes))
@@ -24,6 +24,7 @@ Shareloc geometry sub class : CARS geometry wrappers functions to shareloc ones
 
 import logging
 import os
+from functools import lru_cache
 from typing import Dict, List, Tuple, Union
 
 import numpy as np
@@ -33,18 +34,28 @@ import xarray as xr
 from json_checker import And
 from shareloc.geofunctions import localization
 from shareloc.geofunctions.dtm_intersection import DTMIntersection
-from shareloc.geofunctions.triangulation import epipolar_triangulation
+from shareloc.geofunctions.rectification_grid import RectificationGrid
+from shareloc.geofunctions.triangulation import (
+    sensor_triangulation,
+    transform_disp_to_matches,
+)
 from shareloc.geomodels.grid import Grid
 from shareloc.geomodels.rpc import RPC
 from shareloc.image import Image
 
 from cars.conf import input_parameters
 from cars.core import constants as cst
+from cars.core import inputs
 from cars.core.geometry import AbstractGeometry
 
 GRID_TYPE = "GRID"
 RPC_TYPE = "RPC"
 
+# Number of geometric models and rectification grids kept in memory
+# by each process
+GEOM_MODEL_CACHE_SIZE = 8
+RECTIFICATION_GRID_CACHE_SIZE = 8
+
 
 @AbstractGeometry.register_subclass("SharelocGeometry")
 class SharelocGeometry(AbstractGeometry):
@@ -76,7 +87,9 @@ class SharelocGeometry(AbstractGeometry):
     @staticmethod
     def load_geom_model(model: str, model_type: str) -> Union[Grid, RPC]:
         """
-        Load geometric model and returns it as a shareloc object
+        Load geometric model and returns it as a shareloc object.
+        Models are cached by each process: returned model is shared
+        between calls, it must not be modified.
 
         TODO: evolve with CARS new API with CARS conf clean
 
@@ -84,18 +97,9 @@ class SharelocGeometry(AbstractGeometry):
         :param model_type: model type (RPC or Grid)
         :return: geometric model as a shareloc object (Grid or RPC)
         """
-
-        if model_type == GRID_TYPE:
-            shareloc_model = Grid(model)
-        elif model_type == RPC_TYPE:
-            shareloc_model = RPC.from_any(model)
-        else:
-            raise ValueError(f"Model type {model_type} is not supported")
-
-        if shareloc_model is None:
-            raise ValueError(f"Model {model} could not be read by shareloc")
-
-        return shareloc_model
+        return cached_load_geom_model(
+            model, model_type, inputs.get_modification_time(model)
+        )
 
     @staticmethod
     def load_image(img: str) -> Image:
@@ -182,31 +186,25 @@ class SharelocGeometry(AbstractGeometry):
 
         # perform matches triangulation
         if mode is cst.MATCHES_MODE:
-            __, point_wgs84, __ = epipolar_triangulation(
-                matches=matches,
-                mask=None,
-                matches_type="sift",
-                geometrical_model_left=shareloc_model1,
-                geometrical_model_right=shareloc_model2,
-                grid_left=grid1,
-                grid_right=grid2,
-                residues=True,
-                fill_nan=True,
+            point_wgs84 = epipolar_triangulation(
+                matches,
+                "sift",
+                shareloc_model1,
+                shareloc_model2,
+                load_rectification_grid(grid1),
+                load_rectification_grid(grid2),
             )
 
             llh = point_wgs84.reshape((point_wgs84.shape[0], 1, 3))
 
         elif mode is cst.DISP_MODE:
-            __, point_wgs84, __ = epipolar_triangulation(
-                matches=matches,
-                mask=None,
-                matches_type="disp",
-                geometrical_model_left=shareloc_model1,
-                geometrical_model_right=shareloc_model2,
-                grid_left=grid1,
-                grid_right=grid2,
-                residues=True,
-                fill_nan=True,
+            point_wgs84 = epipolar_triangulation(
+                matches,
+                "disp",
+                shareloc_model1,
+                shareloc_model2,
+                load_rectification_grid(grid1),
+                load_rectification_grid(grid2),
             )
 
             row = np.array(
@@ -398,3 +396,102 @@ class SharelocGeometry(AbstractGeometry):
         lonlatalt = np.squeeze(lonlatalt)
         latlonalt = np.array([lonlatalt[1], lonlatalt[0], lonlatalt[2]])
         return latlonalt
+
+
+@lru_cache(maxsize=GEOM_MODEL_CACHE_SIZE)
+def cached_load_geom_model(
+    model, model_type, modification_time
+):  # pylint: disable=unused-argument
+    """
+    Load geometric model, cached by path, type and modification time
+
+    :param model: Path to the model file
+    :param model_type: model type (RPC or Grid)
+    :param modification_time: model file modification time
+    :return: geometric model as a shareloc object (Grid or RPC)
+    """
+    if model_type == GRID_TYPE:
+        shareloc_model = Grid(model)
+    elif model_type == RPC_TYPE:
+        shareloc_model = RPC.from_any(model)
+    else:
+        raise ValueError(f"Model type {model_type} is not supported")
+
+    if shareloc_model is None:
+        raise ValueError(f"Model {model} could not be read by shareloc")
+
+    return shareloc_model
+
+
+def load_rectification_grid(grid: str) -> RectificationGrid:
+    """
+    Load epipolar rectification grid as a shareloc object.
+    Grids are cached by each process: returned grid is shared
+    between calls, it must not be modified.
+
+    :param grid: path to the rectification grid
+    :return: rectification grid
+    """
+    return cached_load_rectification_grid(
+        grid, inputs.get_modification_time(grid)
+    )
+
+
+@lru_cache(maxsize=RECTIFICATION_GRID_CACHE_SIZE)
+def cached_load_rectification_grid(
+    grid, modification_time
+):  # pylint: disable=unused-argument
+    """
+    Load rectification grid, cached by path and modification time
+
+    :param grid: path to the rectification grid
+    :param modification_time: grid modification time
+    :return: rectification grid
+    """
+    return RectificationGrid(grid)
+
+
+def epipolar_triangulation(
+    matches: Union[xr.Dataset, np.ndarray],
+    matches_type: str,
+    shareloc_model1: Union[Grid, RPC],
+    shareloc_model2: Union[Grid, RPC],
+    rectif_grid1: RectificationGrid,
+    rectif_grid2: RectificationGrid,
+) -> np.ndarray:
+    """
+    Triangulate matches in epipolar geometry, as shareloc
+    epipolar_triangulation, with already loaded rectification grids.
+    Residues are not computed.
+
+    :param matches: cars disparity dataset or matches as numpy array
+    :param matches_type: "sift" for matches, "disp" for disparity dataset
+    :param shareloc_model1: geometric model of image 1
+    :param shareloc_model2: geometric model of image 2
+    :param rectif_grid1: rectification grid of image 1
+    :param rectif_grid2: rectification grid of image 2
+    :return: the long/lat/height numpy array of the matches
+    """
+    if matches_type == "sift":
+        epi_pos_left = matches[:, 0:2]
+        epi_pos_right = matches[:, 2:4]
+    else:
+        epi_pos_left, epi_pos_right, __ = transform_disp_to_matches(matches)
+
+    matches_sensor = np.concatenate(
+        (
+            rectif_grid1.interpolate(epi_pos_left),
+            rectif_grid2.interpolate(epi_pos_right),
+        ),
+        axis=1,
+    )
+
+    __, point_wgs84, __ = sensor_triangulation(
+        matches_sensor,
+        shareloc_model1,
+        shareloc_model2,
+        residues=False,
+        fill_nan=True,
+    )
+
+    return point_wgs84
@@ -25,6 +25,7 @@ contains some CARS global shared general purpose inputs functions
 
 # Standard imports
 import logging
+import os
 import warnings
 from typing import Dict, Tuple
 
@@ -270,3 +271,19 @@ def get_descriptions_bands(raster_file: str) -> Dict:
     """
     with rio.open(raster_file, "r") as descriptor:
         return descriptor.descriptions
+
+
+def get_modification_time(path):
+    """
+    Get file modification time, used to invalidate cached data
+    of rewritten files
+
+    :param path: path to file
+    :type path: str
+    :return: modification time in nanoseconds, None if not a local file
+    :rtype: int
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
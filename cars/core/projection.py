@@ -28,6 +28,8 @@ contains some general purpose functions using polygons and data projections
 import logging
 import math
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Tuple, Union
 
 # Third party imports
@@ -47,6 +49,11 @@ from cars.core import inputs, outputs, utils
 # CARS imports
 from cars.core.geometry import AbstractGeometry
 
+# Number of pyproj transformers kept by each process
+TRANSFORMER_CACHE_SIZE = 16
+# Number of points converted at once by in place conversions
+CONVERSION_CHUNK_SIZE = 1000000
+
 
 def compute_dem_intersection_with_poly(
     srtm_dir: str, ref_poly: Polygon, ref_epsg: int
@@ -157,11 +164,8 @@ def polygon_projection(poly: Polygon, epsg_in: int, epsg_out: int) -> Polygon:
     :param epsg_out: final epsg code
     :return: The polygon in the final projection
     """
-    # Get CRS from input EPSG codes
-    crs_in = pyproj.CRS.from_epsg(epsg_in)
-    crs_out = pyproj.CRS.from_epsg(epsg_out)
-    # Project polygon between CRS (keep always_xy for compatibility)
-    project = pyproj.Transformer.from_crs(crs_in, crs_out, always_xy=True)
+    # Project polygon between CRS
+    project = get_transformer(epsg_in, epsg_out)
     poly = transform(project.transform, poly)
 
     return poly
@@ -311,6 +315,35 @@ def geo_to_aer(
     return enu_to_aer(x_east, y_north, z_up)
 
 
+@lru_cache(maxsize=TRANSFORMER_CACHE_SIZE)
+def cached_transformer(epsg_in: int, epsg_out: int) -> pyproj.Transformer:
+    """
+    Create transformer between two SRS, cached by EPSG codes
+
+    :param epsg_in: EPSG code of the input SRS
+    :param epsg_out: EPSG code of the output SRS
+    :return: transformer, shared between calls
+    """
+    # Get CRS from input EPSG codes
+    crs_in = pyproj.CRS.from_epsg(epsg_in)
+    crs_out = pyproj.CRS.from_epsg(epsg_out)
+
+    # keep always_xy for compatibility
+    return pyproj.Transformer.from_crs(crs_in, crs_out, always_xy=True)
+
+
+def get_transformer(epsg_in: int, epsg_out: int) -> pyproj.Transformer:
+    """
+    Get transformer between two SRS, created once per process.
+    Transformers can be used by several threads.
+
+    :param epsg_in: EPSG code of the input SRS
+    :param epsg_out: EPSG code of the output SRS
+    :return: transformer, shared between calls
+    """
+    return cached_transformer(int(epsg_in), int(epsg_out))
+
+
 def points_cloud_conversion(
     cloud_in: np.ndarray, epsg_in: int, epsg_out: int
 ) -> np.ndarray:
@@ -322,17 +355,82 @@ def points_cloud_conversion(
     :param epsg_out: EPSG code of the output SRS
     :return: Projected point cloud
     """
-    # Get CRS from input EPSG codes
-    crs_in = pyproj.CRS.from_epsg(epsg_in)
-    crs_out = pyproj.CRS.from_epsg(epsg_out)
+    # Project point cloud between CRS
+    transformer = get_transformer(epsg_in, epsg_out)
+    cloud_out = transformer.transform(*np.asarray(cloud_in).T)
+
+    return np.stack(cloud_out, axis=-1)
 
-    # Project point cloud between CRS (keep always_xy for compatibility)
-    cloud_in = np.array(cloud_in).T
-    transformer = pyproj.Transformer.from_crs(crs_in, crs_out, always_xy=True)
-    cloud_in = transformer.transform(*cloud_in)
-    cloud_in = np.array(cloud_in).T
 
-    return cloud_in
+def coordinates_conversion_inplace(
+    coords: List[np.ndarray],
+    epsg_in: int,
+    epsg_out: int,
+    chunk_size: int = CONVERSION_CHUNK_SIZE,
+    workers: int = 1,
+):
+    """
+    Convert coordinates from a SRS to another one, in place,
+    chunk by chunk
+
+    :param coords: x, y and z coordinates, as C contiguous float64 arrays
+        of the same shape
+    :param epsg_in: EPSG code of the input SRS
+    :param epsg_out: EPSG code of the output SRS
+    :param chunk_size: number of points converted at once
+    :param workers: number of threads converting chunks
+    """
+    for coord in coords:
+        if coord.dtype != np.float64 or not coord.flags.c_contiguous:
+            # pyproj would convert a copy of the coordinates
+            raise TypeError(
+                "Coordinates must be C contiguous float64 arrays "
+                "to be converted in place"
+            )
+
+    transformer = get_transformer(epsg_in, epsg_out)
+    flat_coords = [np.ravel(coord) for coord in coords]
+
+    def convert_chunk(start):
+        """
+        Convert points of chunk starting at start
+        """
+        transformer.transform(
+            *[coord[start : start + chunk_size] for coord in flat_coords],
+            inplace=True,
+        )
+
+    starts = range(0, flat_coords[0].size, chunk_size)
+    if workers > 1 and len(starts) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(convert_chunk, starts))
+    else:
+        for start in starts:
+            convert_chunk(start)
+
+
+def get_converted_coordinates(
+    cloud: Union[xr.Dataset, pandas.DataFrame],
+    epsg_in: int,
+    epsg_out: int,
+    workers: int = 1,
+) -> List[np.ndarray]:
+    """
+    Get x, y and z coordinates of a point cloud converted to another SRS,
+    as new arrays with the shape of the cloud variables
+
+    :param cloud: point cloud
+    :param epsg_in: EPSG code of the input SRS
+    :param epsg_out: EPSG code of the output SRS
+    :param workers: number of threads converting chunks of points
+    :return: x, y and z converted coordinates
+    """
+    coords = [
+        np.array(cloud[key], dtype=np.float64) for key in [cst.X, cst.Y, cst.Z]
+    ]
+    coordinates_conversion_inplace(coords, epsg_in, epsg_out, workers=workers)
+
+    return coords
 
 
 def get_xyz_np_array_from_dataset(
@@ -372,45 +470,38 @@ def get_converted_xy_np_arrays_from_dataset(
     :param epsg_out: target epsg code
     :return: a tuple composed of the x and y numpy arrays
     """
-    xyz, xyz_shape = get_xyz_np_array_from_dataset(cloud_in)
     epsg = int(cloud_in.attrs[cst.EPSG])
-    xyz = points_cloud_conversion(xyz, epsg, epsg_out)
-    xyz = xyz.reshape(xyz_shape)
-    if isinstance(cloud_in, xr.Dataset):
-        proj_x = xyz[:, :, 0]
-        proj_y = xyz[:, :, 1]
-    else:
-        proj_x = xyz[:, 0]
-        proj_y = xyz[:, 1]
+    proj_x, proj_y, _ = get_converted_coordinates(cloud_in, epsg, epsg_out)
     return proj_x, proj_y
 
 
-def points_cloud_conversion_dataset(cloud: xr.Dataset, epsg_out: int):
+def points_cloud_conversion_dataset(
+    cloud: xr.Dataset, epsg_out: int, workers: int = 1
+):
     """
     Convert a point cloud as an xarray.Dataset to another epsg (inplace)
     TODO: add test
 
     :param cloud: cloud to project
     :param epsg_out: EPSG code of the output SRS
+    :param workers: number of threads converting chunks of points
     """
 
     if cloud.attrs[cst.EPSG] != epsg_out:
-        xyz, xyz_shape = get_xyz_np_array_from_dataset(cloud)
-
-        xyz = points_cloud_conversion(xyz, cloud.attrs[cst.EPSG], epsg_out)
-        xyz = xyz.reshape(xyz_shape)
         if isinstance(cloud, xr.Dataset):
+            coords = get_converted_coordinates(
+                cloud, cloud.attrs[cst.EPSG], epsg_out, workers=workers
+            )
             # # Update cloud_in x, y and z values
-            cloud[cst.X].values = xyz[:, :, 0]
-            cloud[cst.Y].values = xyz[:, :, 1]
-            cloud[cst.Z].values = xyz[:, :, 2]
+            for key, coord in zip([cst.X, cst.Y, cst.Z], coords):  # noqa: B905
+                cloud[key].values = coord
 
             # # Update EPSG code
             cloud.attrs[cst.EPSG] = epsg_out
         elif isinstance(cloud, pandas.DataFrame):
-            cloud[cst.X] = xyz[:, 0]
-            cloud[cst.Y] = xyz[:, 1]
-            cloud[cst.Z] = xyz[:, 2]
+            points_cloud_conversion_dataframe(
+                cloud, cloud.attrs[cst.EPSG], epsg_out, workers=workers
+            )
             cloud.attrs[cst.EPSG] = epsg_out
         else:
             logging.error(
@@ -419,7 +510,7 @@ def points_cloud_conversion_dataset(cloud: xr.Dataset, epsg_out: int):
 
 
 def points_cloud_conversion_dataframe(
-    cloud: pandas.DataFrame, epsg_in: int, epsg_out: int
+    cloud: pandas.DataFrame, epsg_in: int, epsg_out: int, workers: int = 1
 ):
     """
     Convert a point cloud as a panda.DataFrame to another epsg (inplace)
@@ -427,14 +518,14 @@ def points_cloud_conversion_dataframe(
     :param cloud: cloud to project
     :param epsg_in: EPSG code of the input SRS
     :param epsg_out: EPSG code of the output SRS
+    :param workers: number of threads converting chunks of points
     """
-    xyz_in = cloud.loc[:, [cst.X, cst.Y, cst.Z]].values
-
-    if xyz_in.shape[0] != 0:
-        xyz_in = points_cloud_conversion(xyz_in, epsg_in, epsg_out)
-        cloud[cst.X] = xyz_in[:, 0]
-        cloud[cst.Y] = xyz_in[:, 1]
-        cloud[cst.Z] = xyz_in[:, 2]
+    if cloud.shape[0] != 0:
+        coords = get_converted_coordinates(
+            cloud, epsg_in, epsg_out, workers=workers
+        )
+        for key, coord in zip([cst.X, cst.Y, cst.Z], coords):  # noqa: B905
+            cloud[key] = coord
 
 
 def ground_polygon_from_envelopes(
@@ -24,6 +24,7 @@ cars_dataset module:
 """
 # pylint: disable=too-many-lines
 
+import contextlib
 import copy
 import json
 import logging
@@ -36,7 +37,6 @@ from typing import Dict
 
 # Third party imports
 import numpy as np
-import pandas
 import rasterio as rio
 import xarray as xr
 from rasterio.profiles import DefaultGTiffProfile
@@ -46,7 +46,13 @@ from rasterio.windows import Window
 from cars.core import constants as cst
 from cars.core import outputs
 from cars.core.utils import safe_makedirs
-from cars.data_structures import cars_dict, dataframe_converter
+from cars.data_structures import (
+    cars_dict,
+    cog_writer,
+    dataframe_converter,
+    dataframe_writer,
+    tiles_container,
+)
 
 # cars dataset dtype
 CARS_DS_TYPE_ARRAY = "arrays"
@@ -430,7 +436,13 @@ class CarsDataset:
             self.tiles.append(tiles_row)
 
     def generate_descriptor(
-        self, future_result, file_name, tag=None, dtype=None, nodata=None
+        self,
+        future_result,
+        file_name,
+        tag=None,
+        dtype=None,
+        nodata=None,
+        cog=False,
     ):
         """
         Generate de rasterio descriptor for the given future result
@@ -447,6 +459,8 @@ class CarsDataset:
         :type dtype: str
         :param nodata: no data value
         :type nodata: float
+        :param cog: write a Cloud Optimized GeoTIFF, created on close
+        :type cog: bool
         """
 
         # Get profile from 1st finished future
@@ -465,17 +479,30 @@ class CarsDataset:
         if nodata is not None:
             new_profile["nodata"] = nodata
 
+        if cog:
+            return cog_writer.CogWriter(
+                file_name, new_profile, tiling_grid=self.tiling_grid
+            )
+
         descriptor = rio.open(file_name, "w", **new_profile, BIGTIFF="IF_SAFER")
 
         return descriptor
 
-    def save_cars_dataset(self, directory):
+    def save_cars_dataset(
+        self, directory, use_container=True, compression=None
+    ):
         """
         Save whole CarsDataset to given directory, including tiling grids,
         attributes, overlaps, and all the xr.Dataset or pd.DataFrames.
 
         :param directory: Path where to save  self CarsDataset
         :type directory: str
+        :param use_container: save all tiles in a single indexed file,
+            instead of one directory per tile
+        :type use_container: bool
+        :param compression: compression of tiles in container:
+            None, "zlib" or "lzma"
+        :type compression: str
 
         """
 
@@ -500,6 +527,22 @@ class CarsDataset:
 
         nb_rows, nb_cols = self.tiling_grid.shape[0], self.tiling_grid.shape[1]
 
+        if use_container:
+            with tiles_container.TilesContainerWriter(
+                directory, compression=compression
+            ) as writer:
+                for row in range(nb_rows):
+                    for col in range(nb_cols):
+                        writer.write_tile(row, col, self.tiles[row][col])
+            return
+
+        # remove former container, to load saved tiles
+        container_index_file = os.path.join(
+            directory, tiles_container.CONTAINER_INDEX_FILE
+        )
+        if os.path.exists(container_index_file):
+            os.remove(container_index_file)
+
         # save each tile
         for col in range(nb_cols):
             for row in range(nb_rows):
@@ -534,6 +577,15 @@ class CarsDataset:
         overlap_file = os.path.join(directory, OVERLAP_FILE)
         self.overlaps = load_numpy_array(overlap_file)
 
+        if tiles_container.is_tiles_container(directory):
+            # arrays are memory mapped, read when used
+            reader = tiles_container.TilesContainerReader(directory)
+            self.tiles = [
+                [reader.read_tile(row, col) for col in range(nb_cols)]
+                for row in range(nb_rows)
+            ]
+            return
+
         # load each tile
         self.tiles = []
         for row in range(nb_rows):
@@ -548,6 +600,35 @@ class CarsDataset:
             self.tiles.append(tiles_row)
 
 
+def load_single_tile_from_disk(directory: str, row: int, col: int):
+    """
+    Load a single tile of a CarsDataset saved on disk,
+    without loading the other tiles
+
+    :param directory: Path where is saved CarsDataset
+    :type directory: str
+    :param row: row of tile
+    :param col: col of tile
+
+    :return: tile, None if not saved
+    :rtype: xr.Dataset or pd.DataFrame or CarsDict
+    """
+
+    if tiles_container.is_tiles_container(directory):
+        return tiles_container.get_reader(directory).read_tile(row, col)
+
+    tile_path_name = create_tile_path(col, row, directory)
+    for dataset_type, tile_file in [
+        (CARS_DS_TYPE_ARRAY, DATASET_FILE),
+        (CARS_DS_TYPE_POINTS, DATAFRAME_FILE),
+        (CARS_DS_TYPE_DICT, CARSDICT_FILE),
+    ]:
+        if os.path.exists(os.path.join(tile_path_name, tile_file)):
+            return CarsDataset(dataset_type).load_single_tile(tile_path_name)
+
+    return None
+
+
 def run_save_arrays(future_result, file_name, tag=None, descriptor=None):
     """
     Save future when arrived
@@ -571,7 +652,9 @@ def run_save_arrays(future_result, file_name, tag=None, descriptor=None):
     )
 
 
-def run_save_points(future_result, file_name, overwrite=False):
+def run_save_points(
+    future_result, file_name, overwrite=False, writer=None, laz_file_name=None
+):
     """
     Save future result when arrived
 
@@ -581,6 +664,10 @@ def run_save_points(future_result, file_name, overwrite=False):
     :type file_name: str
     :param overwrite: overwrite file
     :type overwrite: bool
+    :param writer: writer appending dataframes to files, kept open
+    :type writer: DataframeWriter
+    :param laz_file_name: laz file to append points to, with writer
+    :type laz_file_name: str
 
     """
 
@@ -589,7 +676,13 @@ def run_save_points(future_result, file_name, overwrite=False):
         if os.path.exists(file_name):
             os.remove(file_name)
     # Save
-    save_dataframe(future_result, file_name, overwrite=False)
+    save_dataframe(
+        future_result,
+        file_name,
+        overwrite=False,
+        writer=writer,
+        laz_file_name=laz_file_name,
+    )
 
 
 def load_single_tile_array(tile_path_name: str) -> xr.Dataset:
@@ -896,15 +989,24 @@ def fill_dict(data_dict, saving_info=None, attributes=None):
             data_dict.attrs[SAVING_INFO] = saving_info
 
 
-def save_dataframe(dataframe, file_name, overwrite=True):
+def save_dataframe(
+    dataframe, file_name, overwrite=True, writer=None, laz_file_name=None
+):
     """
-    Save DataFrame to csv format. The content of dataframe is merged to
-    the content of existing saved Dataframe, if overwrite==False
+    Save DataFrame to csv, npy and laz formats. The content of dataframe is
+    appended to the content of existing saved Dataframe, if overwrite==False.
+    Laz file is overwritten, unless laz_file_name is given with a writer.
 
     :param file_name: file name to save data to
     :type file_name: str
     :param overwrite: overwrite file if exists
     :type overwrite: bool
+    :param writer: writer appending dataframes to files, kept open.
+        If None, files are closed after saving
+    :type writer: DataframeWriter
+    :param laz_file_name: laz file to append points to, with writer.
+        If None, points are saved to their own laz file
+    :type laz_file_name: str
 
     """
     # generate filename if attributes have xstart and ystart settings
@@ -932,37 +1034,49 @@ def save_dataframe(dataframe, file_name, overwrite=True):
         and "save_points_cloud_as_laz" in dataframe.attrs["attributes"]
     ):
         if dataframe.attrs["attributes"]["save_points_cloud_as_laz"]:
-            las_file_name = file_name + ".laz"
-            dataframe_converter.convert_pcl_to_laz(dataframe, las_file_name)
+            if writer is not None and laz_file_name is not None:
+                writer.write_laz(dataframe, laz_file_name)
+            else:
+                las_file_name = file_name + ".laz"
+                dataframe_converter.convert_pcl_to_laz(dataframe, las_file_name)
 
-    # Save panda dataframe to csv
-    if (
-        (
+    _, extension = os.path.splitext(file_name)
+    if "csv" in extension:
+        csv_file_name = file_name
+        file_name = file_name[: -len(extension)]
+    else:
+        csv_file_name = file_name + ".csv"
+    npy_file_name = file_name + ".npy"
+
+    # Files are closed after saving if no writer is given
+    with (
+        dataframe_writer.DataframeWriter()
+        if writer is None
+        else contextlib.nullcontext(writer)
+    ) as current_writer:
+        # Save panda dataframe to csv
+        if (
+            (
+                "attributes" in dataframe.attrs
+                and "save_points_cloud_as_csv" in dataframe.attrs["attributes"]
+                and dataframe.attrs["attributes"]["save_points_cloud_as_csv"]
+            )
+            or "attributes" not in dataframe.attrs
+            or "save_points_cloud_as_csv" not in dataframe.attrs["attributes"]
+        ):
+            if overwrite and os.path.exists(csv_file_name):
+                os.remove(csv_file_name)
+            current_writer.write_csv(dataframe, csv_file_name)
+
+        # Save panda dataframe to npy
+        if (
             "attributes" in dataframe.attrs
-            and "save_points_cloud_as_csv" in dataframe.attrs["attributes"]
-            and dataframe.attrs["attributes"]["save_points_cloud_as_csv"]
-        )
-        or "attributes" not in dataframe.attrs
-        or "save_points_cloud_as_csv" not in dataframe.attrs["attributes"]
-    ):
-        _, extension = os.path.splitext(file_name)
-        if "csv" not in extension:
-            file_name = file_name + ".csv"
-        if overwrite and os.path.exists(file_name):
-            dataframe.to_csv(file_name, index=False)
-        else:
-            if os.path.exists(file_name):
-                # merge files
-                existing_dataframe = pandas.read_csv(file_name)
-                merged_dataframe = pandas.concat(
-                    [existing_dataframe, dataframe],
-                    ignore_index=True,
-                    sort=False,
-                )
-                merged_dataframe.to_csv(file_name, index=False)
-
-            else:
-                dataframe.to_csv(file_name, index=False)
+            and "save_points_cloud_as_npy" in dataframe.attrs["attributes"]
+            and dataframe.attrs["attributes"]["save_points_cloud_as_npy"]
+        ):
+            if overwrite and os.path.exists(npy_file_name):
+                os.remove(npy_file_name)
+            current_writer.write_npy(dataframe, npy_file_name)
 
 
 def save_dataset(
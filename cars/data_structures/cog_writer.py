@@ -0,0 +1,382 @@
+#!/usr/bin/env python
+# coding: utf8
+#
+# Copyright (c) 2020 Centre National d'Etudes Spatiales (CNES).
+#
+# This file is part of CARS
+# (see https://github.com/CNES/cars).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+cog_writer module:
+
+Write rasters tile by tile to a Cloud Optimized GeoTIFF (COG).
+Tiles are written to an internally tiled GeoTIFF aligned
+to the tiling grid, and decimated to one GeoTIFF per overview level as
+they arrive. On close, the COG is created from these files, overviews
+being copied instead of computed again.
+"""
+
+# Standard imports
+import os
+import shutil
+import tempfile
+from xml.sax.saxutils import escape
+
+# Third party imports
+import numpy as np
+import rasterio as rio
+import rasterio.shutil
+from affine import Affine
+from rasterio.dtypes import dtype_rev, typename_fwd
+from rasterio.windows import Window
+
+# Block size of COG, also used to choose the overview levels
+COG_BLOCK_SIZE = 512
+# Minimum block size of temporary GeoTIFF, aligned to the tiling grid
+MIN_BLOCK_SIZE = 16
+# Compression of COG, with predictor
+COG_COMPRESSION = "DEFLATE"
+
+
+class CogWriter:
+    """
+    Write tiles to a COG, with the rasterio dataset methods used to
+    save CarsDataset tiles. Overviews are decimated with nearest neighbour,
+    so that each overview pixel only depends on one tile, whatever the
+    order of arrival of tiles.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        profile: dict,
+        tiling_grid: np.ndarray = None,
+        block_size: int = COG_BLOCK_SIZE,
+    ):
+        """
+        Init function of CogWriter.
+        Temporary files are created next to the COG
+
+        :param file_name: COG file name
+        :type file_name: str
+        :param profile: rasterio profile of COG
+        :type profile: dict
+        :param tiling_grid: tiling grid in pixels of written tiles
+        :type tiling_grid: np.ndarray
+        :param block_size: block size of COG
+        :type block_size: int
+        """
+        self.file_name = file_name
+        self.block_size = block_size
+        self.band_descriptions = {}
+
+        self.tmp_dir = tempfile.mkdtemp(
+            prefix=".{}.".format(os.path.basename(file_name)),
+            dir=os.path.dirname(os.path.abspath(file_name)),
+        )
+
+        tmp_block_size = get_block_size(tiling_grid, block_size)
+        tmp_profile = dict(profile)
+        tmp_profile.update(
+            {
+                "driver": "GTiff",
+                "tiled": True,
+                "blockxsize": tmp_block_size,
+                "blockysize": tmp_block_size,
+                "compress": None,
+                "interleave": "band",
+                "BIGTIFF": "IF_SAFER",
+            }
+        )
+        self.descriptor = rio.open(
+            os.path.join(self.tmp_dir, "full_res.tif"), "w", **tmp_profile
+        )
+
+        # one GeoTIFF per overview level
+        self.overview_factors = get_overview_factors(
+            self.descriptor.width, self.descriptor.height, block_size
+        )
+        self.overview_descriptors = []
+        for factor in self.overview_factors:
+            tmp_profile["width"] = -(-self.descriptor.width // factor)
+            tmp_profile["height"] = -(-self.descriptor.height // factor)
+            tmp_profile["transform"] = self.descriptor.transform * (
+                Affine.scale(factor)
+            )
+            self.overview_descriptors.append(
+                rio.open(
+                    os.path.join(self.tmp_dir, "ovr_{}.tif".format(factor)),
+                    "w",
+                    **tmp_profile,
+                )
+            )
+
+    def __enter__(self):
+        """
+        Function run on enter
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback_msg):
+        """
+        Function run on exit, create COG
+        """
+        self.close()
+
+    @property
+    def dtypes(self):
+        """
+        Data types of bands
+        """
+        return self.descriptor.dtypes
+
+    @property
+    def nodata(self):
+        """
+        No data value
+        """
+        return self.descriptor.nodata
+
+    def set_band_description(self, bidx: int, value: str):
+        """
+        Set description of band
+
+        :param bidx: band index, starting from 1
+        :type bidx: int
+        :param value: description
+        :type value: str
+        """
+        self.band_descriptions[bidx] = value
+
+    def write_band(self, bidx: int, data: np.ndarray, window: Window = None):
+        """
+        Write band tile
+
+        :param bidx: band index, starting from 1
+        :type bidx: int
+        :param data: band data
+        :type data: np.ndarray
+        :param window: window of tile, whole raster if None
+        :type window: rasterio.windows.Window
+        """
+        self.write(data, indexes=bidx, window=window)
+
+    def write(self, data: np.ndarray, indexes=None, window: Window = None):
+        """
+        Write tile, and its decimation to overviews
+
+        :param data: tile data, 2D if indexes is a band index, 3D otherwise
+        :type data: np.ndarray
+        :param indexes: band index or list of bands indexes, all if None
+        :param window: window of tile, whole raster if None
+        :type window: rasterio.windows.Window
+        """
+        self.descriptor.write(data, indexes, window=window)
+
+        if window is None:
+            window = Window(0, 0, self.descriptor.width, self.descriptor.height)
+        row_off, col_off = int(window.row_off), int(window.col_off)
+
+        for factor, overview in zip(  # noqa: B905
+            self.overview_factors, self.overview_descriptors
+        ):
+            first_row, rows = get_decimated_indexes(
+                row_off, data.shape[-2], factor, self.descriptor.height
+            )
+            first_col, cols = get_decimated_indexes(
+                col_off, data.shape[-1], factor, self.descriptor.width
+            )
+            if rows.size > 0 and cols.size > 0:
+                overview.write(
+                    data[..., rows[:, np.newaxis], cols[np.newaxis, :]],
+                    indexes,
+                    window=Window(first_col, first_row, cols.size, rows.size),
+                )
+
+    def close(self):
+        """
+        Close temporary files, create COG and remove temporary files
+        """
+        if self.descriptor is None:
+            return
+
+        for descriptor in [self.descriptor] + self.overview_descriptors:
+            descriptor.close()
+
+        vrt_file_name = os.path.join(self.tmp_dir, "cog.vrt")
+        with open(vrt_file_name, "w", encoding="utf-8") as vrt_file:
+            vrt_file.write(self.get_vrt())
+
+        rasterio.shutil.copy(
+            vrt_file_name,
+            self.file_name,
+            driver="COG",
+            COMPRESS=COG_COMPRESSION,
+            PREDICTOR="YES",
+            BLOCKSIZE=self.block_size,
+            OVERVIEWS="FORCE_USE_EXISTING",
+            BIGTIFF="IF_SAFER",
+        )
+
+        shutil.rmtree(self.tmp_dir)
+        self.descriptor = None
+        self.overview_descriptors = []
+
+    def get_vrt(self) -> str:
+        """
+        Get VRT of full resolution GeoTIFF, with the overviews GeoTIFF
+        as overviews
+
+        :return: VRT xml
+        :rtype: str
+        """
+        descriptor = self.descriptor
+        lines = [
+            '<VRTDataset rasterXSize="{}" rasterYSize="{}">'.format(
+                descriptor.width, descriptor.height
+            )
+        ]
+        if descriptor.crs is not None:
+            lines.append("<SRS>{}</SRS>".format(escape(descriptor.crs.wkt)))
+        if not descriptor.transform.is_identity:
+            lines.append(
+                "<GeoTransform>{}</GeoTransform>".format(
+                    ", ".join(map(repr, descriptor.transform.to_gdal()))
+                )
+            )
+
+        for bidx, dtype in enumerate(descriptor.dtypes, start=1):
+            lines.append(
+                '<VRTRasterBand dataType="{}" band="{}">'.format(
+                    typename_fwd[dtype_rev[dtype]], bidx
+                )
+            )
+            if descriptor.nodata is not None:
+                lines.append(
+                    "<NoDataValue>{}</NoDataValue>".format(descriptor.nodata)
+                )
+            if bidx in self.band_descriptions:
+                lines.append(
+                    "<Description>{}</Description>".format(
+                        escape(self.band_descriptions[bidx])
+                    )
+                )
+            lines.append(
+                "<SimpleSource><SourceFilename relativeToVRT="
+                '"1">full_res.tif</SourceFilename>'
+                "<SourceBand>{}</SourceBand></SimpleSource>".format(bidx)
+            )
+            for factor in self.overview_factors:
+                lines.append(
+                    "<Overview><SourceFilename relativeToVRT="
+                    '"1">ovr_{}.tif</SourceFilename>'
+                    "<SourceBand>{}</SourceBand></Overview>".format(
+                        factor, bidx
+                    )
+                )
+            lines.append("</VRTRasterBand>")
+
+        lines.append("</VRTDataset>")
+        return "\n".join(lines)
+
+
+def get_block_size(
+    tiling_grid: np.ndarray, block_size: int = COG_BLOCK_SIZE
+) -> int:
+    """
+    Get largest power of two block size, not greater than block_size,
+    dividing the tiles of the tiling grid, so that each tile is written
+    to whole blocks. block_size is returned if none is found.
+
+    :param tiling_grid: tiling grid in pixels: row_min, row_max,
+        col_min, col_max of each tile
+    :type tiling_grid: np.ndarray
+    :param block_size: maximum block size
+    :type block_size: int
+
+    :return: block size
+    :rtype: int
+    """
+    if tiling_grid is None:
+        return block_size
+
+    tiles_starts = np.concatenate(
+        [
+            np.ravel(tiling_grid[:, :, 0] - np.min(tiling_grid[:, :, 0])),
+            np.ravel(tiling_grid[:, :, 2] - np.min(tiling_grid[:, :, 2])),
+        ]
+    )
+    tiles_gcd = np.gcd.reduce(np.round(tiles_starts).astype(np.int64))
+
+    aligned_block_size = block_size
+    while aligned_block_size >= MIN_BLOCK_SIZE:
+        if tiles_gcd % aligned_block_size == 0:
+            return aligned_block_size
+        aligned_block_size //= 2
+
+    return block_size
+
+
+def get_overview_factors(width: int, height: int, block_size: int) -> list:
+    """
+    Get decimation factors of overviews, until an overview fits in a block
+
+    :param width: raster width
+    :type width: int
+    :param height: raster height
+    :type height: int
+    :param block_size: block size
+    :type block_size: int
+
+    :return: decimation factors, powers of two
+    :rtype: list
+    """
+    factors = []
+    factor = 2
+    while -(-max(width, height) // (factor // 2)) > block_size:
+        factors.append(factor)
+        factor *= 2
+    return factors
+
+
+def get_decimated_indexes(start: int, size: int, factor: int, full_size: int):
+    """
+    Get overview pixels whose full resolution pixel, the nearest to their
+    center, is in [start, start + size[
+
+    :param start: first full resolution pixel
+    :type start: int
+    :param size: number of full resolution pixels
+    :type size: int
+    :param factor: decimation factor
+    :type factor: int
+    :param full_size: full resolution raster size
+    :type full_size: int
+
+    :return: first overview pixel, and full resolution pixels of overview
+        pixels, relative to start
+    :rtype: int, np.ndarray
+    """
+    sources = np.minimum(
+        np.arange(-(-full_size // factor)) * factor + factor // 2,
+        full_size - 1,
+    )
+    overview_indexes = np.flatnonzero(
+        (sources >= start) & (sources < start + size)
+    )
+    if overview_indexes.size == 0:
+        return 0, overview_indexes
+
+    return int(overview_indexes[0]), sources[overview_indexes] - start
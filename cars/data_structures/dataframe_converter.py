@@ -21,11 +21,22 @@
 """
 Contains function to convert the point cloud dataframe to laz format:
 """
+import logging
+
 import laspy
-import laspy.file
-import laspy.header
 import numpy as np
 
+# laz coordinates scale, in meters
+LAZ_SCALE_FACTOR = 0.01
+# Number of points converted and written at once
+LAZ_CHUNK_SIZE = 1000000
+# Maximum length of laz extra dimensions names
+LAZ_EXTRA_DIM_MAX_LENGTH = 32
+
+# point cloud columns saved in laz
+LAZ_COORDINATES = {"x": "X", "y": "Y", "z": "Z"}
+LAZ_COLORS = {"clr0": "red", "clr1": "green", "clr2": "blue"}
+
 
 def utm_epsg_to_proj(epsg: int):
     """
@@ -40,77 +51,123 @@ def utm_epsg_to_proj(epsg: int):
     return f"+proj=utm +zone={zone}{south} +datum=WGS84 +units=m +no_defs"
 
 
-def convert_pcl_to_laz(point_clouds, output_filename: str):
+def is_laz_extra_dim(name) -> bool:
     """
-    Convert 3d point cloud to laz format
+    Check if point cloud column is saved as a laz extra dimension:
+    mask, classification and confidence columns
+
+    :param name: column name
+    :return: True if column is an extra dimension
+    """
+    return isinstance(name, str) and (
+        name == "msk" or name.startswith("classif") or "confidence" in name
+    )
+
+
+def create_laz_header(point_clouds) -> laspy.LasHeader:
+    """
+    Create laz header for point cloud dataframe, with point format 2
+    (coordinates and colors) and one extra dimension per mask,
+    classification and confidence column
+
     :param point_clouds: point_clouds dataframe
-    :param output_filename: output laz filename (with naming convention)
-    :return: the list of point cloud save in las format
+    :return: laz header
     """
-    # Create laz image
     header = laspy.LasHeader(point_format=2)
-    scale_factor = 0.01
-    header.scales = [scale_factor, scale_factor, scale_factor]
-    laz = laspy.LasData(header)
-
-    # get all layer : X, Y, Z and color
-    band_index = {"X": 0, "Y": 1, "Z": 2}
-    input_color_index = {"clr0": 0, "clr1": 1, "clr2": 2}
-    las_color_index = {"red": 0, "green": 1, "blue": 2}
-    arrays_pcl = None
-    arrays_color = None
-    color_type = point_clouds.attrs["attributes"]["color_type"]
-    nb_color = 0
-    for name in point_clouds.columns:
-        if name in ["clr0", "clr1", "clr2"]:
-            nb_color += 1
-
-    for name in point_clouds.columns:
-        # get coordinates bands
-        if name in ["x", "y", "z"]:
-            array = point_clouds[name].to_numpy()
-            # first step : define np.ndarray to contains the arrays X,Y,Z
-            if arrays_pcl is None:
-                arrays_pcl = np.ndarray((3, array.reshape(-1).T.shape[0]))
-            # get only valid pixels
-            array = array.reshape(-1).T
-
-            # get layer into np.ndarray (laspy accept only XYZ in upper case)
-            arrays_pcl[band_index[name.upper()]] = array
-        elif name in ["clr0", "clr1", "clr2"]:
-            array = point_clouds[name].to_numpy()
-            if arrays_color is None:
-                arrays_color = np.ndarray((3, array.reshape(-1).T.shape[0]))
-            array = array.reshape(-1).T
-            maxi = 65535
-            if color_type:
-                if np.issubdtype(np.dtype(color_type), np.integer):
-                    maxi = np.min([maxi, np.iinfo(np.dtype(color_type)).max])
-            array[array >= maxi] = maxi
-            array[array <= 0] = 0
-
-            arrays_color[input_color_index[name]] = array
-            if nb_color == 1:
-                arrays_color[1] = array
-                arrays_color[2] = array
+    header.scales = [LAZ_SCALE_FACTOR, LAZ_SCALE_FACTOR, LAZ_SCALE_FACTOR]
 
-    # fill X,Y,Z into laspy structure, convert to cm
-    scale_multiplicator = 1 / scale_factor
-    for layer_index in range(arrays_pcl.shape[0]):
-        setattr(
-            laz,
-            [k for k, v in band_index.items() if v == layer_index][0],
-            scale_multiplicator * arrays_pcl[layer_index],
-        )
-    if arrays_color is not None:
-        for color_index in range(arrays_color.shape[0]):
-            setattr(
-                laz,
-                [k for k, v in las_color_index.items() if v == color_index][0],
-                arrays_color[color_index],
+    for name, column in point_clouds.items():
+        if not is_laz_extra_dim(name):
+            continue
+        if len(name) > LAZ_EXTRA_DIM_MAX_LENGTH:
+            logging.warning(
+                "{} name is too long to be saved in laz".format(name)
             )
-    laz.write(output_filename)
-    # dump prj file
-    proj = utm_epsg_to_proj(point_clouds.attrs["attributes"]["epsg"])
+            continue
+        # laz has no boolean type
+        dtype = np.uint8 if column.dtype == bool else column.dtype
+        header.add_extra_dim(laspy.ExtraBytesParams(name, dtype))
+
+    return header
+
+
+def convert_pcl_to_laz_points(
+    point_clouds, header: laspy.LasHeader, start: int = 0, end: int = None
+):
+    """
+    Convert lines of 3d point cloud to laz points.
+    Colors are clipped to color type range.
+
+    :param point_clouds: point_clouds dataframe
+    :param header: laz header, created with create_laz_header
+    :param start: first line to convert
+    :param end: last line to convert, excluded, None for last line
+    :return: laz points
+    :rtype: laspy.ScaleAwarePointRecord
+    """
+    chunk = point_clouds.iloc[start:end]
+    points = laspy.ScaleAwarePointRecord.zeros(chunk.shape[0], header=header)
+
+    # fill X,Y,Z into laspy structure, convert to cm
+    scale_multiplicator = 1 / LAZ_SCALE_FACTOR
+    for name, las_name in LAZ_COORDINATES.items():
+        if name in chunk:
+            points[las_name] = scale_multiplicator * chunk[name].to_numpy()
+
+    maxi = 65535
+    color_type = point_clouds.attrs["attributes"]["color_type"]
+    if color_type:
+        if np.issubdtype(np.dtype(color_type), np.integer):
+            maxi = np.min([maxi, np.iinfo(np.dtype(color_type)).max])
+    colors = [name for name in LAZ_COLORS if name in chunk]
+    for name in colors:
+        color = np.clip(chunk[name].to_numpy(), 0, maxi)
+        if len(colors) == 1:
+            for las_name in LAZ_COLORS.values():
+                points[las_name] = color
+        else:
+            points[LAZ_COLORS[name]] = color
+
+    for name in header.point_format.extra_dimension_names:
+        if name in chunk:
+            points[name] = chunk[name].to_numpy()
+
+    return points
+
+
+def write_laz_prj(output_filename: str, epsg: int):
+    """
+    Write projection file of laz file
+
+    :param output_filename: laz file name
+    :param epsg: EPSG code of points
+    """
+    proj = utm_epsg_to_proj(epsg)
     with open(output_filename + ".prj", "w", encoding="utf8") as file_prj:
         file_prj.write(proj)
+
+
+def convert_pcl_to_laz(
+    point_clouds, output_filename: str, laz_backend: laspy.LazBackend = None
+):
+    """
+    Convert 3d point cloud to laz format, chunk by chunk
+    :param point_clouds: point_clouds dataframe
+    :param output_filename: output laz filename (with naming convention)
+    :param laz_backend: laz compression backend, None to use the first
+        available one: LazrsParallel compresses with several threads
+    :return: the list of point cloud save in las format
+    """
+    header = create_laz_header(point_clouds)
+    with laspy.open(
+        output_filename, mode="w", header=header, laz_backend=laz_backend
+    ) as laz_writer:
+        for start in range(0, point_clouds.shape[0], LAZ_CHUNK_SIZE):
+            # pylint: disable=no-member
+            laz_writer.write_points(
+                convert_pcl_to_laz_points(
+                    point_clouds, header, start, start + LAZ_CHUNK_SIZE
+                )
+            )
+    # dump prj file
+    write_laz_prj(output_filename, point_clouds.attrs["attributes"]["epsg"])
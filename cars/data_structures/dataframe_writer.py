@@ -0,0 +1,477 @@
+#!/usr/bin/env python
+# coding: utf8
+#
+# Copyright (c) 2020 Centre National d'Etudes Spatiales (CNES).
+#
+# This file is part of CARS
+# (see https://github.com/CNES/cars).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+dataframe_writer module:
+
+Append points clouds dataframes to files, tile after tile, instead of
+reading, merging and rewriting the whole files for each tile.
+Supported formats are csv, npy (structured array, one field per column)
+and laz.
+"""
+
+# Standard imports
+import logging
+import os
+import struct
+from collections import OrderedDict
+
+# Third party imports
+import laspy
+import numpy as np
+import pandas
+
+# CARS imports
+from cars.data_structures import dataframe_converter
+
+# Maximum number of files kept open by a writer
+MAX_OPEN_FILES = 64
+
+# npy format 1.0 magic string, followed by header length on 2 bytes
+NPY_MAGIC = np.lib.format.magic(1, 0)
+# npy header length, header included, is a multiple of this alignment
+NPY_ALIGNMENT = 64
+
+
+class DataframeWriter:
+    """
+    Append dataframes to csv, npy and laz files.
+    Csv and npy files are closed only when too many are open, and on close.
+    Laz files stay open until close.
+    """
+
+    def __init__(self, max_open_files=MAX_OPEN_FILES, laz_backend=None):
+        """
+        Init function of DataframeWriter
+
+        :param max_open_files: maximum number of csv and npy files kept open
+        :type max_open_files: int
+        :param laz_backend: laz compression backend, None to use the first
+            available one: LazrsParallel compresses with several threads
+        :type laz_backend: laspy.LazBackend
+        """
+        self.max_open_files = max_open_files
+        self.laz_backend = laz_backend
+        # appenders indexed by file name
+        self.appenders = {}
+        # opened appenders, least recently used first
+        self.open_appenders = OrderedDict()
+        # laz appenders indexed by file name
+        self.laz_appenders = {}
+
+    def __enter__(self):
+        """
+        Function run on enter
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback_msg):
+        """
+        Function run on exit, close files
+        """
+        self.close()
+
+    def get_appender(self, file_name, appender_class):
+        """
+        Get opened appender of file, created if needed
+
+        :param file_name: file name
+        :type file_name: str
+        :param appender_class: CsvAppender or NpyAppender
+
+        :return: opened appender
+        """
+        if file_name in self.open_appenders:
+            self.open_appenders.move_to_end(file_name)
+            return self.open_appenders[file_name]
+
+        if file_name not in self.appenders:
+            self.appenders[file_name] = appender_class(file_name)
+        appender = self.appenders[file_name]
+
+        # close least recently used files
+        while len(self.open_appenders) >= self.max_open_files:
+            self.open_appenders.popitem(last=False)[1].close()
+
+        appender.open()
+        self.open_appenders[file_name] = appender
+
+        return appender
+
+    def write_csv(self, dataframe: pandas.DataFrame, file_name: str):
+        """
+        Append dataframe to csv file
+
+        :param dataframe: dataframe to append
+        :type dataframe: pandas.DataFrame
+        :param file_name: csv file name
+        :type file_name: str
+        """
+        self.get_appender(file_name, CsvAppender).append(dataframe)
+
+    def write_npy(self, dataframe: pandas.DataFrame, file_name: str):
+        """
+        Append dataframe to npy file
+
+        :param dataframe: dataframe to append
+        :type dataframe: pandas.DataFrame
+        :param file_name: npy file name
+        :type file_name: str
+        """
+        self.get_appender(file_name, NpyAppender).append(dataframe)
+
+    def write_laz(self, dataframe: pandas.DataFrame, file_name: str):
+        """
+        Append dataframe to laz file
+
+        :param dataframe: dataframe to append
+        :type dataframe: pandas.DataFrame
+        :param file_name: laz file name
+        :type file_name: str
+        """
+        if file_name not in self.laz_appenders:
+            self.laz_appenders[file_name] = LazAppender(
+                file_name, laz_backend=self.laz_backend
+            )
+        self.laz_appenders[file_name].append(dataframe)
+
+    def close(self):
+        """
+        Close all files
+        """
+        for appender in self.appenders.values():
+            appender.close()
+        self.appenders.clear()
+        self.open_appenders.clear()
+        for appender in self.laz_appenders.values():
+            appender.close()
+        self.laz_appenders.clear()
+
+
+class CsvAppender:
+    """
+    Append dataframes to a csv file, header written once
+    """
+
+    def __init__(self, file_name: str):
+        """
+        Init function of CsvAppender.
+        Lines are appended to the file if it already exists
+
+        :param file_name: csv file name
+        :type file_name: str
+        """
+        self.file_name = file_name
+        self.handle = None
+        self.columns = None
+        if os.path.exists(file_name) and os.path.getsize(file_name) > 0:
+            self.columns = list(pandas.read_csv(file_name, nrows=0).columns)
+
+    def open(self):
+        """
+        Open file, in append mode
+        """
+        if self.handle is None:
+            # pylint: disable=consider-using-with
+            self.handle = open(
+                self.file_name, "a", newline="", encoding="utf-8"
+            )
+
+    def close(self):
+        """
+        Close file
+        """
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+    def append(self, dataframe: pandas.DataFrame):
+        """
+        Append dataframe lines to csv file.
+        If columns differ from the written ones, the file is merged
+        with the dataframe and rewritten
+
+        :param dataframe: dataframe to append
+        :type dataframe: pandas.DataFrame
+        """
+        if self.columns is None:
+            dataframe.to_csv(self.handle, index=False)
+            self.columns = list(dataframe.columns)
+        elif sorted(dataframe.columns) == sorted(self.columns):
+            dataframe.to_csv(
+                self.handle, index=False, header=False, columns=self.columns
+            )
+        else:
+            self.close()
+            merged_dataframe = pandas.concat(
+                [pandas.read_csv(self.file_name), dataframe],
+                ignore_index=True,
+                sort=False,
+            )
+            merged_dataframe.to_csv(self.file_name, index=False)
+            self.columns = list(merged_dataframe.columns)
+            self.open()
+
+
+class NpyAppender:
+    """
+    Append dataframes to a npy file, storing a structured array with
+    one field per column. The header, sized for any number of lines,
+    is updated in place on close.
+    """
+
+    def __init__(self, file_name: str):
+        """
+        Init function of NpyAppender.
+        Lines are appended to the file if it already exists
+
+        :param file_name: npy file name
+        :type file_name: str
+        """
+        self.file_name = file_name
+        self.handle = None
+        self.dtype = None
+        self.nb_rows = 0
+        self.header_size = None
+
+        if os.path.exists(file_name) and os.path.getsize(file_name) > 0:
+            existing_array = np.load(file_name, mmap_mode="r")
+            self.dtype = existing_array.dtype
+            self.nb_rows = existing_array.shape[0]
+            self.header_size = existing_array.offset
+            if self.header_size < get_npy_header_size(self.dtype):
+                # header too small to be updated: rewrite file
+                existing_array = np.array(existing_array)
+                self.header_size = get_npy_header_size(self.dtype)
+                with open(file_name, "wb") as handle:
+                    write_npy_header(
+                        handle, self.dtype, self.nb_rows, self.header_size
+                    )
+                    handle.write(existing_array.tobytes())
+
+    def open(self):
+        """
+        Open file, at its end
+        """
+        # pylint: disable=consider-using-with
+        if self.handle is None and self.dtype is None:
+            self.handle = open(self.file_name, "wb")
+        elif self.handle is None:
+            self.handle = open(self.file_name, "r+b")
+            self.handle.seek(0, os.SEEK_END)
+
+    def close(self):
+        """
+        Update header with current number of lines and close file
+        """
+        if self.handle is not None:
+            if self.dtype is not None:
+                write_npy_header(
+                    self.handle, self.dtype, self.nb_rows, self.header_size
+                )
+            self.handle.close()
+            self.handle = None
+
+    def append(self, dataframe: pandas.DataFrame):
+        """
+        Append dataframe lines to npy file
+
+        :param dataframe: dataframe to append, with the columns of the
+            first appended dataframe
+        :type dataframe: pandas.DataFrame
+        """
+        if self.dtype is None:
+            self.dtype = np.dtype(
+                [
+                    (str(name), column.dtype)
+                    for name, column in dataframe.items()
+                ]
+            )
+            if self.dtype.hasobject:
+                raise TypeError(
+                    "Only numerical columns can be saved to npy: {}".format(
+                        self.file_name
+                    )
+                )
+            self.header_size = get_npy_header_size(self.dtype)
+            write_npy_header(self.handle, self.dtype, 0, self.header_size)
+
+        if sorted(map(str, dataframe.columns)) != sorted(self.dtype.names):
+            raise ValueError(
+                "Columns {} differ from the ones saved in {}: {}".format(
+                    list(dataframe.columns), self.file_name, self.dtype.names
+                )
+            )
+
+        records = np.empty(dataframe.shape[0], dtype=self.dtype)
+        for name, column in dataframe.items():
+            records[str(name)] = column.to_numpy()
+
+        self.handle.write(records.tobytes())
+        self.nb_rows += records.shape[0]
+
+
+class LazAppender:
+    """
+    Append dataframes to a laz file, chunk by chunk.
+    The laz header, extra dimensions included, is defined by the first
+    dataframe: extra dimensions of next dataframes not in header are not
+    saved, and missing ones are saved as 0.
+    Compressed file can not be reopened to append points.
+    """
+
+    def __init__(self, file_name: str, laz_backend: laspy.LazBackend = None):
+        """
+        Init function of LazAppender.
+        File is created, with its projection file, on first append
+
+        :param file_name: laz file name
+        :type file_name: str
+        :param laz_backend: laz compression backend
+        :type laz_backend: laspy.LazBackend
+        """
+        self.file_name = file_name
+        self.laz_backend = laz_backend
+        self.header = None
+        self.laz_writer = None
+
+    def close(self):
+        """
+        Update header with points number and bounds, and close file
+        """
+        if self.laz_writer is not None:
+            self.laz_writer.close()
+            self.laz_writer = None
+
+    def append(self, dataframe: pandas.DataFrame):
+        """
+        Append dataframe points to laz file
+
+        :param dataframe: dataframe to append
+        :type dataframe: pandas.DataFrame
+        """
+        if self.header is None:
+            self.header = dataframe_converter.create_laz_header(dataframe)
+            self.laz_writer = laspy.open(
+                self.file_name,
+                mode="w",
+                header=self.header,
+                laz_backend=self.laz_backend,
+            )
+            dataframe_converter.write_laz_prj(
+                self.file_name, dataframe.attrs["attributes"]["epsg"]
+            )
+        elif self.laz_writer is None:
+            raise RuntimeError("{} is closed".format(self.file_name))
+        else:
+            self.check_extra_dims(dataframe)
+
+        chunk_size = dataframe_converter.LAZ_CHUNK_SIZE
+        for start in range(0, dataframe.shape[0], chunk_size):
+            self.laz_writer.write_points(
+                dataframe_converter.convert_pcl_to_laz_points(
+                    dataframe, self.header, start, start + chunk_size
+                )
+            )
+
+    def check_extra_dims(self, dataframe: pandas.DataFrame):
+        """
+        Warn if the extra dimensions of dataframe differ from the header
+        ones
+
+        :param dataframe: dataframe to append
+        :type dataframe: pandas.DataFrame
+        """
+        extra_dims = {
+            name
+            for name in dataframe.columns
+            if dataframe_converter.is_laz_extra_dim(name)
+            and len(name) <= dataframe_converter.LAZ_EXTRA_DIM_MAX_LENGTH
+        }
+        header_dims = set(self.header.point_format.extra_dimension_names)
+        if extra_dims != header_dims:
+            logging.warning(
+                "Extra dimensions of points appended to {} differ from its "
+                "header: {} not saved, {} saved as 0".format(
+                    self.file_name,
+                    sorted(extra_dims - header_dims),
+                    sorted(header_dims - extra_dims),
+                )
+            )
+
+
+def get_npy_header(dtype: np.dtype, nb_rows: int) -> str:
+    """
+    Get npy header describing a structured array
+
+    :param dtype: array dtype
+    :type dtype: np.dtype
+    :param nb_rows: number of lines of array
+    :type nb_rows: int
+
+    :return: header dictionary representation
+    :rtype: str
+    """
+    return repr(
+        {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": (nb_rows,),
+        }
+    )
+
+
+def get_npy_header_size(dtype: np.dtype) -> int:
+    """
+    Get size of npy header, large enough for any number of lines
+
+    :param dtype: array dtype
+    :type dtype: np.dtype
+
+    :return: header size, magic string included, in bytes
+    :rtype: int
+    """
+    max_header = get_npy_header(dtype, np.iinfo(np.int64).max)
+    # magic string, header length, header and final new line
+    header_size = len(NPY_MAGIC) + 2 + len(max_header) + 1
+    return header_size + (-header_size % NPY_ALIGNMENT)
+
+
+def write_npy_header(handle, dtype: np.dtype, nb_rows: int, header_size: int):
+    """
+    Write npy header, padded to header_size, at the start of file
+
+    :param handle: file opened in binary mode
+    :param dtype: array dtype
+    :type dtype: np.dtype
+    :param nb_rows: number of lines of array
+    :type nb_rows: int
+    :param header_size: header size, magic string included, in bytes
+    :type header_size: int
+    """
+    header_length = header_size - len(NPY_MAGIC) - 2
+    header = get_npy_header(dtype, nb_rows).ljust(header_length - 1) + "\n"
+
+    position = handle.tell()
+    handle.seek(0)
+    handle.write(NPY_MAGIC)
+    handle.write(struct.pack("<H", header_length))
+    handle.write(header.encode("latin1"))
+    handle.seek(max(position, header_size))
@@ -0,0 +1,378 @@
+#!/usr/bin/env python
+# coding: utf8
+#
+# Copyright (c) 2020 Centre National d'Etudes Spatiales (CNES).
+#
+# This file is part of CARS
+# (see https://github.com/CNES/cars).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+tiles_container module:
+
+Store all the tiles of a CarsDataset in a single indexed data file,
+instead of one directory per tile.
+Tiles are pickled without their numpy buffers, which are appended
+to the data file. Uncompressed buffers are memory mapped at reading.
+"""
+
+# Standard imports
+import io
+import lzma
+import os
+import pickle
+import zlib
+from functools import lru_cache
+
+# Third party imports
+import numpy as np
+
+# container names
+CONTAINER_DATA_FILE = "tiles.data"
+CONTAINER_INDEX_FILE = "tiles_index.pickle"
+
+# Buffers offsets alignment in data file, in bytes
+ARRAY_ALIGNMENT = 64
+# Smaller arrays are kept in tile pickle
+ARRAY_MIN_NBYTES = 1024
+# Suffix of files being written, replacing the container files on close
+TMP_SUFFIX = ".tmp"
+# Maximum number of containers kept opened for single tile reading
+READERS_CACHE_SIZE = 8
+
+COMPRESSIONS = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+def is_tiles_container(directory: str) -> bool:
+    """
+    Check if given CarsDataset directory is a tiles container
+
+    :param directory: CarsDataset directory
+    :type directory: str
+
+    :return: True if tiles are stored in container
+    :rtype: bool
+    """
+    return os.path.exists(os.path.join(directory, CONTAINER_INDEX_FILE))
+
+
+def get_reader(directory: str):
+    """
+    Get reader of container, opened once for a given container content
+
+    :param directory: CarsDataset directory
+    :type directory: str
+
+    :return: container reader
+    :rtype: TilesContainerReader
+    """
+    index_stat = os.stat(os.path.join(directory, CONTAINER_INDEX_FILE))
+    return load_reader(
+        os.path.abspath(directory), index_stat.st_ino, index_stat.st_mtime_ns
+    )
+
+
+@lru_cache(maxsize=READERS_CACHE_SIZE)
+def load_reader(
+    directory: str, index_inode: int, index_mtime: int
+):  # pylint: disable=W0613
+    """
+    Open container reader. Index inode and modification time are only
+    used as cache key, to open again a rewritten container
+
+    :param directory: CarsDataset absolute directory
+    :type directory: str
+    :param index_inode: inode of index file
+    :type index_inode: int
+    :param index_mtime: modification time of index file, in ns
+    :type index_mtime: int
+
+    :return: container reader
+    :rtype: TilesContainerReader
+    """
+    return TilesContainerReader(directory)
+
+
+class TilesContainerWriter:
+    """
+    Write tiles to a single indexed data file.
+    Files are written next to the container files, and replace them
+    on close: tiles of a container being rewritten can still be read
+    from its memory mapped data file
+    """
+
+    def __init__(self, directory: str, compression=None):
+        """
+        Init function of TilesContainerWriter
+
+        :param directory: CarsDataset directory
+        :type directory: str
+        :param compression: buffers compression: None, "zlib" or "lzma"
+        :type compression: str
+        """
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(
+                "Compression {} not supported, available: {}".format(
+                    compression, list(COMPRESSIONS)
+                )
+            )
+
+        self.directory = directory
+        self.compression = compression
+        self.index = {"compression": compression, "tiles": {}}
+        self.offset = 0
+        # pylint: disable=consider-using-with
+        self.data_file = open(
+            os.path.join(directory, CONTAINER_DATA_FILE + TMP_SUFFIX), "wb"
+        )
+
+    def __enter__(self):
+        """
+        Function run on enter
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback_msg):
+        """
+        Function run on exit, write index, or remove written files
+        if an exception occurred
+        """
+        if exc_type is not None:
+            self.data_file.close()
+            os.remove(self.data_file.name)
+            return
+        self.close()
+
+    def write_bytes(self, data) -> int:
+        """
+        Append aligned bytes to data file
+
+        :param data: bytes to write
+        :return: offset of written bytes
+        :rtype: int
+        """
+        padding = -self.offset % ARRAY_ALIGNMENT
+        if padding:
+            self.data_file.write(b"\0" * padding)
+            self.offset += padding
+
+        offset = self.offset
+        self.data_file.write(data)
+        self.offset += memoryview(data).nbytes
+
+        return offset
+
+    def write_array(self, array: np.ndarray):
+        """
+        Append array buffer to data file
+
+        :param array: array to write
+        :type array: np.ndarray
+
+        :return: array reference: offset, number of bytes, dtype, shape,
+            order, compression
+        :rtype: tuple
+        """
+        order = "C"
+        if array.flags.f_contiguous and not array.flags.c_contiguous:
+            order = "F"
+        # no copy if array is already contiguous
+        data = (
+            np.require(array, requirements=order).reshape(-1, order=order).data
+        )
+
+        if self.compression is not None:
+            data = COMPRESSIONS[self.compression][0](data)
+
+        offset = self.write_bytes(data)
+
+        return (
+            offset,
+            memoryview(data).nbytes,
+            array.dtype,
+            array.shape,
+            order,
+            self.compression,
+        )
+
+    def write_tile(self, row: int, col: int, tile):
+        """
+        Write tile to container
+
+        :param row: row of tile
+        :param col: col of tile
+        :param tile: tile to save
+        :type tile: xr.Dataset or pd.DataFrame or CarsDict
+        """
+        if tile is None:
+            self.index["tiles"][(row, col)] = None
+            return
+
+        tile_buffer = io.BytesIO()
+        ContainerPickler(tile_buffer, self).dump(tile)
+        skeleton = tile_buffer.getvalue()
+
+        self.index["tiles"][(row, col)] = (
+            self.write_bytes(skeleton),
+            len(skeleton),
+        )
+
+    def close(self):
+        """
+        Close data file, write index and replace container files
+        """
+        if self.data_file.closed:
+            return
+
+        self.data_file.close()
+
+        index_file_name = os.path.join(self.directory, CONTAINER_INDEX_FILE)
+        with open(index_file_name + TMP_SUFFIX, "wb") as handle:
+            pickle.dump(self.index, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(
+            self.data_file.name,
+            os.path.join(self.directory, CONTAINER_DATA_FILE),
+        )
+        os.replace(index_file_name + TMP_SUFFIX, index_file_name)
+
+
+class TilesContainerReader:
+    """
+    Read tiles from a single indexed data file, lazily, tile per tile
+    """
+
+    def __init__(self, directory: str):
+        """
+        Init function of TilesContainerReader
+
+        :param directory: CarsDataset directory
+        :type directory: str
+        """
+        index_file_name = os.path.join(directory, CONTAINER_INDEX_FILE)
+        with open(index_file_name, "rb") as handle:
+            self.index = pickle.load(handle)
+
+        self.data = None
+        data_file_name = os.path.join(directory, CONTAINER_DATA_FILE)
+        if os.path.getsize(data_file_name) > 0:
+            # copy on write: loaded tiles can be modified in memory
+            self.data = np.memmap(data_file_name, dtype=np.uint8, mode="c")
+
+    def read_array(self, reference) -> np.ndarray:
+        """
+        Read array from data file
+
+        :param reference: array reference, given by writer
+
+        :return: array, memory mapped if not compressed
+        :rtype: np.ndarray
+        """
+        offset, nbytes, dtype, shape, order, compression = reference
+        data = self.data[offset : offset + nbytes]
+
+        if compression is None:
+            return np.ndarray(shape, dtype=dtype, buffer=data, order=order)
+
+        # decompressed buffer is writable
+        return np.frombuffer(
+            bytearray(COMPRESSIONS[compression][1](data)), dtype=dtype
+        ).reshape(shape, order=order)
+
+    def read_tile(self, row: int, col: int):
+        """
+        Read tile from container
+
+        :param row: row of tile
+        :param col: col of tile
+
+        :return: tile
+        :rtype: xr.Dataset or pd.DataFrame or CarsDict
+        """
+        tile_position = self.index["tiles"].get((row, col), None)
+        if tile_position is None:
+            return None
+
+        offset, nbytes = tile_position
+        skeleton = self.data[offset : offset + nbytes].tobytes()
+
+        return ContainerUnpickler(io.BytesIO(skeleton), self).load()
+
+
+class ContainerPickler(pickle.Pickler):
+    """
+    Pickler appending numpy buffers to container data file
+    """
+
+    def __init__(self, file, writer):
+        """
+        Init function of ContainerPickler
+
+        :param file: file object to pickle to
+        :param writer: container writer
+        :type writer: TilesContainerWriter
+        """
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.writer = writer
+        self.saved_arrays = {}
+
+    def persistent_id(self, obj):
+        """
+        Write large numpy arrays to data file
+
+        :param obj: object to pickle
+
+        :return: array reference, None if pickled normally
+        """
+        if (
+            not isinstance(obj, np.ndarray)
+            or obj.dtype.hasobject
+            or obj.nbytes < ARRAY_MIN_NBYTES
+        ):
+            return None
+
+        if id(obj) not in self.saved_arrays:
+            self.saved_arrays[id(obj)] = self.writer.write_array(obj)
+
+        return self.saved_arrays[id(obj)]
+
+
+class ContainerUnpickler(pickle.Unpickler):
+    """
+    Unpickler reading numpy buffers from container data file
+    """
+
+    def __init__(self, file, reader):
+        """
+        Init function of ContainerUnpickler
+
+        :param file: file object to unpickle from
+        :param reader: container reader
+        :type reader: TilesContainerReader
+        """
+        super().__init__(file)
+        self.reader = reader
+
+    def persistent_load(self, pid):
+        """
+        Read array from data file
+
+        :param pid: array reference
+
+        :return: array
+        """
+        return self.reader.read_array(pid)
@@ -159,6 +159,17 @@ class AbstractCluster(metaclass=ABCMeta):
 
         return self.checked_conf_cluster
 
+    def get_max_ram_per_worker(self, task_name=None):  # pylint: disable=W0613
+        """
+        Get the memory to use to compute the tile size of tasks
+
+        :param task_name: name of the task function
+        :type task_name: str
+
+        :return: memory per worker in Mb
+        """
+        return self.checked_conf_cluster["max_ram_per_worker"]
+
     def create_task(self, func, nout=1):
         """
         Create task
@@ -191,6 +191,9 @@ class AbstractDaskCluster(abstract_cluster.AbstractCluster):
 
         :param data: task data
         """
+        if isinstance(data, (dict, list, tuple, set)):
+            # scatter container as a single object, not its items
+            return self.client.scatter([data], broadcast=broadcast)[0]
         return self.client.scatter(data, broadcast=broadcast)
 
     def future_iterator(self, future_list):
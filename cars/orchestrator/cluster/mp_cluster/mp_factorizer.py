@@ -19,219 +19,164 @@
 # limitations under the License.
 #
 """
-Contains functions needed to factorize delayed
+Contains functions needed to factorize delayed: a task is fused into
+its consumer when all its outputs are only used by this consumer,
+which depends on no other task. Fused tasks run sequentially in a
+single job, without scheduling nor transfer of intermediate results.
 """
-# No longer supported
-# TODO remove
 
+# Standard imports
 import copy
+import logging
 
 # CARS imports
 from cars.orchestrator.cluster.mp_cluster.mp_objects import MpDelayed
+from cars.orchestrator.cluster.mp_cluster.mp_tools import replace_data_rec
 
 
-def factorize_delayed(task_list):
+class PreviousResult:  # pylint: disable=R0903
     """
-    Factorize Task list
-
-    Only factorize tasks that depends on a single task
-
-    :param task_list: list of delayed
-    :type task_list: list(MpDelayed)
-
+    Reference to an output of the previous function of a factorized task
     """
-    # Compute graph usage
-    graph_usages = compute_graph_delayed_usages(task_list)
-
-    # Factorize delayed
-    already_seen_delayed_tasks = []
-    for delayed in task_list:
-        factorize_delayed_rec(delayed, graph_usages, already_seen_delayed_tasks)
 
+    __slots__ = ["return_index"]
 
-def factorize_delayed_rec(delayed, graph_usages, already_seen_delayed_tasks):
-    """
-    Factorize Task list
+    def __init__(self, return_index):
+        """
+        Init function of PreviousResult
 
-    Only factorize tasks that depends on a single task
+        :param return_index: index of output of previous function
+        """
+        self.return_index = return_index
 
-    :param delayed: delayed to factorize
-    :type delayed: MpDelayed
-    :param graph_usages: number of usages of delayed
-    :type graph_usages: dict
-        example: {delayed1: 3}
-    :param already_seen_delayed_tasks: list of MpDelayedTask already seen
 
+def factorize_delayed(task_list, unfused_task_names=()):
     """
+    Factorize Task list
 
-    # check if current delayed can be factorized
-    depending_delayed = delayed.get_depending_delayed()
-
-    number_depending_task = compute_nb_depending_task(depending_delayed)
-    max_nb_of_usages = 0
-    if len(depending_delayed) > 0:
-        max_nb_of_usages = max(
-            number_of_usage(deld, graph_usages) for deld in depending_delayed
-        )
-
-    current_task = delayed.delayed_task
-
-    if current_task not in already_seen_delayed_tasks:
-        if number_depending_task == 1 and max_nb_of_usages == 1:
-            # We can factorize current delayed with next ones
-
-            #  modify delayed task
-
-            # Get current params
-            # Here we only have one depending task, we can fuse them
-
-            # Modify delayed to "POS"
-            current_fun = current_task.func
-            current_args = current_task.args
-            current_kwargs = current_task.kw_args
-            for index, arg in enumerate(current_args):
-                if isinstance(arg, MpDelayed):
-                    current_args[index] = "POS_" + repr(arg.return_index)
-            for index, kw_arg in enumerate(current_kwargs):
-                if isinstance(kw_arg, MpDelayed):
-                    current_kwargs[index] = "POS_" + repr(kw_arg.return_index)
-
-            # previous_params
-            previous_task = depending_delayed[0].delayed_task
-            previous_fun = previous_task.func
-            previous_args = previous_task.args
-            previous_kwargs = previous_task.kw_args
-
-            # compute new params
-            new_fun, new_args, new_kwargs = generate_args_kwargs_factorize(
-                previous_fun,
-                previous_args,
-                previous_kwargs,
-                current_fun,
-                current_args,
-                current_kwargs,
-            )
-
-            # Modify current task
-            # Task is only used here, nothing else is modified in graph
-            current_task.func = new_fun
-            current_task.args = new_args
-            current_task.kw_args = new_kwargs
-
-            # Factorize again with current
-            factorize_delayed_rec(
-                delayed, graph_usages, already_seen_delayed_tasks
-            )
-
-        else:
-            # Only set to seen when task is completly factorized
-            already_seen_delayed_tasks.append(current_task)
-            # Get new dependances and factorize it
-            depending_delayed = delayed.get_depending_delayed()
-            for new_delayed in depending_delayed:
-                factorize_delayed_rec(
-                    new_delayed, graph_usages, already_seen_delayed_tasks
-                )
-
-
-def compute_graph_delayed_usages(task_list):
-    """
-    Compute the number of times every delayed is used in graph
+    A task is fused into its consumer if all its outputs are used by
+    this consumer only, and if the consumer depends on no other task.
+    Tasks of task_list are never fused into other tasks.
+    Tasks named in unfused_task_names are never fused, so that their
+    peak memory is measured alone.
 
     :param task_list: list of delayed
     :type task_list: list(MpDelayed)
+    :param unfused_task_names: names of tasks not to fuse
+    :type unfused_task_names: iterable(str)
 
-    :return: number of usages of delayed
+    :return: factorization statistics: number of tasks before
+        factorization, number of fused tasks
     :rtype: dict
-        example: {delayed1: 3}
-
-    """
-
-    graph_usages = {}
-
-    already_seen_tasks = []
-
-    for delayed in task_list:
-        get_delayed_usage_rec(delayed, graph_usages, already_seen_tasks)
-
-    return graph_usages
-
-
-def get_delayed_usage_rec(delayed, graph_usages, already_seen_tasks):
-    """
-    Get number of time input delayed is used
-
-    :param delayed: delayed to factorize
-    :type delayed: MpDelayed
-    :param graph_usages: number of usages of delayed
-    :type graph_usages: dict
-        example: {delayed1: 3}
-    :param already_seen_tasks: list of seen delayed task
-    :type already_seen_tasks: list[MpDelayedTask]
-
     """
+    ordered_tasks, inputs, consumers = compute_graph(task_list)
+    output_tasks = {delayed.delayed_task for delayed in task_list}
+
+    nb_fused_tasks = 0
+    # producers are factorized before their consumers
+    for task in ordered_tasks:
+        producers = {delayed.delayed_task for delayed in inputs[task]}
+        if len(producers) != 1:
+            continue
+        producer = producers.pop()
+        if producer in output_tasks or consumers[producer] != {task}:
+            continue
+        if (
+            producer.task_name in unfused_task_names
+            or task.task_name in unfused_task_names
+        ):
+            continue
+
+        fuse_tasks(producer, task)
+        nb_fused_tasks += 1
+
+        # consumer now depends on the inputs of producer
+        inputs[task] = inputs.pop(producer)
+        for delayed in inputs[task]:
+            consumers[delayed.delayed_task].discard(producer)
+            consumers[delayed.delayed_task].add(task)
+
+    stats = {"nb_tasks": len(ordered_tasks), "nb_fused_tasks": nb_fused_tasks}
+    logging.info(
+        "Tasks factorization: {} tasks fused, {} tasks remaining".format(
+            nb_fused_tasks, len(ordered_tasks) - nb_fused_tasks
+        )
+    )
 
-    # update graph_usages
-    if delayed in graph_usages:
-        # + 1
-        graph_usages[delayed] += 1
-    else:
-        graph_usages[delayed] = 1
-
-    # get usage of task inputs, if task was not already seen
-    delayed_task = delayed.delayed_task
-
-    if delayed_task not in already_seen_tasks:
-        # add task to seen
-        already_seen_tasks.append(delayed_task)
-
-        # get usage for all inputs
-        depending_delayed = delayed.get_depending_delayed()
-        for input_delayed in depending_delayed:
-            get_delayed_usage_rec(
-                input_delayed, graph_usages, already_seen_tasks
-            )
+    return stats
 
 
-def number_of_usage(delayed, graph_usages):
+def compute_graph(task_list):
     """
-    Compute the number of times a delayed is used
+    Compute the graph of tasks, with an iterative depth first search
 
-    :param delayed: delayed to factorize
-    :type delayed: MpDelayed
-    :param graph_usages: number of usages of delayed
-    :type graph_usages: dict
-        example: {delayed1: 3}
-
-    :return: number of usages of delayed
-    :rtype: int
+    :param task_list: list of delayed
+    :type task_list: list(MpDelayed)
 
+    :return: tasks ordered with producers before consumers,
+        input delayed of each task, consumer tasks of each task
+    :rtype: list(MpDelayedTask), dict, dict
     """
-
-    nb_usage = graph_usages[delayed]
-
-    return nb_usage
-
-
-def compute_nb_depending_task(depending_delayed_list):
+    ordered_tasks = []
+    inputs = {}
+    consumers = {}
+
+    stack = [(delayed.delayed_task, False) for delayed in reversed(task_list)]
+    while stack:
+        task, inputs_done = stack.pop()
+        if inputs_done:
+            ordered_tasks.append(task)
+            continue
+        if task in inputs:
+            continue
+
+        inputs[task] = task.associated_objects[0].get_depending_delayed()
+        consumers.setdefault(task, set())
+        stack.append((task, True))
+        for delayed in reversed(inputs[task]):
+            consumers.setdefault(delayed.delayed_task, set()).add(task)
+            if delayed.delayed_task not in inputs:
+                stack.append((delayed.delayed_task, False))
+
+    return ordered_tasks, inputs, consumers
+
+
+def fuse_tasks(producer, consumer):
     """
-    Compute the number of different delayed task in list of delayed
-
-    :param depending_delayed_list: list of delayed
-    :type depending_delayed_list: list[MpDelayed]
-
-    :return: number of depending task
-    :rtype: int
+    Fuse producer task into consumer task, modified in place.
+    Fused task is named after both tasks, its memory being measured
+    as a whole
+
+    :param producer: task whose outputs are only used by consumer
+    :type producer: MpDelayedTask
+    :param consumer: task only depending on producer
+    :type consumer: MpDelayedTask
     """
 
-    list_delayed_task = []
-
-    for delayed in depending_delayed_list:
-        delayed_task = delayed.delayed_task
-        if delayed_task not in list_delayed_task:
-            list_delayed_task.append(delayed_task)
-
-    return len(list_delayed_task)
+    def to_previous_result(obj):
+        """
+        Replace MpDelayed by a reference to an output of producer
+        """
+        if isinstance(obj, MpDelayed):
+            return PreviousResult(obj.return_index)
+        return obj
+
+    (
+        consumer.func,
+        consumer.args,
+        consumer.kw_args,
+    ) = generate_args_kwargs_factorize(
+        producer.func,
+        producer.args,
+        producer.kw_args,
+        consumer.func,
+        replace_data_rec(consumer.args, to_previous_result),
+        replace_data_rec(consumer.kw_args, to_previous_result),
+    )
+    if producer.task_name is not None or consumer.task_name is not None:
+        consumer.task_name = "{}+{}".format(
+            producer.task_name, consumer.task_name
+        )
 
 
 # Factorized function and its generator
@@ -240,54 +185,39 @@ def compute_nb_depending_task(depending_delayed_list):
 def factorized_fun(*args, **kwargs):
     """
     This function unpack multiple functions with their arguments,
-    and run them sequentialy
-
+    and run them sequentialy, each one using the results of the
+    previous one
 
+    :return: result of last function
     """
 
-    # get keys
-    # Get fun, args, and clean kwargs
-    next_fun = {}
-    next_funs_keys = []
-
+    # Get functions, and clean kwargs
     current_kwargs = copy.copy(kwargs)
-
-    for key, key_item in kwargs.items():
-        if key.startswith("NEXT_FUN_"):
-            next_funs_keys.append(key)
-            next_fun[key] = key_item
-            current_kwargs.pop(key)
-
-    fun_0 = next_fun["NEXT_FUN_0"]["fun"]
+    next_funs = []
+    for step in range(get_number_of_steps(kwargs)):
+        next_funs.append(current_kwargs.pop("NEXT_FUN_" + repr(step)))
 
     # run first function
-    res = fun_0(*args, **current_kwargs)
+    res = next_funs[0]["fun"](*args, **current_kwargs)
+
+    def get_previous_result(obj, previous_res):
+        """
+        Replace reference to output of previous function by its value
+        """
+        if not isinstance(obj, PreviousResult):
+            return obj
+        if isinstance(previous_res, tuple):
+            return previous_res[obj.return_index]
+        if obj.return_index != 0:
+            raise RuntimeError("waiting multiple output but res is not tuple")
+        return previous_res
 
     # run other functions
-    for i in range(1, len(next_funs_keys)):  # pylint: disable=C0200
-        current_key = "NEXT_FUN_" + repr(i)
-
-        current_fun = next_fun[current_key]["fun"]
-        current_args = next_fun[current_key]["args"]
-        current_kwargs = next_fun[current_key]["kwarg"]
-
-        # replace args computed by previous run
-        for iter_args in range(len(current_args)):  # pylint: disable=C0200
-            if isinstance(current_args[iter_args], str):
-                if "POS_" in current_args[iter_args]:
-                    pos = int(current_args[iter_args].split("_")[1])
-
-                    if isinstance(res, tuple):
-                        current_args[iter_args] = res[pos]
-                    else:
-                        if pos != 0:
-                            raise RuntimeError(
-                                "waiting multiple output but res is not tuple"
-                            )
-                        current_args[iter_args] = res
-
-        # run function
-        res = current_fun(*current_args, **current_kwargs)
+    for next_fun in next_funs[1:]:
+        res = next_fun["fun"](
+            *replace_data_rec(next_fun["args"], get_previous_result, res),
+            **replace_data_rec(next_fun["kwarg"], get_previous_result, res),
+        )
 
     return res
 
@@ -23,8 +23,12 @@ Contains class objects used by multiprocessing cluster
 """
 
 # Standard imports
+import queue
 import threading
 
+# CARS imports
+from cars.orchestrator.cluster.mp_cluster.mp_tools import replace_data_rec
+
 
 class MpJob:  # pylint: disable=R0903
     """
@@ -43,18 +47,20 @@ class MpDelayedTask:  # pylint: disable=R0903
     Delayed task
     """
 
-    def __init__(self, func, args, kw_args):
+    def __init__(self, func, args, kw_args, task_name=None):
         """
         Init function of MpDelayedTask
 
         :param func: function to run
         :param args: args of function
         :param kw_args: kwargs of function
+        :param task_name: name of task, used to estimate its memory
 
         """
         self.func = func
         self.args = args
         self.kw_args = kw_args
+        self.task_name = task_name
         self.associated_objects = []
 
     def __repr__(self):
@@ -156,13 +162,17 @@ class MpDelayed:  # pylint: disable=R0903
 
         depending_delayed = []
 
-        for arg in self.delayed_task.args:
-            if isinstance(arg, MpDelayed):
-                depending_delayed.append(arg)
+        def add_delayed(obj):
+            """
+            Add obj to depending delayed if it is a MpDelayed
+            """
+            if isinstance(obj, MpDelayed):
+                depending_delayed.append(obj)
+            return obj
 
-        for kw_arg in self.delayed_task.kw_args:
-            if isinstance(kw_arg, MpDelayed):
-                depending_delayed.append(kw_arg)
+        # args and kwargs, in nested lists and dicts too
+        replace_data_rec(self.delayed_task.args, add_delayed)
+        replace_data_rec(self.delayed_task.kw_args, add_delayed)
 
         return depending_delayed
 
@@ -189,6 +199,9 @@ class MpFuture:
         self._success = None
         self.return_index = return_index
         self.event = threading.Event()
+        # queues of iterators to put future in when done
+        self.done_queues = []
+        self.lock = threading.Lock()
 
     def cleanup(self):
         """
@@ -231,7 +244,24 @@ class MpFuture:
                 self.result = obj[self.return_index]
         else:
             self.result = obj
-        self.event.set()
+        with self.lock:
+            self.event.set()
+            for done_queue in self.done_queues:
+                done_queue.put(self)
+            self.done_queues = []
+
+    def add_done_queue(self, done_queue):
+        """
+        Put future in queue when done, or now if already done
+
+        :param done_queue: queue of done futures
+        :type done_queue: queue.SimpleQueue
+        """
+        with self.lock:
+            if self.event.is_set():
+                done_queue.put(self)
+            else:
+                self.done_queues.append(done_queue)
 
     def wait(self, timeout=None):
         """
@@ -260,23 +290,27 @@ class MpFuture:
 class MpFutureIterator:
     """
     iterator on multiprocessing.pool.AsyncResult, similar to as_completed
-    Only returns the actual results, delete the future after usage
+    Only returns the actual results, delete the future after usage.
+    Done futures are put in a queue by MpFuture.set: iteration blocks
+    until the next one is done.
     """
 
     def __init__(self, future_list, cluster):
         """
         Init function of MpFutureIterator
 
-        :param future_list: list of futures
+        :param future_list: list of futures, emptied: consumed futures
+            are only referenced by the iterator until returned
 
         """
-        self.future_list = future_list
         self.cluster = cluster
         self.was_killed = False
 
-        # update future list for cleaning
+        self.nb_remaining = len(future_list)
+        self.done_queue = queue.SimpleQueue()
         for future in future_list:
-            self.cluster.cl_future_list.append(future)
+            future.add_done_queue(self.done_queue)
+        future_list.clear()
 
     def __iter__(self):
         """
@@ -290,22 +324,18 @@ class MpFutureIterator:
         Next
 
         """
-        if not self.future_list:
+        if self.nb_remaining == 0:
             raise StopIteration
-        res = None
-        while res is None:
-            for item in self.future_list:
-                if item.ready():
-                    if not item.successful():
-                        raise RuntimeError("Failure in tasks")
-                    res = item
-                    break
-
-        self.future_list.remove(res)
+
+        res = self.done_queue.get()
+        self.nb_remaining -= 1
+        if not res.successful():
+            raise RuntimeError("Failure in tasks")
+
         # transform result (depending on the wrapper)
         transformed_res = self.cluster.wrapper.get_obj(res.get())
 
-        # update future list for cleaning
-        self.cluster.cl_future_list.remove(res)
+        # result can now be cleaned
+        self.cluster.release_future(res)
 
         return transformed_res
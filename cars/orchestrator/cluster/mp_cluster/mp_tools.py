@@ -22,6 +22,19 @@
 Contains tools for multiprocessing
 """
 
+# Standard imports
+import os
+from multiprocessing import freeze_support
+
+# Third party imports
+import numba
+import psutil
+
+# Writing 5 to this file resets the peak resident memory of process (Linux)
+CLEAR_REFS_FILE = "/proc/self/clear_refs"
+# Process status, with its peak resident memory VmHWM (Linux)
+STATUS_FILE = "/proc/self/status"
+
 
 def replace_data_rec(list_or_dict, func_to_apply, *func_args):
     """
@@ -56,3 +69,74 @@ def replace_data_rec(list_or_dict, func_to_apply, *func_args):
         raise TypeError("Function only support list or dict or tuple")
 
     return res
+
+
+def init_worker(nb_threads):
+    """
+    Initialize worker process: numba parallel loops of the worker use
+    at most nb_threads threads, so that the threads of all workers do
+    not exceed the number of cpus
+
+    :param nb_threads: maximum number of numba threads of worker
+    :type nb_threads: int
+    """
+    freeze_support()
+    max_threads = numba.config.NUMBA_NUM_THREADS  # pylint: disable=E1101
+    numba.set_num_threads(max(1, min(nb_threads, max_threads)))
+
+
+def run_task_with_memory(func, args, kw_args):
+    """
+    Run task in worker, and measure the peak resident memory of worker
+    during task
+
+    :param func: function to run
+    :param args: args of function
+    :param kw_args: kwargs of function
+
+    :return: result of function, peak memory in Mb
+    """
+    reset_done = reset_peak_memory()
+    res = func(*args, **kw_args)
+    return res, get_peak_memory(reset_done)
+
+
+def reset_peak_memory():
+    """
+    Reset peak resident memory of current process, on Linux only
+
+    :return: True if peak memory was reset
+    :rtype: bool
+    """
+    try:
+        with open(CLEAR_REFS_FILE, "w", encoding="utf-8") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def get_peak_memory(reset_done=True):
+    """
+    Get peak resident memory of current process since last reset.
+    Current resident memory, given by psutil, is used if peak memory
+    could not be reset or read
+
+    :param reset_done: peak memory was reset
+    :type reset_done: bool
+
+    :return: memory in Mb
+    :rtype: float
+    """
+    if reset_done:
+        try:
+            with open(STATUS_FILE, "r", encoding="utf-8") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        # value in kB
+                        return float(line.split()[1]) / 1000
+        except OSError:
+            pass
+
+    process = psutil.Process(os.getpid())
+    return float(process.memory_info().rss) / 1000000
@@ -21,17 +21,23 @@
 """
 Contains functions for wrapper disk
 """
+# pylint: disable=too-many-lines
 
 # Standard imports
+import hashlib
 import logging
 import os
+import pickle
 import shutil
+import tempfile
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
 from multiprocessing.pool import ThreadPool
 
-import pandas
-
 # Third party imports
+import numpy as np
+import pandas
 import xarray as xr
 
 # CARS imports
@@ -44,6 +50,23 @@ from cars.orchestrator.cluster.mp_cluster.mp_tools import replace_data_rec
 DENSE_NAME = "DenseDO"
 SPARSE_NAME = "SparseDO"
 DICT_NAME = "DictDO"
+SHARED_NAME = "SharedDO"
+SCATTERED_NAME = "ScatteredDO"
+
+# Shared memory objects
+SHARED_MEMORY_DIR = "/dev/shm"
+SHARED_OBJECT_FILE = "object.pickle"
+# Smaller arrays are kept in pickle
+SHARED_ARRAY_MIN_NBYTES = 4096
+# Maximum number of scattered objects kept loaded by each worker
+SCATTERED_CACHE_SIZE = 16
+# Maximum number of dumped results kept in memory by each worker,
+# for the next tasks placed on this worker
+RESULTS_CACHE_SIZE = 4
+
+# Dumped results of current worker kept for a local consumer,
+# by path, oldest first
+results_cache = OrderedDict()
 
 
 class AbstractWrapper(metaclass=ABCMeta):
@@ -87,6 +110,23 @@ class AbstractWrapper(metaclass=ABCMeta):
         :param future_res: future result to clean
         """
 
+    def set_worker_cache_kwargs(  # pylint: disable=W0613
+        self, kwargs, keep_results, released_results
+    ):
+        """
+        Set the key arguments controlling the results kept in memory
+        by the worker running the function. Results are not kept
+        by default
+
+        :param kwargs: overloaded key arguments
+        :param keep_results: keep results for a job queued on the worker
+        :param released_results: results kept by the worker, not used
+            anymore
+
+        :return: overloaded key arguments
+        """
+        return kwargs
+
 
 class WrapperNone(AbstractWrapper):
     """
@@ -223,6 +263,22 @@ class WrapperDisk(AbstractWrapper):
 
         return new_func, new_kwargs
 
+    def set_worker_cache_kwargs(self, kwargs, keep_results, released_results):
+        """
+        Set the key arguments controlling the results kept in memory
+        by the worker running the function
+
+        :param kwargs: overloaded key arguments
+        :param keep_results: keep results for a job queued on the worker
+        :param released_results: results kept by the worker, not used
+            anymore
+
+        :return: overloaded key arguments
+        """
+        kwargs["keep_results"] = keep_results
+        kwargs["released_results"] = released_results
+        return kwargs
+
     def get_obj(self, obj):
         """
         Get Object
@@ -235,6 +291,103 @@ class WrapperDisk(AbstractWrapper):
         return res
 
 
+class WrapperSharedMemory(AbstractWrapper):
+
+    """
+    WrapperSharedMemory
+
+    Numpy buffers of results are written in memory mapped files
+    in shared memory (/dev/shm), only their paths are sent between
+    processes. Arrays are mapped in the next worker without copy.
+    """
+
+    def __init__(self, tmp_dir):
+        """
+        Init function of WrapperSharedMemory
+        :param tmp_dir: temporary directory, used if no shared memory
+            file system is available
+        """
+        shared_dir = tmp_dir
+        if os.path.isdir(SHARED_MEMORY_DIR):
+            shared_dir = SHARED_MEMORY_DIR
+        self.tmp_dir = tempfile.mkdtemp(prefix="cars_mp_", dir=shared_dir)
+
+        self.current_object_id = 0
+
+        # Create a thead pool for removing data
+        self.removing_pool = ThreadPool(1)
+
+    def cleanup(self):
+        """
+        Cleanup tmp_dir
+        """
+
+        logging.info("Clean removing thread pool ...")
+        self.removing_pool.close()
+        self.removing_pool.join()
+
+        logging.info("Clean shared memory directory ...")
+        removing_disk_data(self.tmp_dir)
+
+    def cleanup_future_res(self, future_res):
+        """
+        Cleanup future result
+
+        :param future_res: future result to clean
+        """
+
+        if isinstance(future_res, tuple):
+            for future_res_i in future_res:
+                if is_shared_object(future_res_i):
+                    self.removing_pool.apply_async(
+                        removing_disk_data, args=[future_res_i]
+                    )
+
+        else:
+            if is_shared_object(future_res):
+                self.removing_pool.apply_async(
+                    removing_disk_data, args=[future_res]
+                )
+
+    def get_function_and_kwargs(self, func, kwargs, nout=1):
+        """
+        Get function to apply and overloaded key arguments
+
+        :param func: function to run
+        :param kwargs: key arguments of func
+        :param nout: number of outputs
+
+        :return: function to apply, overloaded key arguments
+        """
+
+        # apply shared memory wrapper
+        new_func = shared_memory_wrapper_fun
+
+        # Get overloaded key arguments
+        # Create ids
+        id_list = []
+        for _ in range(nout):
+            id_list.append(self.current_object_id)
+            self.current_object_id += 1
+        new_kwargs = kwargs
+        new_kwargs["id_list"] = id_list
+        new_kwargs["fun"] = func
+        new_kwargs["tmp_dir"] = self.tmp_dir
+
+        return new_func, new_kwargs
+
+    def get_obj(self, obj):
+        """
+        Get Object
+
+        :param obj: object to transform
+
+        :return: object
+        """
+        res = load_shared(obj)
+        return res
+
+
 def removing_disk_data(path):
     """
     Remove directory from disk
@@ -256,7 +409,7 @@ def none_wrapper_fun(*argv, **kwargs):
 
     func = kwargs["fun"]
     kwargs.pop("fun")
-    return func(*argv, **kwargs)
+    return func(*load_scattered_args(argv), **load_scattered_args(kwargs))
 
 
 def disk_wrapper_fun(*argv, **kwargs):
@@ -284,6 +437,10 @@ def disk_wrapper_fun(*argv, **kwargs):
             )
         ) from exc
 
+    # set by scheduler, when running in a multiprocessing cluster
+    keep_results = kwargs.pop("keep_results", False)
+    drop_cached_results(kwargs.pop("released_results", []))
+
     # load args
     loaded_argv = load_args_or_kwargs(argv)
     loaded_kwargs = load_args_or_kwargs(kwargs)
@@ -292,7 +449,7 @@ def disk_wrapper_fun(*argv, **kwargs):
     res = func(*loaded_argv[:], **loaded_kwargs)
 
     if res is not None:
-        to_disk_res = dump(res, tmp_dir, id_list)
+        to_disk_res = dump(res, tmp_dir, id_list, keep_in_memory=keep_results)
     else:
         to_disk_res = res
 
@@ -319,6 +476,8 @@ def load_args_or_kwargs(args_or_kwargs):
         res = obj
         if is_dumped_object(obj):
             res = load(obj)
+        elif is_scattered_object(obj):
+            res = load_scattered(obj)
 
         return res
 
@@ -354,7 +513,11 @@ def load(path):
     :return: object
     """
 
-    if path is not None:
+    if path in results_cache:
+        # dumped by current worker: used once from memory
+        obj = results_cache.pop(path)
+
+    elif path is not None:
         obj = path
         if DENSE_NAME in path:
             obj = cars_dataset.CarsDataset("arrays").load_single_tile(path)
@@ -372,12 +535,26 @@ def load(path):
     return obj
 
 
-def dump_single_object(obj, path):
+def drop_cached_results(released_results):
+    """
+    Remove results released by scheduler from the results kept
+    in memory by current worker
+
+    :param released_results: results (paths or tuples of paths)
+    """
+    for res in released_results:
+        for path in res if isinstance(res, tuple) else (res,):
+            results_cache.pop(path, None)
+
+
+def dump_single_object(obj, path, keep_in_memory=False):
     """
     Dump object to disk
 
     :param path: path
     :type path: str
+    :param keep_in_memory: keep object in memory for the next task
+        of current worker
     """
 
     if isinstance(obj, xr.Dataset):
@@ -392,6 +569,12 @@ def dump_single_object(obj, path):
     else:
         raise TypeError("Not an arrays or points or dict")
 
+    if keep_in_memory:
+        # a depending task is queued on current worker
+        results_cache[path] = obj
+        while len(results_cache) > RESULTS_CACHE_SIZE:
+            results_cache.popitem(last=False)
+
 
 def create_path(obj, tmp_dir, id_num):
     """
@@ -423,13 +606,15 @@ def create_path(obj, tmp_dir, id_num):
     return path
 
 
-def dump(res, tmp_dir, id_list):
+def dump(res, tmp_dir, id_list, keep_in_memory=False):
     """
     Dump results to tmp_dir, according to ids
 
     :param res: objects to dump
     :param tmp_dir: tmp_dir
     :param id_list: list of ids of objects
+    :param keep_in_memory: keep objects in memory for the next task
+        of current worker
 
     :return: path
     """
@@ -441,7 +626,7 @@ def dump(res, tmp_dir, id_list):
         for i, single_id in enumerate(id_list):
             if res[i] is not None:
                 path = create_path(res[i], tmp_dir, single_id)
-                dump_single_object(res[i], path)
+                dump_single_object(res[i], path, keep_in_memory)
                 paths.append(path)
             else:
                 paths.append(None)
@@ -450,6 +635,308 @@ def dump(res, tmp_dir, id_list):
 
     else:
         paths = create_path(res, tmp_dir, id_list[0])
-        dump_single_object(res, paths)
+        dump_single_object(res, paths, keep_in_memory)
+
+    return paths
+
+
+def shared_memory_wrapper_fun(*argv, **kwargs):
+    """
+    Create a wrapper for function, exchanging data through shared memory
+
+    :param argv: args of func
+    :param kwargs: kwargs of func
+
+    :return: path to results
+    """
+
+    # Get function to wrap and id_list
+    try:
+        id_list = kwargs["id_list"]
+        func = kwargs["fun"]
+        tmp_dir = kwargs["tmp_dir"]
+        kwargs.pop("id_list")
+        kwargs.pop("fun")
+        kwargs.pop("tmp_dir")
+    except Exception as exc:  # pylint: disable=W0702 # noqa: B001, E722
+        raise RuntimeError(
+            "Failed in unwrapping. \n Args: {}, \n Kwargs: {}\n".format(
+                argv, kwargs
+            )
+        ) from exc
+
+    def transform_path_to_obj(obj):
+        """
+        Transform path to object
+
+        :param obj: object
+
+        """
+        res = obj
+        if is_shared_object(obj):
+            res = load_shared(obj)
+        elif is_scattered_object(obj):
+            res = load_scattered(obj)
+
+        return res
+
+    # map args
+    loaded_argv = replace_data_rec(argv, transform_path_to_obj)
+    loaded_kwargs = replace_data_rec(kwargs, transform_path_to_obj)
+
+    # call function
+    res = func(*loaded_argv[:], **loaded_kwargs)
+
+    if res is not None:
+        to_shared_res = dump_shared(res, tmp_dir, id_list)
+    else:
+        to_shared_res = res
+
+    return to_shared_res
+
+
+def is_shared_object(obj):
+    """
+    Check if a given object is dumped in shared memory
+
+    :param obj: object
+
+    :return: is dumped
+    :rtype: bool
+    """
+
+    return isinstance(obj, str) and SHARED_NAME in obj
+
+
+class SharedMemoryPickler(pickle.Pickler):
+    """
+    Pickler writing numpy buffers to separated .npy files
+    """
+
+    def __init__(self, file, path):
+        """
+        Init function of SharedMemoryPickler
+
+        :param file: file object to pickle to
+        :param path: directory where arrays are saved
+        """
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.path = path
+        self.saved_arrays = {}
+
+    def persistent_id(self, obj):
+        """
+        Save large numpy arrays to separated files
+
+        :param obj: object to pickle
+
+        :return: array file name, None if pickled normally
+        """
+        if (
+            not isinstance(obj, np.ndarray)
+            or obj.dtype.hasobject
+            or obj.nbytes < SHARED_ARRAY_MIN_NBYTES
+        ):
+            return None
+
+        if id(obj) not in self.saved_arrays:
+            array_name = "array_{}.npy".format(len(self.saved_arrays))
+            np.save(
+                os.path.join(self.path, array_name), obj, allow_pickle=False
+            )
+            self.saved_arrays[id(obj)] = array_name
+
+        return self.saved_arrays[id(obj)]
+
+
+class SharedMemoryUnpickler(pickle.Unpickler):
+    """
+    Unpickler mapping numpy buffers from separated .npy files
+    """
+
+    def __init__(self, file, path):
+        """
+        Init function of SharedMemoryUnpickler
+
+        :param file: file object to unpickle from
+        :param path: directory where arrays are saved
+        """
+        super().__init__(file)
+        self.path = path
+
+    def persistent_load(self, pid):
+        """
+        Map array file, copy on write to let functions modify it
+
+        :param pid: array file name
+
+        :return: array
+        """
+        return np.load(os.path.join(self.path, pid), mmap_mode="c").view(
+            np.ndarray
+        )
+
+
+def load_shared(path):
+    """
+    Load object from shared memory
+
+    :param path: path
+    :type path: str
+
+    :return: object
+    """
+
+    if path is None:
+        return None
+
+    with open(os.path.join(path, SHARED_OBJECT_FILE), "rb") as handle:
+        obj = SharedMemoryUnpickler(handle, path).load()
+
+    return obj
+
+
+def dump_shared_object(obj, path):
+    """
+    Dump object to shared memory
+
+    :param obj: object to dump
+    :param path: path
+    :type path: str
+    """
+
+    if not isinstance(obj, (xr.Dataset, pandas.DataFrame, cars_dict.CarsDict)):
+        raise TypeError("Not an arrays or points or dict")
+
+    os.makedirs(path)
+    with open(os.path.join(path, SHARED_OBJECT_FILE), "wb") as handle:
+        SharedMemoryPickler(handle, path).dump(obj)
+
+
+def dump_shared(res, tmp_dir, id_list):
+    """
+    Dump results to shared memory tmp_dir, according to ids
+
+    :param res: objects to dump
+    :param tmp_dir: tmp_dir
+    :param id_list: list of ids of objects
+
+    :return: path
+    """
+
+    paths = None
+
+    if len(id_list) > 1:
+        paths = []
+        for i, single_id in enumerate(id_list):
+            if res[i] is not None:
+                path = os.path.join(
+                    tmp_dir, SHARED_NAME + "_" + repr(single_id)
+                )
+                dump_shared_object(res[i], path)
+                paths.append(path)
+            else:
+                paths.append(None)
+
+        paths = (*paths,)
+
+    else:
+        paths = os.path.join(tmp_dir, SHARED_NAME + "_" + repr(id_list[0]))
+        dump_shared_object(res, paths)
 
     return paths
+
+
+def create_scatter_dir(tmp_dir):
+    """
+    Create directory of scattered objects, in shared memory if available
+
+    :param tmp_dir: temporary directory, used if no shared memory
+        file system is available
+    :type tmp_dir: str
+
+    :return: created directory
+    :rtype: str
+    """
+    shared_dir = tmp_dir
+    if os.path.isdir(SHARED_MEMORY_DIR):
+        shared_dir = SHARED_MEMORY_DIR
+    return tempfile.mkdtemp(prefix="cars_scatter_", dir=shared_dir)
+
+
+def dump_scattered(obj, scatter_dir):
+    """
+    Dump object used by several tasks, once for a given content.
+    Numpy buffers are written to separated files, mapped by workers
+
+    :param obj: object to dump
+    :param scatter_dir: directory of scattered objects
+    :type scatter_dir: str
+
+    :return: path of scattered object, given to tasks instead of object
+    :rtype: str
+    """
+    content_hash = hashlib.sha256(
+        pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    ).hexdigest()
+    path = os.path.join(scatter_dir, SCATTERED_NAME + "_" + content_hash)
+
+    if not os.path.exists(path):
+        os.makedirs(path)
+        with open(os.path.join(path, SHARED_OBJECT_FILE), "wb") as handle:
+            SharedMemoryPickler(handle, path).dump(obj)
+
+    return path
+
+
+@lru_cache(maxsize=SCATTERED_CACHE_SIZE)
+def load_scattered(path):
+    """
+    Load scattered object, once per worker: the same object is given
+    to all the tasks of the worker using it, so tasks must not modify
+    it: modifications would be seen by the next tasks of the worker
+
+    :param path: path of scattered object
+    :type path: str
+
+    :return: object
+    """
+    return load_shared(path)
+
+
+def is_scattered_object(obj):
+    """
+    Check if a given object is a scattered object path
+
+    :param obj: object
+
+    :return: is scattered
+    :rtype: bool
+    """
+
+    return isinstance(obj, str) and SCATTERED_NAME in obj
+
+
+def load_scattered_args(args_or_kwargs):
+    """
+    Load scattered objects of args or kwargs
+
+    :param args_or_kwargs: args or kwargs of func
+
+    :return: new args
+    """
+
+    def transform_path_to_obj(obj):
+        """
+        Transform path to object
+
+        :param obj: object
+
+        """
+        res = obj
+        if is_scattered_object(obj):
+            res = load_scattered(obj)
+
+        return res
+
+    return replace_data_rec(args_or_kwargs, transform_path_to_obj)
@@ -21,6 +21,7 @@
 """
 Contains abstract function for multiprocessing Cluster
 """
+# pylint: disable=too-many-lines
 
 import itertools
 import logging
@@ -34,16 +35,18 @@ import signal
 import threading
 import time
 import traceback
-from multiprocessing import Queue, freeze_support
+from collections import Counter, deque
+from queue import Queue
 
 # Third party imports
+import psutil
 from json_checker import And, Checker, Or
 
 from cars.core import cars_logging
 
 # CARS imports
 from cars.orchestrator.cluster import abstract_cluster
-from cars.orchestrator.cluster.mp_cluster import mp_wrapper
+from cars.orchestrator.cluster.mp_cluster import mp_factorizer, mp_wrapper
 from cars.orchestrator.cluster.mp_cluster.mp_objects import (
     MpDelayed,
     MpDelayedTask,
@@ -51,13 +54,30 @@ from cars.orchestrator.cluster.mp_cluster.mp_objects import (
     MpFutureIterator,
     MpJob,
 )
-from cars.orchestrator.cluster.mp_cluster.mp_tools import replace_data_rec
+from cars.orchestrator.cluster.mp_cluster.mp_tools import (
+    init_worker,
+    replace_data_rec,
+    run_task_with_memory,
+)
 
 RUN = 0
 TERMINATE = 1
 
-# Refresh time between every iteration, to prevent from freezing
-REFRESH_TIME = 0.5
+# Scheduler events
+NEW_JOB = "NEW_JOB"
+DONE_JOB = "DONE_JOB"
+END_BATCH = "END_BATCH"
+RELEASE_JOB = "RELEASE_JOB"
+TERMINATE_SCHEDULER = "TERMINATE_SCHEDULER"
+
+# Minimum period between two samplings of available memory, in seconds
+MEMORY_SAMPLING_PERIOD = 0.1
+# Maximum ratio between memory given to tile size estimators
+# and max_ram_per_worker
+MAX_RAM_RATIO = 4
+# Maximum number of jobs sent to a worker: the running one, and the next
+# ones queued to hide scheduling latency
+WORKER_PREFETCH = 2
 
 job_counter = itertools.count()
 
@@ -83,8 +103,17 @@ class MultiprocessingCluster(abstract_cluster.AbstractCluster):
         # retrieve parameters
         self.nb_workers = self.checked_conf_cluster["nb_workers"]
         self.dump_to_disk = self.checked_conf_cluster["dump_to_disk"]
+        self.shared_memory = self.checked_conf_cluster["shared_memory"]
         self.per_job_timeout = self.checked_conf_cluster["per_job_timeout"]
         self.profiling = self.checked_conf_cluster["profiling"]
+        self.factorize_tasks = self.checked_conf_cluster["factorize_tasks"]
+        self.max_ram_per_worker = self.checked_conf_cluster[
+            "max_ram_per_worker"
+        ]
+        # peak memory of tasks measured since last tile size estimation,
+        # and memory given to last estimation, by task name
+        self.peak_memory = {}
+        self.used_max_ram = {}
         # Set multiprocessing mode
         # forkserver is used, to allow OMP to be used in numba
         mp_mode = "forkserver"
@@ -92,9 +121,12 @@ class MultiprocessingCluster(abstract_cluster.AbstractCluster):
         self.launch_worker = launch_worker
 
         self.tmp_dir = None
+        self.scatter_dir = None
         if self.launch_worker:
             # Create wrapper object
-            if self.dump_to_disk:
+            if self.shared_memory:
+                self.wrapper = mp_wrapper.WrapperSharedMemory(self.out_dir)
+            elif self.dump_to_disk:
                 if self.out_dir is None:
                     raise RuntimeError("Not out_dir provided")
                 if not os.path.exists(self.out_dir):
@@ -106,19 +138,22 @@ class MultiprocessingCluster(abstract_cluster.AbstractCluster):
             else:
                 self.wrapper = mp_wrapper.WrapperNone(None)
 
-            # Create pool
-            self.pool = mp.get_context(mp_mode).Pool(
-                self.nb_workers,
-                initializer=freeze_support,
-                maxtasksperchild=100,
-            )
+            # Create one pool per worker, to choose the worker of each job.
+            # cpus are shared between the numba threads of workers
+            nb_threads = mp.cpu_count() // self.nb_workers
+            context = mp.get_context(mp_mode)
+            self.pools = [
+                context.Pool(
+                    1,
+                    initializer=init_worker,
+                    initargs=(nb_threads,),
+                    maxtasksperchild=100,
+                )
+                for _ in range(self.nb_workers)
+            ]
             self.queue = Queue()
             self.task_cache = {}
 
-            # Variable used for cleaning
-            # Clone of iterator future list
-            self.cl_future_list = []
-
             # set the exception hook
             threading.excepthook = log_error_hook
 
@@ -126,12 +161,13 @@ class MultiprocessingCluster(abstract_cluster.AbstractCluster):
             self.refresh_worker = threading.Thread(
                 target=MultiprocessingCluster.refresh_task_cache,
                 args=(
-                    self.pool,
+                    self.pools,
                     self.task_cache,
                     self.queue,
-                    self.per_job_timeout,
-                    self.cl_future_list,
                     self.wrapper,
+                    self.nb_workers * self.max_ram_per_worker,
+                    self.max_ram_per_worker,
+                    self.peak_memory,
                 ),
             )
             self.refresh_worker.daemon = True
@@ -174,14 +210,18 @@ class MultiprocessingCluster(abstract_cluster.AbstractCluster):
             "max_ram_per_worker", 2000
         )
         overloaded_conf["dump_to_disk"] = conf.get("dump_to_disk", True)
+        overloaded_conf["shared_memory"] = conf.get("shared_memory", False)
         overloaded_conf["per_job_timeout"] = conf.get("per_job_timeout", 600)
+        overloaded_conf["factorize_tasks"] = conf.get("factorize_tasks", True)
 
         cluster_schema = {
             "mode": str,
             "dump_to_disk": bool,
+            "shared_memory": bool,
             "nb_workers": And(int, lambda x: x > 0),
             "max_ram_per_worker": And(Or(float, int), lambda x: x > 0),
             "per_job_timeout": Or(float, int),
+            "factorize_tasks": bool,
             "profiling": {
                 "activated": bool,
                 "mode": str,
@@ -195,6 +235,39 @@ class MultiprocessingCluster(abstract_cluster.AbstractCluster):
 
         return overloaded_conf
 
+    def get_max_ram_per_worker(self, task_name=None):
+        """
+        Get the memory to use to compute the tile size of tasks.
+        If the peak memory of task was measured since last call,
+        memory given at last call is scaled so that tasks use
+        max_ram_per_worker
+
+        :param task_name: name of the task function
+        :type task_name: str
+
+        :return: memory per worker in Mb
+        """
+        if task_name is None:
+            return self.max_ram_per_worker
+
+        used_max_ram = self.used_max_ram.get(task_name, self.max_ram_per_worker)
+        peak_memory = self.peak_memory.pop(task_name, None)
+        if peak_memory is not None:
+            used_max_ram = min(
+                max(
+                    used_max_ram * self.max_ram_per_worker / peak_memory,
+                    self.max_ram_per_worker / MAX_RAM_RATIO,
+                ),
+                self.max_ram_per_worker * MAX_RAM_RATIO,
+            )
+            logging.info(
+                "Measured peak memory of {}: {} Mb, memory used for tile "
+                "size: {} Mb".format(task_name, peak_memory, used_max_ram)
+            )
+        self.used_max_ram[task_name] = used_max_ram
+
+        return used_max_ram
+
     def cleanup(self):
         """
         Cleanup cluster
@@ -203,12 +276,15 @@ class MultiprocessingCluster(abstract_cluster.AbstractCluster):
 
         # Terminate worker
         self.refresh_worker._state = TERMINATE  # pylint: disable=W0212
+        self.queue.put((TERMINATE_SCHEDULER,))
         while self.refresh_worker.is_alive():
             time.sleep(0)
 
-        # close pool
-        self.pool.close()
-        self.pool.join()
+        # close pools
+        for pool in self.pools:
+            pool.close()
+        for pool in self.pools:
+            pool.join()
 
         # clean tmpdir if exists
         self.wrapper.cleanup()
@@ -216,13 +292,24 @@ class MultiprocessingCluster(abstract_cluster.AbstractCluster):
         if self.tmp_dir is not None:
             shutil.rmtree(self.tmp_dir)
 
+        if self.scatter_dir is not None:
+            shutil.rmtree(self.scatter_dir)
+
     def scatter(self, data, broadcast=True):
         """
-        Distribute data through workers
+        Distribute data through workers: data is dumped once for a given
+        content, and loaded once by each worker running tasks using it
 
         :param data: task data
+        :param broadcast: unused, data is loaded by workers when needed
+
+        :return: reference to data, to give to tasks
+        :rtype: str
         """
-        return data
+        if self.scatter_dir is None:
+            self.scatter_dir = mp_wrapper.create_scatter_dir(self.out_dir)
+
+        return mp_wrapper.dump_scattered(data, self.scatter_dir)
 
     def create_task_wrapped(self, func, nout=1):
         """
@@ -245,7 +332,10 @@ class MultiprocessingCluster(abstract_cluster.AbstractCluster):
             new_kwargs["log_fun"] = func
             # create delayed_task
             delayed_task = MpDelayedTask(
-                cars_logging.logger_func, list(argv), new_kwargs
+                cars_logging.logger_func,
+                list(argv),
+                new_kwargs,
+                task_name=kwargs.get("fun_log_wrapper", func).__name__,
             )
 
             delayed_object_list = []
@@ -270,10 +360,17 @@ class MultiprocessingCluster(abstract_cluster.AbstractCluster):
 
         :param task_list: task list
         """
+        if self.factorize_tasks:
+            # tasks whose memory adapts tile size are measured alone
+            mp_factorizer.factorize_delayed(
+                task_list, unfused_task_names=set(self.used_max_ram)
+            )
+
         memorize = {}
         future_list = [self.rec_start(task, memorize) for task in task_list]
-        # signal that we reached the end of this batch
-        self.queue.put("END_BATCH")
+        # signal that we reached the end of this batch,
+        # results of returned futures are kept until iterated
+        self.queue.put((END_BATCH, get_job_ids_from_futures(future_list)))
         return future_list
 
     def rec_start(self, delayed_object, memorize):
@@ -289,8 +386,6 @@ class MultiprocessingCluster(abstract_cluster.AbstractCluster):
         if delayed_object in memorize.keys():
             return memorize[delayed_object]
 
-        can_run = True
-
         current_delayed_task = delayed_object.delayed_task
 
         # Modify delayed with wrapper here
@@ -330,22 +425,18 @@ class MultiprocessingCluster(abstract_cluster.AbstractCluster):
 
         filt_kw = transform_delayed_to_mp_job(current_delayed_task.kw_args)
 
-        # Check if can be run
-        dependances = compute_dependances(filt_args, filt_kw)
-        can_run = True
-        if len(dependances) > 0:
-            can_run = False
-
         # start current task
         task_future = MpFutureTask(self)
 
+        # dependances are computed by scheduler
         self.queue.put(
             (
+                NEW_JOB,
                 task_future.job_id,
-                can_run,
                 current_delayed_task.func,
                 filt_args,
                 filt_kw,
+                current_delayed_task.task_name,
             )
         )
 
@@ -364,146 +455,424 @@ class MultiprocessingCluster(abstract_cluster.AbstractCluster):
 
     @staticmethod  # noqa: C901
     def refresh_task_cache(  # noqa: C901
-        pool, task_cache, in_queue, per_job_timeout, cl_future_list, wrapper_obj
+        pools,
+        task_cache,
+        in_queue,
+        wrapper_obj,
+        memory_budget,
+        default_memory,
+        peak_memory,
     ):
         """
         Refresh task cache
 
+        Event driven scheduler: the thread sleeps on in_queue, which
+        receives the new tasks, the results sent by the apply_async
+        callbacks and the releases of the iterated futures.
+        A reverse dependency index is used to launch the depending tasks
+        as soon as their last dependance is done.
+
+        Each worker has its own pool, and a queue of the ready jobs
+        depending on results it computed, which it may keep in memory.
+        A worker takes jobs from its queue, then jobs without preferred
+        worker, and steals jobs from the longest queue when it is idle.
+        At most WORKER_PREFETCH jobs are sent to each worker.
+
+        Jobs are sent while the memory estimated for jobs in pools fits
+        in memory budget and in available memory. The memory of a job is
+        the peak memory measured for previous jobs of the same task,
+        default_memory before. A job is always sent when pools are empty.
+
+        :param pools: single worker pools
         :param task_cache: task cache list
         :param in_queue: queue
-        :param per_job_timeout: per job timeout
-        :param cl_future_list: current future list used in iterator
         :param wrapper_obj: wrapper (disk or None)
         :type wrapper_obj: AbstractWrapper
+        :param memory_budget: memory of all workers, in Mb
+        :param default_memory: memory of tasks not measured yet, in Mb
+        :param peak_memory: peak memory measured by task name, updated
         """
         thread = threading.current_thread()
 
         # initialize lists
         wait_list = {}
-        in_progress_list = {}
         dependances_list = {}
         done_task_results = {}
+        # reverse dependances: job_id -> list of jobs depending on it
+        depending_jobs = {}
+        # number of dependances not computed yet, for waiting jobs
+        nb_remaining_dependances = {}
+        # number of users of a job result: current batch,
+        # depending jobs and futures not consumed by iterator yet
+        nb_holds = {}
+        # jobs of the batch being received
+        batch_job_ids = []
+        # jobs ready to be launched, in order: without preferred worker,
+        # and by preferred worker
+        ready_jobs = deque()
+        worker_ready_jobs = [deque() for _ in pools]
+        # number of jobs sent to each worker
+        nb_worker_jobs = [0] * len(pools)
+        # estimated memory and worker of jobs sent to pools
+        running_jobs = {}
+        # worker which computed the result of each done job
+        result_workers = {}
+        # worker keeping the result of job in memory, for a local consumer
+        kept_results = {}
+        # results kept in memory by each worker, to drop with its next job
+        released_results = [[] for _ in pools]
+        # maximum peak memory measured by task name
+        estimated_memory = {}
+        # available memory and its sampling time
+        memory_sample = [0, None]
+
+        def get_available_memory():
+            """
+            Get available memory of system in Mb, sampled at most
+            every MEMORY_SAMPLING_PERIOD
+            """
+            if time.time() - memory_sample[0] > MEMORY_SAMPLING_PERIOD:
+                memory_sample[0] = time.time()
+                memory_sample[1] = (
+                    float(psutil.virtual_memory().available) / 1000000
+                )
+            return memory_sample[1]
 
-        while thread._state == RUN:  # pylint: disable=W0212
-            # wait before next iteration
-            time.sleep(REFRESH_TIME)
-            # get new task from queue
-            if not in_queue.empty():
-                # get all task from this batch
-                for job_id, can_run, func, args, kw_args in iter(
-                    in_queue.get, "END_BATCH"
+        def get_preferred_worker(job_id, running_job_id=None, worker=None):
+            """
+            Get the worker which computed most of the dependances of job
+
+            :param job_id: job id
+            :param running_job_id: dependance not done yet, computed by
+                worker
+            :param worker: worker index of running_job_id
+            :return: worker index, None if no dependance was computed
+            """
+            workers = []
+            for depend in dependances_list[job_id]:
+                if depend == running_job_id:
+                    workers.append(worker)
+                elif depend in result_workers:
+                    workers.append(result_workers[depend])
+            if len(workers) == 0:
+                return None
+            return Counter(workers).most_common(1)[0][0]
+
+        def has_local_consumer(job_id, worker):
+            """
+            Check if a job depending on job_id will be queued on worker
+            as soon as job_id is done: job_id is its last remaining
+            dependance, and worker computed most of its dependances
+
+            :param job_id: job id, launched on worker
+            :param worker: worker index
+            :return: True if the result of job_id is used on worker
+            """
+            for depending_job_id in depending_jobs.get(job_id, []):
+                if (
+                    nb_remaining_dependances.get(depending_job_id) == 1
+                    and get_preferred_worker(depending_job_id, job_id, worker)
+                    == worker
                 ):
-                    if can_run:
-                        in_progress_list[job_id] = pool.apply_async(
-                            func, args=args, kwds=kw_args
-                        )
-                        # add to dependances
-                        dependances_list[job_id] = []
-                    else:
-                        # add to wait list
-                        wait_list[job_id] = [func, args, kw_args]
-                        # get dependances
-                        dependances_list[job_id] = compute_dependances(
-                            args, kw_args
-                        )
+                    return True
+            return False
 
-            # check for ready results
-            done_list = []
-            for job_id, job_id_progress in in_progress_list.items():
-                if job_id_progress.ready():
-                    try:
-                        res = job_id_progress.get(timeout=per_job_timeout)
-                        success = True
-                    except:  # pylint: disable=W0702 # noqa: B001, E722
-                        res = traceback.format_exc()
-                        success = False
-                        logging.error("Exception in worker: {}".format(res))
-                    done_list.append(job_id)
-                    done_task_results[job_id] = [success, res]
-                    # remove from dependance list
-                    dependances_list.pop(job_id)
-
-            # clean done jobs
-            for job_id in done_list:
-                # delete
-                del in_progress_list[job_id]
-                # copy results to futures
-                # (they remove themselves from task_cache
-                task_cache[job_id].set(done_task_results[job_id])
+        def set_ready(job_id, func, args, kw_args, task_name):
+            """
+            Add job to the queue of the worker which computed most of
+            its dependances, or to the jobs without preferred worker
+
+            :param job_id: job id
+            :param func: function to run
+            :param args: args of function, with real data
+            :param kw_args: kwargs of function, with real data
+            :param task_name: name of task
+            """
+            worker = get_preferred_worker(job_id)
+            job = (job_id, func, args, kw_args, task_name)
+            if worker is not None:
+                worker_ready_jobs[worker].append(job)
+            else:
+                ready_jobs.append(job)
+
+        def select_jobs(worker, steal):
+            """
+            Select the ready jobs to take the next job of worker from
+
+            :param worker: worker index
+            :param steal: allow idle worker to steal jobs
+            :return: jobs, True if next job is stolen from the end of
+                the queue of another worker
+            """
+            if worker_ready_jobs[worker]:
+                return worker_ready_jobs[worker], False
+            if ready_jobs:
+                return ready_jobs, False
+            if steal and nb_worker_jobs[worker] == 0:
+                longest_jobs = max(worker_ready_jobs, key=len)
+                if longest_jobs:
+                    return longest_jobs, True
+            return None, False
+
+        def dispatch():
+            """
+            Launch ready jobs on workers while their memory fits in budget.
+            Idle workers steal jobs only once the other workers took
+            their own jobs
+            """
+            for steal in [False, True]:
+                launched = True
+                while launched:
+                    launched = False
+                    for worker in range(len(pools)):
+                        if nb_worker_jobs[worker] >= WORKER_PREFETCH:
+                            continue
+                        jobs, stolen = select_jobs(worker, steal)
+                        if jobs is None:
+                            continue
+                        task_name = jobs[-1 if stolen else 0][4]
+                        memory = estimated_memory.get(task_name, default_memory)
+                        if len(running_jobs) > 0 and (
+                            sum(job[0] for job in running_jobs.values())
+                            + memory
+                            > memory_budget
+                            or memory > get_available_memory()
+                        ):
+                            return
+                        job = jobs.pop() if stolen else jobs.popleft()
+                        running_jobs[job[0]] = (memory, worker)
+                        nb_worker_jobs[worker] += 1
+                        launch_task(worker, *job)
+                        launched = True
+
+        def job_done(job_id, success, res, task_name, memory):
+            """
+            Record peak memory of job, and set its result
 
-            # check wait_list for dependent tasks
-
-            ready_list = []
-            failed_list = []
-            done_task_result_keys = done_task_results.keys()
-            for job_id in wait_list.keys():  # pylint: disable=C0201
-                depending_tasks = dependances_list[job_id]
-                # check if all tasks are finished
-                can_run = True
-                failed = False
-                for depend in depending_tasks:
-                    if depend not in done_task_result_keys:
-                        can_run = False
-                    else:
-                        if not done_task_results[depend][0]:
-                            # not a success
-                            can_run = False
-                            failed = True
-
-                if failed:
-                    # Add to done list with failed status
-                    failed_list.append(job_id)
-                if can_run:
-                    ready_list.append(job_id)
-
-            # Deal with failed tasks
-            for job_id in failed_list:
-                done_list.append(job_id)
-                done_task_results[job_id] = [
-                    False,
-                    "Failed depending task",
-                ]
+            :param job_id: job id
+            :param success: success of job
+            :param res: job result
+            :param task_name: name of task
+            :param memory: peak memory of job
+            """
+            worker = running_jobs.pop(job_id)[1]
+            nb_worker_jobs[worker] -= 1
+            if success:
+                result_workers[job_id] = worker
+            if memory is not None and task_name is not None:
+                estimated_memory[task_name] = max(
+                    estimated_memory.get(task_name, 0), memory
+                )
+                peak_memory[task_name] = max(
+                    peak_memory.get(task_name, 0), memory
+                )
+            set_done(job_id, success, res)
+
+        def launch_task(worker, job_id, func, args, kw_args, task_name):
+            """
+            Launch task in pool of worker, results and peak memory are
+            sent back to in_queue. The worker keeps the results in memory
+            only if a depending job will be queued on it, and drops the
+            kept results released since its previous job
+
+            :param worker: worker index
+            :param job_id: job id
+            :param func: function to run
+            :param args: args of function
+            :param kw_args: kwargs of function
+            :param task_name: name of task
+            """
+
+            def success_callback(res_and_memory):
+                """
+                Send result of successful job to scheduler
+                """
+                res, memory = res_and_memory
+                in_queue.put((DONE_JOB, job_id, True, res, task_name, memory))
+
+            def error_callback(exc):
+                """
+                Send traceback of failed job to scheduler
+                """
+                res = "".join(
+                    traceback.format_exception(
+                        type(exc), exc, exc.__traceback__
+                    )
+                )
+                logging.error("Exception in worker: {}".format(res))
+                in_queue.put((DONE_JOB, job_id, False, res, task_name, None))
+
+            keep_results = has_local_consumer(job_id, worker)
+            if keep_results:
+                kept_results[job_id] = worker
+            kw_args = wrapper_obj.set_worker_cache_kwargs(
+                kw_args, keep_results, released_results[worker]
+            )
+            released_results[worker] = []
+
+            pools[worker].apply_async(
+                run_task_with_memory,
+                args=(func, args, kw_args),
+                callback=success_callback,
+                error_callback=error_callback,
+            )
+
+        def release(job_id):
+            """
+            Remove a hold on job result, clean it if not used anymore
+
+            :param job_id: job id
+            """
+            nb_holds[job_id] -= 1
+            if nb_holds[job_id] == 0 and job_id in done_task_results:
+                clean(job_id)
+
+        def clean(job_id):
+            """
+            Clean job result through wrapper
+
+            :param job_id: job id
+            """
+            nb_holds.pop(job_id)
+            result_workers.pop(job_id, None)
+            worker = kept_results.pop(job_id, None)
+            success, res = done_task_results.pop(job_id)
+            if success:
+                if worker is not None:
+                    released_results[worker].append(res)
+                wrapper_obj.cleanup_future_res(res)
+
+        def set_done(job_id, success, res):
+            """
+            Set job result, and update depending jobs
+
+            :param job_id: job id
+            :param success: success of job
+            :param res: job result
+            """
+            done_stack = [(job_id, success, res)]
+            while done_stack:
+                job_id, success, res = done_stack.pop()
+                done_task_results[job_id] = [success, res]
                 # copy results to futures
                 # (they remove themselves from task_cache
                 task_cache[job_id].set(done_task_results[job_id])
-                del wait_list[job_id]
 
-            # launch tasks ready to run
-            for job_id in ready_list:
-                func, args, kw_args = wait_list[job_id]
+                # inputs of current job are not needed anymore
+                for depend in dependances_list.pop(job_id):
+                    release(depend)
+
+                # update depending jobs
+                for depending_job_id in depending_jobs.pop(job_id, []):
+                    if depending_job_id not in wait_list:
+                        # already failed
+                        continue
+                    if not success:
+                        del wait_list[depending_job_id]
+                        del nb_remaining_dependances[depending_job_id]
+                        done_stack.append(
+                            (depending_job_id, False, "Failed depending task")
+                        )
+                        continue
+                    nb_remaining_dependances[depending_job_id] -= 1
+                    if nb_remaining_dependances[depending_job_id] == 0:
+                        del nb_remaining_dependances[depending_job_id]
+                        func, args, kw_args, task_name = wait_list.pop(
+                            depending_job_id
+                        )
+                        # replace jobs by real data
+                        new_args = replace_job_by_data(args, done_task_results)
+                        new_kw_args = replace_job_by_data(
+                            kw_args, done_task_results
+                        )
+                        set_ready(
+                            depending_job_id,
+                            func,
+                            new_args,
+                            new_kw_args,
+                            task_name,
+                        )
+
+                if nb_holds[job_id] == 0:
+                    clean(job_id)
+
+        def add_job(job_id, func, args, kw_args, task_name):
+            """
+            Add new job: set it ready or wait for its dependances
+
+            :param job_id: job id
+            :param func: function to run
+            :param args: args of function
+            :param kw_args: kwargs of function
+            :param task_name: name of task
+            """
+            # hold until the end of batch
+            nb_holds[job_id] = 1
+            batch_job_ids.append(job_id)
+
+            # get dependances, already sent in current batch
+            dependances = list(
+                dict.fromkeys(compute_dependances(args, kw_args))
+            )
+            dependances_list[job_id] = dependances
+            for depend in dependances:
+                nb_holds[depend] += 1
+
+            remaining = []
+            failed = False
+            for depend in dependances:
+                if depend not in done_task_results:
+                    remaining.append(depend)
+                elif not done_task_results[depend][0]:
+                    failed = True
+
+            if failed:
+                set_done(job_id, False, "Failed depending task")
+            elif len(remaining) == 0:
                 # replace jobs by real data
                 new_args = replace_job_by_data(args, done_task_results)
                 new_kw_args = replace_job_by_data(kw_args, done_task_results)
-                # launch task
-                in_progress_list[job_id] = pool.apply_async(
-                    func, args=new_args, kwds=new_kw_args
-                )
-                del wait_list[job_id]
-
-            # find done jobs that can be cleaned
-            cleanable_jobid = []
-
-            for job_id in done_task_results.keys():  # pylint: disable=C0201
-                # check if needed
-                still_need = False
-                for dependance_task_list in dependances_list.values():
-                    if job_id in dependance_task_list:
-                        still_need = True
-                if not still_need:
-                    cleanable_jobid.append(job_id)
-
-            # clean unused in the future jobs through wrapper
-            for job_id_to_clean in cleanable_jobid:
-                if job_id_to_clean not in get_job_ids_from_futures(
-                    cl_future_list
-                ):
-                    # not needed by iterator -> can be cleaned
-                    # Cleanup with wrapper
-                    wrapper_obj.cleanup_future_res(
-                        done_task_results[job_id_to_clean][1]
-                    )
-                    # cleanup list
-                    done_task_results.pop(job_id_to_clean)
+                set_ready(job_id, func, new_args, new_kw_args, task_name)
+            else:
+                # add to wait list
+                wait_list[job_id] = [func, args, kw_args, task_name]
+                nb_remaining_dependances[job_id] = len(remaining)
+                for depend in remaining:
+                    depending_jobs.setdefault(depend, []).append(job_id)
+
+        while thread._state == RUN:  # pylint: disable=W0212
+            # wait for next event
+            message = in_queue.get()
+
+            if message[0] == NEW_JOB:
+                add_job(*message[1:])
+                dispatch()
+
+            elif message[0] == DONE_JOB:
+                job_done(*message[1:])
+                dispatch()
+
+            elif message[0] == END_BATCH:
+                # futures given to iterator hold their results
+                for job_id in message[1]:
+                    nb_holds[job_id] += 1
+                # release batch holds
+                for job_id in batch_job_ids:
+                    release(job_id)
+                batch_job_ids = []
+
+            elif message[0] == RELEASE_JOB:
+                release(message[1])
+
+    def release_future(self, future):
+        """
+        Signal that the result of a future was consumed by iterator,
+        and can be cleaned when not used by other tasks
+
+        :param future: consumed future
+        :type future: MpFuture
+        """
+        self.queue.put((RELEASE_JOB, future.mp_future_task.job_id))
 
     def future_iterator(self, future_list):
         """
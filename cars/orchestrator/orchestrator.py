@@ -136,6 +136,7 @@ class Orchestrator:
         nodata=0,
         cars_ds_name=None,
         optional_data=False,
+        cog=False,
     ):
         """
         Save file to list in order to be saved later
@@ -147,6 +148,8 @@ class Orchestrator:
           for information during logging
         :param optional_data: True if the data is optionnal
         :type optional_data: bool
+        :param cog: save file as Cloud Optimized GeoTIFF
+        :type cog: bool
         """
 
         self.cars_ds_savers_registry.add_file_to_save(
@@ -156,6 +159,7 @@ class Orchestrator:
             dtype=dtype,
             nodata=nodata,
             optional_data=optional_data,
+            cog=cog,
         )
 
         # add name if exists
@@ -283,16 +287,23 @@ class Orchestrator:
                 leave=True,
                 file=sys.stdout,
             )
-            for future_obj in self.cluster.future_iterator(future_objects):
-                # get corresponding CarsDataset and save tile
-                if future_obj is not None:
-                    # Save future if needs to
-                    self.cars_ds_savers_registry.save(future_obj)
-                    # Replace future in cars_ds if needs to
-                    self.cars_ds_replacer_registry.replace(future_obj)
-                else:
-                    logging.debug("None tile: not saved")
-                pbar.update()
+            # tiles are written while next ones are computed,
+            # progress is updated once they are written
+            with saver_registry.WritingThreadPool() as writing_pool:
+                for future_obj in self.cluster.future_iterator(future_objects):
+                    # get corresponding CarsDataset and save tile
+                    if future_obj is not None:
+                        # Replace future in cars_ds if needs to
+                        self.cars_ds_replacer_registry.replace(future_obj)
+                        # Save future if needs to
+                        self.cars_ds_savers_registry.save(
+                            future_obj,
+                            writing_pool=writing_pool,
+                            callback=pbar.update,
+                        )
+                    else:
+                        logging.debug("None tile: not saved")
+                        pbar.update()
 
             # close files
             logging.info("Close files ...")
@@ -23,6 +23,7 @@ This module contains the replacer registry class
 """
 
 # CARS imports
+from cars.data_structures import cars_dataset
 from cars.orchestrator.registry.abstract_registry import (
     AbstractCarsDatasetRegistry,
 )
@@ -44,7 +45,10 @@ class CarsDatasetRegistryReplacer(AbstractCarsDatasetRegistry):
 
         """
         super().__init__(id_generator)
-        self.registered_cars_datasets_replacers = []
+        # replacers indexed by cars dataset id
+        self.registered_cars_datasets_replacers = {}
+        # cars datasets ids indexed by python object id
+        self.registered_ids = {}
 
     def cars_dataset_in_registry(self, cars_ds):
         """
@@ -57,15 +61,9 @@ class CarsDatasetRegistryReplacer(AbstractCarsDatasetRegistry):
         :rtype : Tuple(bool, int)
         """
 
-        in_registry = False
-        registered_id = None
-        for obj in self.registered_cars_datasets_replacers:
-            if cars_ds == obj.cars_ds:
-                in_registry = True
-                registered_id = obj.obj_id
-                break
+        registered_id = self.registered_ids.get(id(cars_ds), None)
 
-        return in_registry, registered_id
+        return registered_id is not None, registered_id
 
     def get_cars_datasets_list(self):
         """
@@ -77,7 +75,9 @@ class CarsDatasetRegistryReplacer(AbstractCarsDatasetRegistry):
 
         cars_ds_list = []
 
-        for cars_ds_replacer in self.registered_cars_datasets_replacers:
+        for (
+            cars_ds_replacer
+        ) in self.registered_cars_datasets_replacers.values():
             cars_ds_list.append(cars_ds_replacer.cars_ds)
 
         return cars_ds_list
@@ -95,7 +95,8 @@ class CarsDatasetRegistryReplacer(AbstractCarsDatasetRegistry):
         new_id = self.id_generator.get_new_id(cars_ds)
         # create CarsDataset replacer
         replacer = SingleCarsDatasetReplacer(cars_ds, new_id)
-        self.registered_cars_datasets_replacers.append(replacer)
+        self.registered_cars_datasets_replacers[new_id] = replacer
+        self.registered_ids[id(cars_ds)] = new_id
 
     def get_corresponding_replacer(self, future_result):
         """
@@ -110,14 +111,7 @@ class CarsDatasetRegistryReplacer(AbstractCarsDatasetRegistry):
 
         cars_ds_id = self.get_future_cars_dataset_id(future_result)
 
-        replacer = None
-
-        for cars_ds_replacer in self.registered_cars_datasets_replacers:
-            if cars_ds_replacer.obj_id == cars_ds_id:
-                replacer = cars_ds_replacer
-                break
-
-        return replacer
+        return self.registered_cars_datasets_replacers.get(cars_ds_id, None)
 
     def replace(self, future_result):
         """
@@ -132,9 +126,9 @@ class CarsDatasetRegistryReplacer(AbstractCarsDatasetRegistry):
         if replacer is not None:
             if not replacer.as_been_seen:
                 # reset all tiles to None
-                for row in range(replacer.cars_ds.shape[0]):
-                    for col in range(replacer.cars_ds.shape[1]):
-                        replacer.cars_ds[row, col] = None
+                replacer.cars_ds.tiles = cars_dataset.create_none(
+                    replacer.cars_ds.shape[0], replacer.cars_ds.shape[1]
+                )
 
                 replacer.as_been_seen = True
 
@@ -26,13 +26,21 @@ This module contains the saver registry class
 # Standard imports
 import logging
 import os
+import queue
+import threading
 import traceback
 
 # CARS imports
+from cars.data_structures import dataframe_writer
 from cars.orchestrator.registry.abstract_registry import (
     AbstractCarsDatasetRegistry,
 )
 
+# Maximum number of threads writing results
+NB_WRITING_THREADS = 4
+# Maximum number of results waiting to be written by each thread
+WRITING_QUEUE_SIZE = 4
+
 
 class CarsDatasetsRegistrySaver(AbstractCarsDatasetRegistry):
     """
@@ -49,7 +57,10 @@ class CarsDatasetsRegistrySaver(AbstractCarsDatasetRegistry):
 
         """
         super().__init__(id_generator)
-        self.registered_cars_datasets_savers = []
+        # savers indexed by cars dataset id
+        self.registered_cars_datasets_savers = {}
+        # cars datasets ids indexed by python object id
+        self.registered_ids = {}
 
     def get_cars_datasets_list(self):
         """
@@ -61,7 +72,7 @@ class CarsDatasetsRegistrySaver(AbstractCarsDatasetRegistry):
 
         cars_ds_list = []
 
-        for cars_ds_saver in self.registered_cars_datasets_savers:
+        for cars_ds_saver in self.registered_cars_datasets_savers.values():
             cars_ds_list.append(cars_ds_saver.cars_ds)
 
         return cars_ds_list
@@ -77,15 +88,9 @@ class CarsDatasetsRegistrySaver(AbstractCarsDatasetRegistry):
         :rtype : Tuple(bool, int)
         """
 
-        in_registry = False
-        registered_id = None
-        for obj in self.registered_cars_datasets_savers:
-            if cars_ds == obj.cars_ds:
-                in_registry = True
-                registered_id = obj.obj_id
-                break
+        registered_id = self.registered_ids.get(id(cars_ds), None)
 
-        return in_registry, registered_id
+        return registered_id is not None, registered_id
 
     def get_cars_ds_saver_corresponding_cars_dataset(self, cars_ds):
         """
@@ -97,13 +102,9 @@ class CarsDatasetsRegistrySaver(AbstractCarsDatasetRegistry):
         :rtype : SingleCarsDatasetSaver
         """
 
-        cars_ds_saver = None
-        for obj in self.registered_cars_datasets_savers:
-            if cars_ds == obj.cars_ds:
-                cars_ds_saver = obj
-                break
-
-        return cars_ds_saver
+        return self.get_cars_ds_saver_corresponding_id(
+            self.registered_ids.get(id(cars_ds), None)
+        )
 
     def get_cars_ds_saver_corresponding_id(self, obj_id):
         """
@@ -116,31 +117,36 @@ class CarsDatasetsRegistrySaver(AbstractCarsDatasetRegistry):
         :rtype : SingleCarsDatasetSaver
         """
 
-        cars_ds_saver = None
-        for obj in self.registered_cars_datasets_savers:
-            if obj_id == obj.obj_id:
-                cars_ds_saver = obj
-                break
-
-        return cars_ds_saver
+        return self.registered_cars_datasets_savers.get(obj_id, None)
 
-    def save(self, future_result):
+    def save(self, future_result, writing_pool=None, callback=None):
         """
         Save future result
 
         :param future_result: xr.Dataset or pd.DataFrame
+        :param writing_pool: pool of threads writing the result,
+            None to write it now
+        :type writing_pool: WritingThreadPool
+        :param callback: function called once result is written
 
         """
 
         obj_id = self.get_future_cars_dataset_id(future_result)
         cars_ds_saver = self.get_cars_ds_saver_corresponding_id(obj_id)
 
-        if cars_ds_saver is not None:
+        if cars_ds_saver is not None and future_result is not None:
             # save
-            if future_result is not None:
-                cars_ds_saver.save(future_result)
-            else:
-                logging.debug("Future result tile is None -> not saved")
+            if writing_pool is not None:
+                writing_pool.submit(
+                    obj_id, cars_ds_saver.save, future_result, callback
+                )
+                return
+            cars_ds_saver.save(future_result)
+        elif cars_ds_saver is not None:
+            logging.debug("Future result tile is None -> not saved")
+
+        if callback is not None:
+            callback()
 
     def add_file_to_save(
         self,
@@ -150,6 +156,7 @@ class CarsDatasetsRegistrySaver(AbstractCarsDatasetRegistry):
         dtype=None,
         nodata=None,
         optional_data=False,
+        cog=False,
     ):
         """
         Add file corresponding to cars_dataset to registered_cars_datasets
@@ -166,6 +173,8 @@ class CarsDatasetsRegistrySaver(AbstractCarsDatasetRegistry):
         :type nodata: float
         :param optional_data: True if the data is optionnal
         :type optional_data: bool
+        :param cog: save file as Cloud Optimized GeoTIFF
+        :type cog: bool
         """
 
         if not self.cars_dataset_in_registry(cars_ds)[0]:
@@ -173,8 +182,9 @@ class CarsDatasetsRegistrySaver(AbstractCarsDatasetRegistry):
             new_id = self.id_generator.get_new_id(cars_ds)
             # create CarsDataset saver
             cars_ds_saver = SingleCarsDatasetSaver(new_id, cars_ds)
-            # add to list
-            self.registered_cars_datasets_savers.append(cars_ds_saver)
+            # add to registry
+            self.registered_cars_datasets_savers[new_id] = cars_ds_saver
+            self.registered_ids[id(cars_ds)] = new_id
         else:
             cars_ds_saver = self.get_cars_ds_saver_corresponding_cars_dataset(
                 cars_ds
@@ -187,6 +197,7 @@ class CarsDatasetsRegistrySaver(AbstractCarsDatasetRegistry):
             dtype=dtype,
             nodata=nodata,
             optional_data=optional_data,
+            cog=cog,
         )
 
     def cleanup(self):
@@ -196,7 +207,7 @@ class CarsDatasetsRegistrySaver(AbstractCarsDatasetRegistry):
         Close correctly all opened files.
 
         """
-        for obj in self.registered_cars_datasets_savers:
+        for obj in self.registered_cars_datasets_savers.values():
             obj.cleanup()
 
 
@@ -207,6 +218,8 @@ class SingleCarsDatasetSaver:
     Structure managing the descriptors of each CarsDataset.
     """
 
+    # pylint: disable=too-many-instance-attributes
+
     def __init__(self, obj_id, cars_ds):
         """
         Init function of SingleCarsDatasetSaver
@@ -221,13 +234,22 @@ class SingleCarsDatasetSaver:
         self.tags = []
         self.dtypes = []
         self.nodatas = []
+        self.cogs = []
         self.descriptors = []
         self.already_seen = False
         self.count = 0
         self.folder_name = None
+        # points tiles are appended to files closed at cleanup
+        self.dataframe_writer = None
 
     def add_file(
-        self, file_name, tag=None, dtype=None, nodata=None, optional_data=False
+        self,
+        file_name,
+        tag=None,
+        dtype=None,
+        nodata=None,
+        optional_data=False,
+        cog=False,
     ):
         """
         Add file to current CarsDatasetSaver
@@ -242,6 +264,8 @@ class SingleCarsDatasetSaver:
         :type nodata: float
         :param optional_data: True if the data is optionnal
         :type optional_data: bool
+        :param cog: save file as Cloud Optimized GeoTIFF
+        :type cog: bool
         """
 
         self.file_names.append(file_name)
@@ -249,6 +273,7 @@ class SingleCarsDatasetSaver:
         self.dtypes.append(dtype)
         self.nodatas.append(nodata)
         self.optional_data_list.append(optional_data)
+        self.cogs.append(cog)
 
     def save(self, future_result):
         """
@@ -272,6 +297,7 @@ class SingleCarsDatasetSaver:
                                 tag=self.tags[count],
                                 dtype=self.dtypes[count],
                                 nodata=self.nodatas[count],
+                                cog=self.cogs[count],
                             )
                             self.descriptors.append(desc)
                         else:
@@ -304,12 +330,15 @@ class SingleCarsDatasetSaver:
                     self.folder_name = self.file_names[0]
                     if not os.path.exists(self.folder_name):
                         os.makedirs(self.folder_name)
+                    self.dataframe_writer = dataframe_writer.DataframeWriter()
                     self.already_seen = True
 
                 self.cars_ds.run_save(
                     future_result,
                     os.path.join(self.folder_name, repr(self.count)),
                     overwrite=not self.already_seen,
+                    writer=self.dataframe_writer,
+                    laz_file_name=os.path.normpath(self.folder_name) + ".laz",
                 )
                 self.count += 1
 
@@ -352,10 +381,12 @@ class SingleCarsDatasetSaver:
                 ref_confidence_path = self.file_names[index]
                 confidence_dtype = self.dtypes[index]
                 confidence_nodatas = self.nodatas[index]
+                confidence_cog = self.cogs[index]
                 # delete the generic confidence registered values
                 self.tags.pop(index)
                 self.dtypes.pop(index)
                 self.nodatas.pop(index)
+                self.cogs.pop(index)
                 self.file_names.pop(index)
 
                 for item in confidence_tags:
@@ -367,6 +398,7 @@ class SingleCarsDatasetSaver:
                     )
                     self.dtypes.append(confidence_dtype)
                     self.nodatas.append(confidence_nodatas)
+                    self.cogs.append(confidence_cog)
 
     def cleanup(self):
         """
@@ -381,4 +413,97 @@ class SingleCarsDatasetSaver:
             if desc is not None:
                 desc.close()
 
-        # TODO merge point clouds ?
+        # close points clouds files
+        if self.dataframe_writer is not None:
+            self.dataframe_writer.close()
+
+
+class WritingThreadPool:
+    """
+    WritingThreadPool
+
+    Pool of threads writing results while next results are computed.
+    Results of a CarsDataset are always written by the same thread,
+    in arrival order: files descriptors are never shared between threads.
+    Submitting blocks when the thread queue is full.
+    """
+
+    def __init__(
+        self, nb_threads=NB_WRITING_THREADS, queue_size=WRITING_QUEUE_SIZE
+    ):
+        """
+        Init function of WritingThreadPool
+
+        :param nb_threads: number of writing threads
+        :type nb_threads: int
+        :param queue_size: maximum number of results waiting to be
+            written by each thread
+        :type queue_size: int
+        """
+        self.queues = [
+            queue.Queue(maxsize=queue_size) for _ in range(nb_threads)
+        ]
+        self.threads = [
+            threading.Thread(
+                target=run_writing_tasks, args=(tasks,), daemon=True
+            )
+            for tasks in self.queues
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def __enter__(self):
+        """
+        Function run on enter
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback_msg):
+        """
+        Function run on exit, wait for all results to be written
+        """
+        self.close()
+
+    def submit(self, obj_id, function, future_result, callback=None):
+        """
+        Submit a writing task to the thread of CarsDataset
+
+        :param obj_id: cars dataset id
+        :type obj_id: int
+        :param function: writing function, taking future_result
+        :param future_result: xr.Dataset or pandas.DataFrame
+        :param callback: function called once result is written
+        """
+        self.queues[obj_id % len(self.queues)].put(
+            (function, future_result, callback)
+        )
+
+    def close(self):
+        """
+        Wait for all submitted results to be written, and stop threads
+        """
+        for tasks in self.queues:
+            tasks.put(None)
+        for thread in self.threads:
+            thread.join()
+
+
+def run_writing_tasks(tasks):
+    """
+    Run writing tasks of a queue, until a None task is received
+
+    :param tasks: queue of (function, future_result, callback) tasks
+    :type tasks: queue.Queue
+    """
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        function, future_result, callback = task
+        try:
+            function(future_result)
+        except:  # pylint: disable=W0702 # noqa: B001, E722
+            logging.error(traceback.format_exc())
+            logging.error("Tile not saved")
+        if callback is not None:
+            callback()
@@ -47,7 +47,10 @@ class CarsDatasetRegistryUnseen(AbstractCarsDatasetRegistry):
 
         """
         super().__init__(id_generator)
-        self.registered_cars_datasets_unseen = []
+        # unseen objects indexed by cars dataset id
+        self.registered_cars_datasets_unseen = {}
+        # cars datasets ids indexed by python object id
+        self.registered_ids = {}
 
     def cars_dataset_in_registry(self, cars_ds):
         """
@@ -60,15 +63,9 @@ class CarsDatasetRegistryUnseen(AbstractCarsDatasetRegistry):
         :rtype : Tuple(bool, int)
         """
 
-        in_registry = False
-        registered_id = None
-        for obj in self.registered_cars_datasets_unseen:
-            if cars_ds == obj.cars_ds:
-                in_registry = True
-                registered_id = obj.obj_id
-                break
+        registered_id = self.registered_ids.get(id(cars_ds), None)
 
-        return in_registry, registered_id
+        return registered_id is not None, registered_id
 
     def add_cars_ds_to_unseen(self, cars_ds):
         """
@@ -86,7 +83,8 @@ class CarsDatasetRegistryUnseen(AbstractCarsDatasetRegistry):
         new_id = self.id_generator.get_new_id(cars_ds)
         # create CarsDataset replacer (same storage)
         unseen_obj = SingleCarsDatasetReplacer(cars_ds, new_id)
-        self.registered_cars_datasets_unseen.append(unseen_obj)
+        self.registered_cars_datasets_unseen[new_id] = unseen_obj
+        self.registered_ids[id(cars_ds)] = new_id
 
         return new_id
 
@@ -100,7 +98,7 @@ class CarsDatasetRegistryUnseen(AbstractCarsDatasetRegistry):
         """
         cars_ds_list = []
 
-        for cars_ds_saver in self.registered_cars_datasets_unseen:
+        for cars_ds_saver in self.registered_cars_datasets_unseen.values():
             cars_ds_list.append(cars_ds_saver.cars_ds)
 
         return cars_ds_list
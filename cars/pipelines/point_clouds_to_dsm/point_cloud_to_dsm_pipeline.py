@@ -372,4 +372,5 @@ class PointCloudsToDsmPipeline(PipelineTemplate):
                 color_file_name=os.path.join(
                     out_dir, self.output[sens_cst.CLR_BASENAME]
                 ),
+                cog=self.output[sens_cst.COG],
             )
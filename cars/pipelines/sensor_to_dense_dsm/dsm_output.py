@@ -64,6 +64,9 @@ def dense_dsm_check_output(conf):
     overloaded_conf[sensors_cst.INFO_BASENAME] = overloaded_conf.get(
         sensors_cst.INFO_BASENAME, "content.json"
     )
+    overloaded_conf[sensors_cst.COG] = overloaded_conf.get(
+        sensors_cst.COG, False
+    )
 
     # Check schema
     output_schema = {
@@ -71,6 +74,7 @@ def dense_dsm_check_output(conf):
         sensors_cst.DSM_BASENAME: str,
         sensors_cst.CLR_BASENAME: str,
         sensors_cst.INFO_BASENAME: str,
+        sensors_cst.COG: bool,
     }
     checker_output = Checker(output_schema)
     checker_output.validate(overloaded_conf)
@@ -56,3 +56,4 @@ OUT_DIR = "out_dir"
 DSM_BASENAME = "dsm_basename"
 CLR_BASENAME = "clr_basename"
 INFO_BASENAME = "info_basename"
+COG = "cog"
@@ -676,9 +676,9 @@ class SensorToDenseDsmPipeline(PipelineTemplate):
                         self.dense_matching_application.get_optimal_tile_size(
                             disp_min,
                             disp_max,
-                            cars_orchestrator.cluster.checked_conf_cluster[
-                                "max_ram_per_worker"
-                            ],
+                            cars_orchestrator.cluster.get_max_ram_per_worker(
+                                self.dense_matching_application.task_name
+                            ),
                         )
                     ),
                     add_color=True,
@@ -879,6 +879,7 @@ class SensorToDenseDsmPipeline(PipelineTemplate):
                     color_file_name=os.path.join(
                         out_dir, self.output[sens_cst.CLR_BASENAME]
                     ),
+                    cog=self.output[sens_cst.COG],
                 )
 
     def update_conf(self, grid_correction_coef, dmin, dmax, pair_key):
@@ -541,6 +541,7 @@ class SensorSparseDsmPipeline(PipelineTemplate):
                     self.used_conf[OUTPUT]["out_dir"],
                     self.output[sens_cst.DSM_BASENAME],
                 ),
+                cog=self.output[sens_cst.COG],
             )
 
     def update_full_res_conf(self, grid_correction_coef, dmin, dmax, pair_key):
@@ -23,6 +23,9 @@ Test module for cars/steps/matching/dense_matching_tools.py
 Important : Uses conftest.py for shared pytest fixtures
 """
 
+# Standard imports
+import logging
+
 # Third party imports
 import numpy as np
 import pytest
@@ -131,6 +134,87 @@ def test_compute_disparity_1():
     assert_same_datasets(output, ref, atol=5.0e-6)
 
 
+@pytest.mark.unit_tests
+def test_compute_disparity_reused_machine():
+    """
+    Test compute_disparity on ventoux dataset with pandora, with the
+    pandora state machine of a previous tile
+    """
+    left_input = xr.open_dataset(
+        absolute_data_path("input/intermediate_results/data1_ref_left.nc")
+    )
+    right_input = xr.open_dataset(
+        absolute_data_path("input/intermediate_results/data1_ref_right.nc")
+    )
+
+    corr_cfg = create_corr_conf(corr_conf_defaut())
+    machine_key = dense_matching_tools.get_pandora_machine_key(
+        corr_cfg["pipeline"]
+    )
+
+    outputs = []
+    for _ in range(2):
+        outputs.append(
+            dense_matching_tools.compute_disparity(
+                left_input.copy(), right_input.copy(), corr_cfg, -13, 14
+            )
+        )
+        pandora_machine = dense_matching_tools.PANDORA_MACHINES[machine_key]
+        assert pandora_machine.state == "begin"
+        assert pandora_machine.left_cv is None
+
+    ref = xr.open_dataset(absolute_data_path("ref_output/disp1_ref_pandora.nc"))
+    for output in outputs:
+        assert_same_datasets(output, ref, atol=5.0e-6)
+
+
+@pytest.mark.unit_tests
+def test_pandora_machines_cache():
+    """
+    Test that pandora state machines are reused by key, and that only
+    the last used machines are kept
+    """
+    nb_machines = dense_matching_tools.PANDORA_MACHINES_SIZE
+    keys = [("pipeline_{}".format(index), 0) for index in range(nb_machines)]
+    machines = [dense_matching_tools.get_pandora_machine(key) for key in keys]
+
+    # first machine is used again: second one is the least recently used
+    assert dense_matching_tools.get_pandora_machine(keys[0]) is machines[0]
+    dense_matching_tools.get_pandora_machine(("pipeline_new", 0))
+
+    assert len(dense_matching_tools.PANDORA_MACHINES) == nb_machines
+    assert keys[0] in dense_matching_tools.PANDORA_MACHINES
+    assert keys[1] not in dense_matching_tools.PANDORA_MACHINES
+
+
+@pytest.mark.unit_tests
+def test_pandora_machine_rebound_triggers(caplog):
+    """
+    Test that only the warnings of transitions about the triggers
+    of a reused pandora state machine are filtered
+    """
+    transitions_logger = logging.getLogger("transitions.core")
+    transitions_logger.removeFilter(
+        dense_matching_tools.REBOUND_TRIGGERS_FILTER
+    )
+    machine_key = ("pipeline_rebound", 0)
+    dense_matching_tools.get_pandora_machine(machine_key)
+    assert dense_matching_tools.REBOUND_TRIGGERS_FILTER not in (
+        transitions_logger.filters
+    )
+
+    dense_matching_tools.get_pandora_machine(machine_key)
+    with caplog.at_level(logging.WARNING, logger="transitions.core"):
+        transitions_logger.warning(
+            dense_matching_tools.TRANSITIONS_REBIND_MSG, "", "may_aggregation"
+        )
+        transitions_logger.warning(
+            dense_matching_tools.TRANSITIONS_REBIND_MSG, "", "other"
+        )
+    assert "may_aggregation" not in caplog.text
+    assert "'other'" in caplog.text
+
+
 @pytest.mark.unit_tests
 def test_compute_disparity_3():
     """
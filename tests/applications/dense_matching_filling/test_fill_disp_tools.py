@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+# coding: utf8
+#
+# Copyright (c) 2023 Centre National d'Etudes Spatiales (CNES).
+#
+# This file is part of CARS
+# (see https://github.com/CNES/cars).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Test module for cars/applications/dense_matches_filling/fill_disp_tools.py
+"""
+
+# Standard imports
+import logging
+import time
+
+# Third party imports
+import numpy as np
+import pytest
+from shapely import STRtree
+from shapely.geometry import box
+
+# CARS imports
+from cars.applications.dense_matches_filling import fill_disp_tools
+
+# 16 directions : [row, col], the 8 first are the sgm ones
+DIRECTIONS = [
+    (0.0, 1.0),
+    (-1.0, 1.0),
+    (-1.0, 0.0),
+    (-1.0, -1.0),
+    (0.0, -1.0),
+    (1.0, -1.0),
+    (1.0, 0.0),
+    (1.0, 1.0),
+    (-0.5, 1.0),
+    (-1.0, 0.5),
+    (-1.0, -0.5),
+    (-0.5, -1.0),
+    (0.5, -1.0),
+    (1.0, -0.5),
+    (1.0, 0.5),
+    (0.5, 1.0),
+]
+
+
+def fill_disp_pandora_reference(disp, msk_fill_disp, nb_directions):
+    """
+    Pixel per pixel version of fill_disp_pandora
+    """
+    out_disp = np.copy(disp)
+    nb_rows, nb_cols = disp.shape
+    max_path_length = max(nb_rows, nb_cols)
+    for row, col in zip(*np.nonzero(msk_fill_disp)):  # noqa: B905
+        valid_neighbors = np.zeros(nb_directions, dtype=np.float32)
+        for direction, (d_row, d_col) in enumerate(DIRECTIONS[:nb_directions]):
+            for i in range(1, max_path_length):
+                tmp_row = row + int(d_row * i)
+                tmp_col = col + int(d_col * i)
+                if not (0 <= tmp_row < nb_rows and 0 <= tmp_col < nb_cols):
+                    valid_neighbors[direction] = np.nan
+                    break
+                if not msk_fill_disp[tmp_row, tmp_col]:
+                    valid_neighbors[direction] = disp[tmp_row, tmp_col]
+                    break
+        out_disp[row, col] = np.nanmedian(valid_neighbors)
+    return out_disp
+
+
+@pytest.mark.unit_tests
+@pytest.mark.parametrize("nb_directions", [8, 16])
+def test_fill_disp_pandora(nb_directions):
+    """
+    Compare fill_disp_pandora with a pixel per pixel version,
+    on a random disparity map with a large hole and sparse invalid pixels
+    """
+    rng = np.random.default_rng(0)
+    disp = rng.uniform(-10, 10, size=(40, 60)).astype(np.float32)
+    msk_fill_disp = rng.random(disp.shape) < 0.3
+    msk_fill_disp[10:30, 5:40] = True
+    msk_fill_disp[:, 0] = True
+    ref_msk_fill_disp = np.copy(msk_fill_disp)
+
+    out_disp, out_msk = fill_disp_tools.fill_disp_pandora(
+        disp, msk_fill_disp, nb_directions
+    )
+
+    np.testing.assert_array_equal(
+        out_disp,
+        fill_disp_pandora_reference(disp, msk_fill_disp, nb_directions),
+    )
+    assert not np.any(out_msk)
+    np.testing.assert_array_equal(msk_fill_disp, ref_msk_fill_disp)
+
+
+@pytest.mark.benchmark_tests
+def test_fill_disp_pandora_benchmark():
+    """
+    Benchmark fill_disp_pandora on a synthetic 4000x4000 disparity map,
+    with a large water like hole and sparse invalid pixels
+    """
+    rng = np.random.default_rng(42)
+    size = 4000
+    disp = rng.uniform(-10, 10, size=(size, size)).astype(np.float32)
+    rows, cols = np.mgrid[0:size, 0:size]
+    msk_fill_disp = (rows - size / 2) ** 2 + (cols - size / 3) ** 2 < (
+        size / 5
+    ) ** 2
+    msk_fill_disp |= rng.random(disp.shape) < 0.05
+
+    # first call compiles the kernel
+    fill_disp_tools.fill_disp_pandora(
+        disp[:10, :10], msk_fill_disp[:10, :10], 16
+    )
+
+    start = time.perf_counter()
+    _, out_msk = fill_disp_tools.fill_disp_pandora(disp, msk_fill_disp, 16)
+    logging.info(
+        "fill_disp_pandora of {} pixels: {:.2f}s".format(
+            np.sum(msk_fill_disp), time.perf_counter() - start
+        )
+    )
+
+    assert not np.any(out_msk)
+
+
+def merge_intersecting_polygones_reference(list_poly):
+    """
+    Pairwise version of merge_intersecting_polygones, merging
+    until no polygons intersect
+    """
+    merged_list = list(list_poly)
+    pos = 0
+    while pos < len(merged_list):
+        for other in range(pos + 1, len(merged_list)):
+            if merged_list[pos].intersects(merged_list[other]):
+                merged_list[pos] = merged_list[pos].union(
+                    merged_list.pop(other)
+                )
+                break
+        else:
+            pos += 1
+    return merged_list
+
+
+def generate_boxes(nb_boxes, size, max_box_size, seed=0):
+    """
+    Generate random boxes in a size x size area
+    """
+    rng = np.random.default_rng(seed)
+    mins = rng.uniform(0, size, size=(nb_boxes, 2))
+    maxs = mins + rng.uniform(1, max_box_size, size=(nb_boxes, 2))
+    return [
+        box(xmin, ymin, xmax, ymax)
+        for (xmin, ymin), (xmax, ymax) in zip(mins, maxs)  # noqa: B905
+    ]
+
+
+@pytest.mark.unit_tests
+def test_merge_intersecting_polygones():
+    """
+    Test merge_intersecting_polygones with polygons intersecting
+    through another one, and on random boxes
+    """
+    list_poly = [
+        box(0, 0, 2, 2),
+        box(3, 0, 5, 2),
+        box(1, 1, 4, 3),
+        box(10, 10, 11, 11),
+    ]
+
+    merged_list = fill_disp_tools.merge_intersecting_polygones(list_poly)
+
+    assert len(merged_list) == 2
+    assert merged_list[0].equals(
+        list_poly[0].union(list_poly[1]).union(list_poly[2])
+    )
+    assert merged_list[1] is list_poly[3]
+    assert not fill_disp_tools.merge_intersecting_polygones([])
+
+    list_poly = generate_boxes(200, 100, 8)
+    merged_list = fill_disp_tools.merge_intersecting_polygones(list_poly)
+    ref_merged_list = merge_intersecting_polygones_reference(list_poly)
+    assert len(merged_list) == len(ref_merged_list)
+    for poly, ref_poly in zip(merged_list, ref_merged_list):  # noqa: B905
+        assert poly.equals(ref_poly)
+
+
+class FakeCarsDataset:  # pylint: disable=too-few-public-methods
+    """
+    Tiled dataset with tiling grid, overlaps and tiles
+    """
+
+    def __init__(self, tiling_grid):
+        self.tiling_grid = tiling_grid
+        self.overlaps = np.zeros_like(tiling_grid)
+        self.tiles = np.arange(tiling_grid.shape[0] * tiling_grid.shape[1])
+        self.tiles = self.tiles.reshape(tiling_grid.shape[:2])
+
+    def __getitem__(self, key):
+        return self.tiles[key]
+
+
+@pytest.mark.unit_tests
+def test_get_corresponding_holes_and_tiles():
+    """
+    Compare get_corresponding_holes and get_corresponding_tiles
+    with pairwise intersections on random holes
+    """
+    tiling_grid = np.zeros((4, 5, 4))
+    tiles_polygones = {}
+    for col in range(5):
+        for row in range(4):
+            tiling_grid[row, col] = [
+                25 * row,
+                25 * (row + 1),
+                20 * col,
+                20 * (col + 1),
+            ]
+            tiles_polygones[(row, col)] = box(
+                25 * row, 20 * col, 25 * (row + 1), 20 * (col + 1)
+            )
+    epi_disp_map = FakeCarsDataset(tiling_grid)
+    holes = generate_boxes(50, 100, 30)
+
+    for (row, col), tile_poly in tiles_polygones.items():
+        corresponding_holes = fill_disp_tools.get_corresponding_holes(
+            tile_poly, holes
+        )
+        assert corresponding_holes == [
+            hole for hole in holes if tile_poly.intersects(hole)
+        ]
+
+        corresponding_tiles = fill_disp_tools.get_corresponding_tiles(
+            tiles_polygones, corresponding_holes, epi_disp_map
+        )
+        ref_tiles = [
+            epi_disp_map[key]
+            for key, poly in tiles_polygones.items()
+            if any(poly.intersects(hole) for hole in corresponding_holes)
+        ]
+        assert [tile for _, _, tile in corresponding_tiles] == ref_tiles
+        assert epi_disp_map[row, col] in ref_tiles
+
+    assert not fill_disp_tools.get_corresponding_tiles(
+        tiles_polygones, [], epi_disp_map
+    )
+
+
+@pytest.mark.benchmark_tests
+def test_merge_intersecting_polygones_benchmark():
+    """
+    Benchmark merge_intersecting_polygones and holes association
+    on 10000 random holes, in a 100x100 tiles grid
+    """
+    list_poly = generate_boxes(10000, 10000, 30, seed=42)
+
+    start = time.perf_counter()
+    merged_list = fill_disp_tools.merge_intersecting_polygones(list_poly)
+    logging.info(
+        "merge_intersecting_polygones of {} polygons: {:.2f}s".format(
+            len(list_poly), time.perf_counter() - start
+        )
+    )
+
+    tiling_grid = np.zeros((100, 100, 4))
+    tiles_polygones = {}
+    for col in range(100):
+        for row in range(100):
+            tiling_grid[row, col] = [
+                100 * row,
+                100 * (row + 1),
+                100 * col,
+                100 * (col + 1),
+            ]
+            tiles_polygones[(row, col)] = box(
+                100 * row, 100 * col, 100 * (row + 1), 100 * (col + 1)
+            )
+    epi_disp_map = FakeCarsDataset(tiling_grid)
+
+    start = time.perf_counter()
+    holes_tree = STRtree(merged_list)
+    tiles_tree = STRtree(list(tiles_polygones.values()))
+    nb_corresponding_tiles = 0
+    for tile_poly in tiles_polygones.values():
+        corresponding_holes = fill_disp_tools.get_corresponding_holes(
+            tile_poly, merged_list, holes_tree=holes_tree
+        )
+        nb_corresponding_tiles += len(
+            fill_disp_tools.get_corresponding_tiles(
+                tiles_polygones,
+                corresponding_holes,
+                epi_disp_map,
+                tiles_tree=tiles_tree,
+            )
+        )
+    logging.info(
+        "holes association of {} tiles: {:.2f}s".format(
+            len(tiles_polygones), time.perf_counter() - start
+        )
+    )
+
+    assert len(merged_list) < len(list_poly)
+    assert nb_corresponding_tiles > 0
@@ -37,7 +37,7 @@ from cars.applications.point_cloud_fusion import point_cloud_tools
 from cars.core import constants as cst
 
 # CARS Tests imports
-from tests.helpers import add_color, assert_same_datasets
+from tests.helpers import add_color
 
 
 @pytest.mark.unit_tests
@@ -599,85 +599,3 @@ def test_filter_cloud():
     )
 
     assert removed_elt_pos is None
-
-
-@pytest.mark.unit_tests
-def test_add_cloud_filtering_msk():
-    """
-    Create fake cloud, msk, cfg to test add_cloud_filtering_msk function
-    """
-    nb_row = 5
-    nb_col = 10
-    rows = np.array(range(nb_row))
-    cols = np.array(range(nb_col))
-
-    ds0 = xr.Dataset({}, coords={"row": rows, "col": cols})
-    ds1 = xr.Dataset({}, coords={"row": rows, "col": cols})
-
-    pos_arr = np.array([[1, 2, 0], [2, 2, 1]])
-    elt_remove = pandas.DataFrame(
-        pos_arr, columns=["coord_epi_geom_i", "coord_epi_geom_j", "idx_im_epi"]
-    )
-
-    point_cloud_tools.add_cloud_filtering_msk(
-        [ds0, ds1], elt_remove, "mask", 255
-    )
-
-    mask0 = np.zeros((nb_row, nb_col), dtype=np.uint16)
-    mask0[1, 2] = 255
-    mask1 = np.zeros((nb_row, nb_col), dtype=np.uint16)
-    mask1[2, 2] = 255
-    ds0_ref = xr.Dataset(
-        {"mask": (["row", "col"], mask0)}, coords={"row": rows, "col": cols}
-    )
-    ds1_ref = xr.Dataset(
-        {"mask": (["row", "col"], mask1)}, coords={"row": rows, "col": cols}
-    )
-
-    assert_same_datasets(ds0_ref, ds0)
-    assert_same_datasets(ds1_ref, ds1)
-
-    # test exceptions
-    np_pos = np.array([[1, 2, 2], [2, 2, 1]])
-    elt_remove = pandas.DataFrame(
-        np_pos,
-        columns=["coord_epi_geom_i", "coord_epi_geom_j", "idx_im_epi"],
-    )
-    with pytest.raises(Exception) as index_error:
-        point_cloud_tools.add_cloud_filtering_msk(
-            [ds0, ds1], elt_remove, "mask", 255
-        )
-    assert (
-        str(index_error.value) == "Index indicated in the elt_pos_infos "
-        "pandas. DataFrame is not coherent with the clouds "
-        "list given in input"
-    )
-
-    np_pos = np.array([[1, 2, -1], [2, 2, 1]])
-    elt_remove = pandas.DataFrame(
-        np_pos,
-        columns=["coord_epi_geom_i", "coord_epi_geom_j", "idx_im_epi"],
-    )
-    with pytest.raises(Exception) as index_error:
-        point_cloud_tools.add_cloud_filtering_msk(
-            [ds0, ds1], elt_remove, "mask", 255
-        )
-    assert (
-        str(index_error.value) == "Index indicated in the elt_pos_infos "
-        "pandas. DataFrame is not coherent "
-        "with the clouds list given in input"
-    )
-
-    np_pos = np.array([[11, 2, 0]])
-    elt_remove = pandas.DataFrame(
-        np_pos,
-        columns=["coord_epi_geom_i", "coord_epi_geom_j", "idx_im_epi"],
-    )
-    with pytest.raises(Exception) as index_error:
-        point_cloud_tools.add_cloud_filtering_msk(
-            [ds0, ds1], elt_remove, "mask", 255
-        )
-    assert (
-        str(index_error.value) == "Point at location (11,2) is not "
-        "accessible in an image of size (5,10)"
-    )
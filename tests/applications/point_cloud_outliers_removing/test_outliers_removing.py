@@ -22,9 +22,17 @@
 Cars tests/points_cloud_outliers_removing  file
 """
 
+# Standard imports
+import logging
+import time
+
 # Third party imports
 import numpy as np
+import pandas
 import pytest
+import xarray as xr
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial.distance import cdist
 
 # CARS imports
 from cars.applications.point_cloud_outliers_removing import (
@@ -32,6 +40,7 @@ from cars.applications.point_cloud_outliers_removing import (
 )
 
 # CARS Tests imports
+from tests.helpers import assert_same_datasets
 
 
 @pytest.mark.unit_tests
@@ -71,6 +80,85 @@ def test_detect_small_components():
     assert sorted(indexes_to_filter) == [0, 1, 3, 4, 5, 6, 24]
 
 
+def detect_small_components_reference(
+    cloud_arr, connection_val, nb_pts_threshold, clusters_distance_threshold
+):
+    """
+    Brute force version of detect_small_components, using full distance matrix
+    """
+    distances = cdist(cloud_arr, cloud_arr)
+    _, labels = connected_components(
+        distances <= connection_val, directed=False
+    )
+
+    indexes_to_filter = []
+    for label in np.unique(labels):
+        cluster = np.flatnonzero(labels == label)
+        if cluster.size >= nb_pts_threshold:
+            continue
+        if clusters_distance_threshold is not None:
+            close_points = np.any(
+                distances[cluster] <= clusters_distance_threshold, axis=0
+            )
+            close_points[cluster] = False
+            if np.any(close_points):
+                continue
+        indexes_to_filter.extend(cluster.tolist())
+
+    return sorted(indexes_to_filter)
+
+
+@pytest.mark.unit_tests
+@pytest.mark.parametrize("clusters_distance_threshold", [None, 1.5])
+def test_detect_small_components_random(clusters_distance_threshold):
+    """
+    Compare detect_small_components with brute force version
+    on random clouds
+    """
+    rng = np.random.default_rng(0)
+    cloud_arr = np.concatenate(
+        [rng.normal(size=(400, 3)), rng.uniform(-10, 10, size=(200, 3))]
+    )
+
+    indexes_to_filter = outlier_removing_tools.detect_small_components(
+        cloud_arr, 0.5, 10, clusters_distance_threshold
+    )
+    assert sorted(indexes_to_filter) == detect_small_components_reference(
+        cloud_arr, 0.5, 10, clusters_distance_threshold
+    )
+
+
+@pytest.mark.benchmark_tests
+def test_detect_small_components_benchmark():
+    """
+    Benchmark detect_small_components on a synthetic 5M points cloud:
+    a 0.5m resolution surface and 1M sparse outliers above it
+    """
+    rng = np.random.default_rng(42)
+    x_coord, y_coord = np.meshgrid(np.arange(2000) * 0.5, np.arange(2000) * 0.5)
+    z_coord = 10 * np.sin(x_coord / 50) + rng.normal(
+        scale=0.05, size=x_coord.shape
+    )
+    surface = np.stack(
+        (x_coord.ravel(), y_coord.ravel(), z_coord.ravel()), axis=-1
+    )
+    outliers = rng.uniform([0, 0, 50], [1000, 1000, 100], size=(1000000, 3))
+    cloud_arr = np.concatenate([surface, outliers])
+
+    start = time.perf_counter()
+    indexes_to_filter = outlier_removing_tools.detect_small_components(
+        cloud_arr, 0.7, 50, 3.0
+    )
+    logging.info(
+        "detect_small_components on {} points: {:.2f}s".format(
+            cloud_arr.shape[0], time.perf_counter() - start
+        )
+    )
+
+    # the surface is never filtered
+    assert np.min(indexes_to_filter) >= surface.shape[0]
+
+
 @pytest.mark.unit_tests
 def test_detect_statistical_outliers():
     """
@@ -114,3 +202,146 @@ def test_detect_statistical_outliers():
         ref_cloud, 4, 2.0
     )
     assert sorted(removed_elt_pos) == [23, 29]
+
+
+@pytest.mark.unit_tests
+def test_detect_statistical_outliers_chunks():
+    """
+    Check that detect_statistical_outliers is independent
+    of the query chunks and threads
+    """
+    rng = np.random.default_rng(0)
+    cloud_arr = np.concatenate(
+        [rng.normal(size=(1000, 3)), rng.uniform(-10, 10, size=(50, 3))]
+    )
+
+    ref_removed_elt_pos = outlier_removing_tools.detect_statistical_outliers(
+        cloud_arr, 10, 1.0
+    )
+    removed_elt_pos = outlier_removing_tools.detect_statistical_outliers(
+        cloud_arr, 10, 1.0, workers=-1, chunk_size=128
+    )
+    assert removed_elt_pos == ref_removed_elt_pos
+
+
+@pytest.mark.unit_tests
+def test_add_cloud_filtering_msk():
+    """
+    Create fake cloud, msk, cfg to test add_cloud_filtering_msk function
+    """
+    nb_row = 5
+    nb_col = 10
+    rows = np.array(range(nb_row))
+    cols = np.array(range(nb_col))
+
+    ds0 = xr.Dataset({}, coords={"row": rows, "col": cols})
+    ds1 = xr.Dataset({}, coords={"row": rows, "col": cols})
+
+    pos_arr = np.array([[1, 2, 0], [2, 2, 1]])
+    elt_remove = pandas.DataFrame(
+        pos_arr, columns=["coord_epi_geom_i", "coord_epi_geom_j", "idx_im_epi"]
+    )
+
+    outlier_removing_tools.add_cloud_filtering_msk(
+        [ds0, ds1], elt_remove, "mask", 255
+    )
+
+    mask0 = np.zeros((nb_row, nb_col), dtype=np.uint16)
+    mask0[1, 2] = 255
+    mask1 = np.zeros((nb_row, nb_col), dtype=np.uint16)
+    mask1[2, 2] = 255
+    ds0_ref = xr.Dataset(
+        {"mask": (["row", "col"], mask0)}, coords={"row": rows, "col": cols}
+    )
+    ds1_ref = xr.Dataset(
+        {"mask": (["row", "col"], mask1)}, coords={"row": rows, "col": cols}
+    )
+
+    assert_same_datasets(ds0_ref, ds0)
+    assert_same_datasets(ds1_ref, ds1)
+
+    # test exceptions
+    np_pos = np.array([[1, 2, 2], [2, 2, 1]])
+    elt_remove = pandas.DataFrame(
+        np_pos,
+        columns=["coord_epi_geom_i", "coord_epi_geom_j", "idx_im_epi"],
+    )
+    with pytest.raises(Exception) as index_error:
+        outlier_removing_tools.add_cloud_filtering_msk(
+            [ds0, ds1], elt_remove, "mask", 255
+        )
+    assert (
+        str(index_error.value) == "Index indicated in the elt_pos_infos "
+        "pandas. DataFrame is not coherent with the clouds "
+        "list given in input"
+    )
+
+    np_pos = np.array([[1, 2, -1], [2, 2, 1]])
+    elt_remove = pandas.DataFrame(
+        np_pos,
+        columns=["coord_epi_geom_i", "coord_epi_geom_j", "idx_im_epi"],
+    )
+    with pytest.raises(Exception) as index_error:
+        outlier_removing_tools.add_cloud_filtering_msk(
+            [ds0, ds1], elt_remove, "mask", 255
+        )
+    assert (
+        str(index_error.value) == "Index indicated in the elt_pos_infos "
+        "pandas. DataFrame is not coherent "
+        "with the clouds list given in input"
+    )
+
+    np_pos = np.array([[11, 2, 0]])
+    elt_remove = pandas.DataFrame(
+        np_pos,
+        columns=["coord_epi_geom_i", "coord_epi_geom_j", "idx_im_epi"],
+    )
+    with pytest.raises(Exception) as index_error:
+        outlier_removing_tools.add_cloud_filtering_msk(
+            [ds0, ds1], elt_remove, "mask", 255
+        )
+    assert (
+        str(index_error.value) == "Point at location (11,2) is not "
+        "accessible in an image of size (5,10)"
+    )
+
+
+@pytest.mark.unit_tests
+def test_add_cloud_filtering_msk_random():
+    """
+    Compare add_cloud_filtering_msk with a point per point scatter,
+    on several clouds with an already existing mask
+    """
+    rng = np.random.default_rng(0)
+    nb_row, nb_col, nb_clouds, nb_points = 50, 60, 3, 1000
+    coords = {"row": np.arange(nb_row), "col": np.arange(nb_col)}
+    clouds = [
+        xr.Dataset(
+            {
+                "mask": (
+                    ["row", "col"],
+                    rng.integers(0, 2, (nb_row, nb_col), dtype=np.uint16),
+                )
+            },
+            coords=coords,
+        )
+        for _ in range(nb_clouds)
+    ]
+    elt_remove = pandas.DataFrame(
+        {
+            "coord_epi_geom_i": rng.integers(0, nb_row, nb_points),
+            "coord_epi_geom_j": rng.integers(0, nb_col, nb_points),
+            "idx_im_epi": rng.integers(0, nb_clouds, nb_points),
+        }
+    )
+
+    ref_masks = [cloud["mask"].values.copy() for cloud in clouds]
+    for i, j, idx in elt_remove.to_numpy():
+        ref_masks[idx][i, j] = 255
+
+    outlier_removing_tools.add_cloud_filtering_msk(
+        clouds, elt_remove, "mask", 255
+    )
+
+    for cloud, ref_mask in zip(clouds, ref_masks):  # noqa: B905
+        np.testing.assert_array_equal(cloud["mask"].values, ref_mask)
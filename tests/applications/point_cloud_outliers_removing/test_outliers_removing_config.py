@@ -45,3 +45,16 @@ def test_check_conf_with_error():
     }
     with pytest.raises(json_checker.core.exceptions.DictCheckerError):
         _ = Statistical(conf)
+
+
+@pytest.mark.unit_tests
+def test_check_conf_workers():
+    """
+    Test configuration check for outliers removing application
+    with parallel tree queries
+    """
+    application = Statistical({"method": "statistical", "workers": -1})
+    assert application.workers == -1
+
+    with pytest.raises(json_checker.core.exceptions.DictCheckerError):
+        _ = Statistical({"method": "statistical", "workers": 0})
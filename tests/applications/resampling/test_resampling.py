@@ -91,6 +91,83 @@ def test_resample_image():
     assert_same_datasets(test_dataset, ref_dataset)
 
 
+@pytest.mark.unit_tests
+def test_resample_image_cache():
+    """
+    Test that successive resamplings of a tile share the same
+    localization grid, without modifying it
+    """
+    region = [387, 180, 564, 340]
+
+    img = absolute_data_path("input/phr_ventoux/left_image.tif")
+    grid = absolute_data_path("input/stereo_input/left_epipolar_grid.tif")
+
+    first_dataset = resampling_tools.resample_image(
+        img, grid, [612, 612], region=region, nodata=0
+    )
+    grid_region = [12, 6, 19, 12]
+    localization_grid = resampling_tools.read_localization_grid(
+        grid, grid_region
+    )
+    assert not localization_grid.flags.writeable
+
+    second_dataset = resampling_tools.resample_image(
+        img, grid, [612, 612], region=region, nodata=0
+    )
+    assert (
+        resampling_tools.read_localization_grid(grid, grid_region)
+        is localization_grid
+    )
+
+    assert_same_datasets(first_dataset, second_dataset)
+
+
+@pytest.mark.unit_tests
+def test_resample_images():
+    """
+    Test that resampling image, color and classification together
+    gives the same datasets as separate resamplings
+    """
+    region = [387, 180, 564, 340]
+
+    img = absolute_data_path("input/phr_ventoux/left_image.tif")
+    color = absolute_data_path("input/phr_ventoux/color_image.tif")
+    classif = absolute_data_path("input/phr_ventoux/left_classif.tif")
+    grid = absolute_data_path("input/stereo_input/left_epipolar_grid.tif")
+
+    test_datasets = resampling_tools.resample_images(
+        [img, color, classif],
+        grid,
+        [612, 612],
+        region=region,
+        nodata=0,
+        bands_coords=[False, cst.BAND_IM, cst.BAND_CLASSIF],
+        interpolators=["bicubic", "bicubic", "nearest"],
+    )
+
+    ref_datasets = [
+        resampling_tools.resample_image(
+            img, grid, [612, 612], region=region, nodata=0
+        ),
+        resampling_tools.resample_image(
+            color, grid, [612, 612], region=region, band_coords=cst.BAND_IM
+        ),
+        resampling_tools.resample_image(
+            classif,
+            grid,
+            [612, 612],
+            region=region,
+            band_coords=cst.BAND_CLASSIF,
+            interpolator="nearest",
+        ),
+    ]
+
+    for test_dataset, ref_dataset in zip(  # noqa: B905
+        test_datasets, ref_datasets
+    ):
+        assert_same_datasets(test_dataset, ref_dataset)
+
+
 @pytest.mark.unit_tests
 def test_epipolar_rectify_images_1(
     images_and_grids_conf,
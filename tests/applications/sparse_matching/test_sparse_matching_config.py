@@ -23,6 +23,7 @@ Test module for cars/applications/sparse_matching/sift.py
 """
 
 # Third party imports
+import json_checker
 import pytest
 
 # CARS imports
@@ -42,3 +43,16 @@ def test_check_conf_with_error():
     }
     with pytest.raises(ValueError):
         _ = Sift(conf)
+
+
+@pytest.mark.unit_tests
+def test_check_conf_matching_method():
+    """
+    Test configuration check for sparse matching application
+    with descriptors matching method
+    """
+    application = Sift({"method": "sift", "sift_matching_method": "kd_tree"})
+    assert application.sift_matching_method == "kd_tree"
+
+    with pytest.raises(json_checker.core.exceptions.DictCheckerError):
+        _ = Sift({"method": "sift", "sift_matching_method": "flann"})
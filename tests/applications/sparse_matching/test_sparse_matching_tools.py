@@ -25,6 +25,9 @@ Test module for cars/steps/matching/sparse_matching_tools.py
 # Standard imports
 from __future__ import absolute_import
 
+import logging
+import time
+
 # Third party imports
 import numpy as np
 import pytest
@@ -109,6 +112,109 @@ def test_dataset_matching():
     assert matches.shape == (0, 4)
 
 
+def match_descriptors_reference(
+    left_descr, right_descr, matching_threshold, backmatching
+):
+    """
+    Match descriptors with the full euclidean matrix distance
+    """
+    emd = sparse_matching_tools.euclidean_matrix_distance(
+        left_descr, right_descr
+    )
+    nearest_lr = np.argmin(emd, axis=1)
+    second_dist_lr = np.partition(emd, 1, axis=1)[:, 1]
+    ratio_lr = emd[np.arange(emd.shape[0]), nearest_lr] / second_dist_lr
+
+    matches_idx = np.column_stack(
+        (np.arange(emd.shape[0]), nearest_lr, ratio_lr)
+    )
+    if backmatching:
+        nearest_rl = np.argmin(emd, axis=0)
+        matches_idx = matches_idx[nearest_rl[nearest_lr] == matches_idx[:, 0]]
+
+    return matches_idx[matches_idx[:, -1] < matching_threshold]
+
+
+def generate_descriptors(nb_left, nb_right, rng):
+    """
+    Generate sift like descriptors: the first right descriptors are
+    noisy copies of the left ones, the others are random
+    """
+    left_descr = rng.uniform(0, 255, (nb_left, 128)).astype(np.float32)
+    nb_common = min(nb_left, nb_right) // 2
+    right_descr = rng.uniform(0, 255, (nb_right, 128)).astype(np.float32)
+    right_descr[:nb_common] = left_descr[:nb_common] + rng.normal(
+        scale=10, size=(nb_common, 128)
+    )
+
+    return left_descr, right_descr
+
+
+@pytest.mark.unit_tests
+@pytest.mark.parametrize("matching_method", ["brute_force", "kd_tree"])
+@pytest.mark.parametrize("backmatching", [True, False])
+def test_match_descriptors(matching_method, backmatching):
+    """
+    Compare match_descriptors with the full euclidean matrix distance version
+    """
+    rng = np.random.default_rng(0)
+    left_descr, right_descr = generate_descriptors(3000, 2500, rng)
+
+    matches_idx = sparse_matching_tools.match_descriptors(
+        left_descr,
+        right_descr,
+        matching_threshold=0.6,
+        backmatching=backmatching,
+        matching_method=matching_method,
+    )
+    ref_matches_idx = match_descriptors_reference(
+        left_descr, right_descr, 0.6, backmatching
+    )
+
+    assert matches_idx.shape[0] > 0
+    np.testing.assert_array_equal(matches_idx[:, :2], ref_matches_idx[:, :2])
+    np.testing.assert_allclose(
+        matches_idx[:, 2], ref_matches_idx[:, 2], rtol=1e-3
+    )
+
+    with pytest.raises(ValueError):
+        sparse_matching_tools.match_descriptors(
+            left_descr, right_descr, matching_method="unknown"
+        )
+
+
+@pytest.mark.benchmark_tests
+def test_match_descriptors_benchmark():
+    """
+    Benchmark brute force and KD-tree descriptors matching
+    on 20k keypoints per image
+    """
+    rng = np.random.default_rng(42)
+    left_descr, right_descr = generate_descriptors(20000, 20000, rng)
+
+    matches_idx = {}
+    for matching_method in sparse_matching_tools.MATCHING_METHODS:
+        start = time.perf_counter()
+        matches_idx[matching_method] = sparse_matching_tools.match_descriptors(
+            left_descr, right_descr, matching_method=matching_method
+        )
+        logging.info(
+            "{} matching of {} keypoints: {:.2f}s, {} matches".format(
+                matching_method,
+                left_descr.shape[0],
+                time.perf_counter() - start,
+                matches_idx[matching_method].shape[0],
+            )
+        )
+
+    # float32 and float64 distances ratios may differ around the threshold
+    brute_force_pairs = set(map(tuple, matches_idx["brute_force"][:, :2]))
+    kd_tree_pairs = set(map(tuple, matches_idx["kd_tree"][:, :2]))
+    assert len(brute_force_pairs & kd_tree_pairs) >= 0.99 * max(
+        len(brute_force_pairs), len(kd_tree_pairs)
+    )
+
+
 @pytest.mark.unit_tests
 def test_remove_epipolar_outliers():
     """
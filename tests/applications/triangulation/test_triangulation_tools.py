@@ -33,7 +33,7 @@ from cars.applications.triangulation import triangulation_tools
 
 # CARS imports
 from cars.core import constants as cst
-from cars.core.geometry import read_geoid_file
+from cars.core.geometry import GeoidInterpolator, read_geoid_file
 
 # CARS Tests imports
 from tests.helpers import (
@@ -205,3 +205,43 @@ def test_geoid_offset_from_pandas():
         atol=1e-3,
         rtol=1e-12,
     )
+
+
+@pytest.mark.unit_tests
+def test_geoid_offset_interpolator():
+    """
+    Compare geoid offset of points with nan, using a shared geoid
+    interpolator, with xarray interpolation of the geoid
+    """
+    geoid = read_geoid_file(get_geoid_path())
+    geoid_interpolator = GeoidInterpolator(geoid)
+
+    rng = np.random.default_rng(0)
+    points = pandas.DataFrame(
+        {
+            cst.X: rng.uniform(-180, 180, 1000),
+            cst.Y: rng.uniform(-89, 89, 1000),
+            cst.Z: rng.uniform(0, 100, 1000),
+        }
+    )
+    points.loc[0, cst.X] = np.nan
+    ref_z = (
+        points[cst.Z]
+        - geoid.interp(
+            {
+                "lat": xr.DataArray(points[cst.Y], dims="points"),
+                "lon": xr.DataArray(points[cst.X] % 360, dims="points"),
+            }
+        ).hgt.values
+    )
+
+    computed_geoid = triangulation_tools.geoid_offset(
+        points, geoid_interpolator
+    )
+
+    assert computed_geoid is points
+    np.testing.assert_allclose(computed_geoid[cst.Z], ref_z, rtol=1e-12)
+
+    # geoid not covering the point cloud
+    with pytest.raises(RuntimeError):
+        triangulation_tools.geoid_offset(points, geoid.sel(lat=slice(60, -60)))
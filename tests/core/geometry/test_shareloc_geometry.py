@@ -22,6 +22,11 @@
 Test module for cars/core/geometry/shareloc_geometry.py
 """
 
+# Standard imports
+import os
+import shutil
+import tempfile
+
 # Third party imports
 import pytest
 
@@ -30,7 +35,7 @@ from cars.conf import input_parameters
 from cars.core.geometry.shareloc_geometry import RPC_TYPE, SharelocGeometry
 
 # CARS Tests imports
-from ...helpers import absolute_data_path, get_geoid_path
+from ...helpers import absolute_data_path, get_geoid_path, temporary_dir
 
 
 @pytest.mark.unit_tests
@@ -64,3 +69,32 @@ def test_dir_loc_rpc():
     assert lat == pytest.approx(44.20805591262138, abs=1e-10)
     assert lon == pytest.approx(5.193409396203882, abs=1e-10)
     assert alt == pytest.approx(503.5502439683996, abs=1e-10)
+
+
+@pytest.mark.unit_tests
+def test_load_geom_model_cache():
+    """
+    Test that models are loaded once, and again when their file changes
+    """
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        model = os.path.join(directory, "image.geom")
+        shutil.copy(
+            absolute_data_path("input/phr_ventoux/left_image.geom"), model
+        )
+
+        shareloc_model = SharelocGeometry.load_geom_model(model, RPC_TYPE)
+        assert SharelocGeometry.load_geom_model(model, RPC_TYPE) is (
+            shareloc_model
+        )
+
+        # rewrite model file
+        shutil.copy(
+            absolute_data_path("input/phr_ventoux/right_image.geom"), model
+        )
+        os.utime(model, ns=(0, 0))
+        assert SharelocGeometry.load_geom_model(model, RPC_TYPE) is not (
+            shareloc_model
+        )
+
+        with pytest.raises(ValueError):
+            SharelocGeometry.load_geom_model(model, "unknown")
@@ -32,11 +32,13 @@ import tempfile
 import numpy as np
 import pandas
 import pytest
+import xarray as xr
 from shapely.affinity import translate
 from shapely.geometry import Polygon
 
 # CARS imports
 from cars.conf import input_parameters
+from cars.core import constants as cst
 from cars.core import inputs, projection
 
 # CARS Tests imports
@@ -85,6 +87,47 @@ def test_point_cloud_conversion_dataframe():
     np.testing.assert_allclose(utm_df.loc[:, ["x", "y", "z"]].values, utm_ref)
 
 
+@pytest.mark.unit_tests
+def test_coordinates_conversion_inplace():
+    """
+    Convert point cloud in place, chunk by chunk with several threads,
+    and compare with points_cloud_conversion
+    """
+    llh = np.load(absolute_data_path("input/rasterization_input/llh.npy"))
+    llh = np.reshape(llh, (-1, 3))
+    utm_ref = projection.points_cloud_conversion(llh, 4326, 32630)
+
+    coords = [np.array(llh[:, axis], dtype=np.float64) for axis in range(3)]
+    projection.coordinates_conversion_inplace(
+        coords, 4326, 32630, chunk_size=100, workers=4
+    )
+    np.testing.assert_array_equal(np.stack(coords, axis=-1), utm_ref)
+
+    with pytest.raises(TypeError):
+        projection.coordinates_conversion_inplace(
+            [np.array(llh[:, axis]) for axis in range(3)], 4326, 32630
+        )
+
+    # dataset variables are replaced, input arrays are not modified
+    llh_copy = np.copy(llh)
+    cloud = xr.Dataset(
+        {
+            key: ((cst.ROW, cst.COL), llh[:, axis].reshape(-1, 10))
+            for axis, key in enumerate([cst.X, cst.Y, cst.Z])
+        },
+        attrs={cst.EPSG: 4326},
+    )
+    projection.points_cloud_conversion_dataset(cloud, 32630)
+    assert cloud.attrs[cst.EPSG] == 32630
+    np.testing.assert_array_equal(cloud[cst.X].values.ravel(), utm_ref[:, 0])
+    np.testing.assert_array_equal(llh, llh_copy)
+
+    # transformers are shared
+    assert projection.get_transformer(4326, 32630) is (
+        projection.get_transformer(np.int64(4326), 32630)
+    )
+
+
 @pytest.mark.unit_tests
 def test_compute_dem_intersection_with_poly():
     """
@@ -38,7 +38,7 @@ import cars.core.constants as cst
 from cars.core import inputs
 
 # CARS imports
-from cars.data_structures import cars_dataset
+from cars.data_structures import cars_dataset, tiles_container
 
 # CARS Tests import
 from tests.helpers import (
@@ -179,7 +179,10 @@ def test_save_tif_and_constructor():
 
 
 @pytest.mark.unit_tests
-def test_save_to_disk_and_load():
+@pytest.mark.parametrize(
+    "use_container,compression", [(False, None), (True, None), (True, "zlib")]
+)
+def test_save_to_disk_and_load(use_container, compression):
     """
     Test save_to_disk and load from path functions.
     """
@@ -196,7 +199,11 @@ def test_save_to_disk_and_load():
         # save tiled object
 
         left_image_folder = os.path.join(directory, "left_image_object")
-        sensor_image.save_cars_dataset(left_image_folder)
+        sensor_image.save_cars_dataset(
+            left_image_folder,
+            use_container=use_container,
+            compression=compression,
+        )
 
         # Create new object and load previous object
 
@@ -224,3 +231,44 @@ def test_save_to_disk_and_load():
             sensor_image.tiles[0][0],
             new_sensor_image_object.tiles[0][0],
         )
+
+
+@pytest.mark.unit_tests
+def test_save_to_loaded_container():
+    """
+    Test saving a CarsDataset to the container it was loaded from,
+    and single tile loading
+    """
+
+    # read input
+    in_file = absolute_data_path("../data/input/phr_paca/left_image.tif")
+
+    # create object
+    sensor_image = create_cars_dataset_from_path(
+        in_file, "im", tile_size=(40, 40), overlap=(0, 0)
+    )
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        folder = os.path.join(directory, "left_image_object")
+        sensor_image.save_cars_dataset(folder)
+
+        # tiles of loaded object are memory mapped in container
+        loaded_image = cars_dataset.CarsDataset("arrays", load_from_disk=folder)
+        first_reader = tiles_container.get_reader(folder)
+        assert tiles_container.get_reader(folder) is first_reader
+        loaded_image.save_cars_dataset(folder)
+        assert tiles_container.get_reader(folder) is not first_reader
+
+        reloaded_image = cars_dataset.CarsDataset(
+            "arrays", load_from_disk=folder
+        )
+        for row in range(sensor_image.shape[0]):
+            for col in range(sensor_image.shape[1]):
+                assert_same_datasets(
+                    sensor_image.tiles[row][col],
+                    reloaded_image.tiles[row][col],
+                )
+                assert_same_datasets(
+                    sensor_image.tiles[row][col],
+                    cars_dataset.load_single_tile_from_disk(folder, row, col),
+                )
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# coding: utf8
+#
+# Copyright (c) 2020 Centre National d'Etudes Spatiales (CNES).
+#
+# This file is part of CARS
+# (see https://github.com/CNES/cars).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Test module for cars/data_structure/cog_writer.py
+"""
+
+# Standard imports
+import os
+import tempfile
+
+# Third party imports
+import numpy as np
+import pytest
+import rasterio as rio
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+
+# CARS imports
+from cars.data_structures import cog_writer
+
+# CARS Tests import
+from tests.helpers import temporary_dir
+
+
+@pytest.mark.unit_tests
+def test_cog_writer():
+    """
+    Write tiles to COG in two different orders, and check that files are
+    identical, valid COG, with decimated overviews
+    """
+    rng = np.random.default_rng(0)
+    height, width, tile_size = 1300, 1100, 256
+    data = rng.normal(size=(2, height, width)).astype(np.float32)
+    data[:, :50, :50] = -32768
+    tiling_grid = np.array(
+        [
+            [
+                [
+                    row,
+                    min(row + tile_size, height),
+                    col,
+                    min(col + tile_size, width),
+                ]
+                for col in range(0, width, tile_size)
+            ]
+            for row in range(0, height, tile_size)
+        ]
+    )
+    assert cog_writer.get_block_size(tiling_grid) == 256
+    profile = {
+        "driver": "GTiff",
+        "width": width,
+        "height": height,
+        "count": 2,
+        "dtype": "float32",
+        "nodata": -32768,
+        "crs": "EPSG:32631",
+        "transform": from_origin(500000, 4800000, 0.5, 0.5),
+    }
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        file_names = []
+        for order in [1, -1]:
+            file_names.append(os.path.join(directory, "{}.tif".format(order)))
+            with cog_writer.CogWriter(
+                file_names[-1], profile, tiling_grid=tiling_grid
+            ) as writer:
+                for row_min, row_max, col_min, col_max in tiling_grid.reshape(
+                    -1, 4
+                )[::order]:
+                    writer.write(
+                        data[:, row_min:row_max, col_min:col_max],
+                        window=Window.from_slices(
+                            (row_min, row_max), (col_min, col_max)
+                        ),
+                    )
+                writer.set_band_description(1, "band1")
+
+        # temporary files are removed
+        assert sorted(os.listdir(directory)) == ["-1.tif", "1.tif"]
+        with open(file_names[0], "rb") as file0, open(
+            file_names[1], "rb"
+        ) as file1:
+            assert file0.read() == file1.read()
+
+        with rio.open(file_names[0]) as cog:
+            assert cog.tags(ns="IMAGE_STRUCTURE")["LAYOUT"] == "COG"
+            assert cog.block_shapes[0] == (512, 512)
+            assert cog.overviews(1) == [2, 4]
+            assert cog.descriptions[0] == "band1"
+            assert cog.nodata == -32768
+            assert cog.transform == profile["transform"]
+            np.testing.assert_array_equal(cog.read(), data)
+
+        with rio.open(file_names[0], overview_level=1) as overview:
+            np.testing.assert_array_equal(
+                overview.read(),
+                data[:, 2::4, 2::4][:, : overview.height, : overview.width],
+            )
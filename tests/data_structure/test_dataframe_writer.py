@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# coding: utf8
+#
+# Copyright (c) 2020 Centre National d'Etudes Spatiales (CNES).
+#
+# This file is part of CARS
+# (see https://github.com/CNES/cars).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Test module for cars/data_structure/dataframe_writer.py
+"""
+
+# Standard imports
+import os
+import tempfile
+
+# Third party imports
+import laspy
+import numpy as np
+import pandas
+import pytest
+
+# CARS imports
+from cars.data_structures import (
+    cars_dataset,
+    dataframe_converter,
+    dataframe_writer,
+)
+
+# CARS Tests import
+from tests.helpers import temporary_dir
+
+
+def create_tiles(nb_tiles=10, nb_points=100, seed=0):
+    """
+    Create points clouds tiles with npy and csv saving attributes
+    """
+    rng = np.random.default_rng(seed)
+    tiles = []
+    for _ in range(nb_tiles):
+        tile = pandas.DataFrame(
+            {
+                "x": rng.uniform(0, 100, nb_points),
+                "y": rng.uniform(0, 100, nb_points),
+                "z": rng.uniform(0, 10, nb_points).astype(np.float32),
+                "data_valid": rng.integers(0, 2, nb_points, dtype=np.uint8),
+            }
+        )
+        cars_dataset.fill_dataframe(
+            tile,
+            attributes={
+                "save_points_cloud_as_csv": True,
+                "save_points_cloud_as_npy": True,
+            },
+        )
+        tiles.append(tile)
+    return tiles
+
+
+@pytest.mark.unit_tests
+def test_save_dataframe_writer():
+    """
+    Save tiles to the same files, with a writer kept open
+    and without writer, and compare with merged tiles
+    """
+    tiles = create_tiles()
+    merged_tiles = pandas.concat(tiles, ignore_index=True)
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        file_name = os.path.join(directory, "pc")
+
+        with dataframe_writer.DataframeWriter() as writer:
+            for tile in tiles[:5]:
+                cars_dataset.run_save_points(tile, file_name, writer=writer)
+        # append to existing files
+        for tile in tiles[5:]:
+            cars_dataset.run_save_points(tile, file_name)
+
+        pandas.testing.assert_frame_equal(
+            pandas.read_csv(file_name + ".csv"),
+            merged_tiles.astype({"z": np.float64, "data_valid": np.int64}),
+        )
+        pandas.testing.assert_frame_equal(
+            pandas.DataFrame(np.load(file_name + ".npy")), merged_tiles
+        )
+        assert os.path.exists(file_name + "_attrs.json")
+
+        # overwrite files
+        cars_dataset.save_dataframe(tiles[0], file_name)
+        assert len(pandas.read_csv(file_name + ".csv")) == len(tiles[0])
+        assert len(np.load(file_name + ".npy")) == len(tiles[0])
+
+
+@pytest.mark.unit_tests
+def test_dataframe_writer_open_files():
+    """
+    Append tiles to more files than the open files limit,
+    and to csv with new columns
+    """
+    tiles = create_tiles(nb_tiles=12, nb_points=10)
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        file_names = [os.path.join(directory, str(pos)) for pos in range(3)]
+
+        with dataframe_writer.DataframeWriter(max_open_files=2) as writer:
+            for pos, tile in enumerate(tiles):
+                writer.write_npy(tile, file_names[pos % 3] + ".npy")
+                writer.write_csv(tile, file_names[pos % 3] + ".csv")
+                assert len(writer.open_appenders) <= 2
+            writer.write_csv(
+                tiles[0].assign(new_column=1.0), file_names[0] + ".csv"
+            )
+            with pytest.raises(ValueError):
+                writer.write_npy(
+                    tiles[0].assign(new_column=1.0), file_names[0] + ".npy"
+                )
+
+        for pos, file_name in enumerate(file_names):
+            merged_tiles = pandas.concat(tiles[pos::3], ignore_index=True)
+            pandas.testing.assert_frame_equal(
+                pandas.DataFrame(np.load(file_name + ".npy")), merged_tiles
+            )
+            assert len(pandas.read_csv(file_name + ".csv")) == len(
+                merged_tiles
+            ) + (pos == 0) * len(tiles[0])
+
+        assert np.sum(
+            pandas.read_csv(file_names[0] + ".csv")["new_column"].notna()
+        ) == len(tiles[0])
+
+
+@pytest.mark.unit_tests
+def test_dataframe_writer_laz(monkeypatch):
+    """
+    Append tiles with colors and confidence to a single laz file,
+    chunk by chunk, and compare with tiles saved to their own laz file
+    """
+    monkeypatch.setattr(dataframe_converter, "LAZ_CHUNK_SIZE", 30)
+    rng = np.random.default_rng(0)
+    tiles = create_tiles(nb_tiles=5, nb_points=100)
+    for tile in tiles:
+        tile["clr0"] = rng.uniform(-10, 300, tile.shape[0])
+        tile["confidence_from_ambiguity"] = rng.random(tile.shape[0])
+        tile.attrs["attributes"].update(
+            {
+                "save_points_cloud_as_laz": True,
+                "color_type": "uint8",
+                "epsg": 32631,
+            }
+        )
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        laz_file_name = os.path.join(directory, "pc.laz")
+        with dataframe_writer.DataframeWriter() as writer:
+            for pos, tile in enumerate(tiles):
+                cars_dataset.run_save_points(
+                    tile,
+                    os.path.join(directory, str(pos)),
+                    writer=writer,
+                    laz_file_name=laz_file_name,
+                )
+
+        assert os.path.exists(laz_file_name + ".prj")
+        assert not os.path.exists(os.path.join(directory, "0.laz"))
+        merged_laz = laspy.read(laz_file_name)
+        assert merged_laz.header.point_count == 500
+        assert np.max(merged_laz.red) == 255
+        np.testing.assert_array_equal(
+            merged_laz["confidence_from_ambiguity"],
+            pandas.concat(tiles)["confidence_from_ambiguity"],
+        )
+
+        for pos, tile in enumerate(tiles):
+            cars_dataset.save_dataframe(tile, os.path.join(directory, str(pos)))
+            tile_laz = laspy.read(os.path.join(directory, str(pos) + ".laz"))
+            for dim in ["X", "Y", "Z", "red", "green", "blue"]:
+                np.testing.assert_array_equal(
+                    tile_laz[dim], merged_laz[dim][100 * pos : 100 * (pos + 1)]
+                )
+
+
+@pytest.mark.unit_tests
+def test_dataframe_writer_laz_extra_dims(caplog):
+    """
+    Append tiles with different extra dimensions to a laz file:
+    the header is defined by the first tile, and differences are logged
+    """
+    tiles = create_tiles(nb_tiles=2, nb_points=100)
+    for tile in tiles:
+        tile.attrs["attributes"].update({"color_type": None, "epsg": 32631})
+    tiles[0]["confidence_from_ambiguity"] = 1.0
+    tiles[1]["msk"] = np.uint8(1)
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        laz_file_name = os.path.join(directory, "pc.laz")
+        with dataframe_writer.DataframeWriter() as writer:
+            for tile in tiles:
+                writer.write_laz(tile, laz_file_name)
+
+        assert "['msk'] not saved" in caplog.text
+        assert "['confidence_from_ambiguity'] saved as 0" in caplog.text
+
+        merged_laz = laspy.read(laz_file_name)
+        assert list(merged_laz.point_format.extra_dimension_names) == [
+            "confidence_from_ambiguity"
+        ]
+        np.testing.assert_array_equal(
+            merged_laz["confidence_from_ambiguity"],
+            np.repeat([1.0, 0.0], 100),
+        )
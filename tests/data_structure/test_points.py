@@ -138,7 +138,10 @@ def test_save_pandas_and_constructor():
 
 
 @pytest.mark.unit_tests
-def test_save_to_disk_and_load():
+@pytest.mark.parametrize(
+    "use_container,compression", [(False, None), (True, None), (True, "zlib")]
+)
+def test_save_to_disk_and_load(use_container, compression):
     """
     Test save_to_disk and load from path functions.
     """
@@ -152,7 +155,9 @@ def test_save_to_disk_and_load():
         # save tiled object
 
         left_pc_folder = os.path.join(directory, "left_pc_object")
-        points_object.save_cars_dataset(left_pc_folder)
+        points_object.save_cars_dataset(
+            left_pc_folder, use_container=use_container, compression=compression
+        )
 
         # Create new object and load previous object
 
@@ -175,3 +180,39 @@ def test_save_to_disk_and_load():
                     points_object.tiles[row][col],
                     new_pc_object.tiles[row][col],
                 )
+
+
+@pytest.mark.unit_tests
+def test_save_to_loaded_container():
+    """
+    Test saving a CarsDataset to the container it was loaded from,
+    and single tile loading
+    """
+
+    grid_shape = (4, 3)
+    points_object = create_points_object(grid=grid_shape, nb_elements=500)
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        folder = os.path.join(directory, "left_pc_object")
+        points_object.save_cars_dataset(folder)
+
+        # columns of loaded object are memory mapped in container
+        loaded_object = cars_dataset.CarsDataset(
+            "points", load_from_disk=folder
+        )
+        loaded_object.save_cars_dataset(folder)
+
+        reloaded_object = cars_dataset.CarsDataset(
+            "points", load_from_disk=folder
+        )
+        for col in range(grid_shape[1]):
+            for row in range(grid_shape[0]):
+                assert_same_dataframes(
+                    points_object.tiles[row][col],
+                    reloaded_object.tiles[row][col],
+                )
+                assert_same_dataframes(
+                    points_object.tiles[row][col],
+                    cars_dataset.load_single_tile_from_disk(folder, row, col),
+                )
+        assert cars_dataset.load_single_tile_from_disk(folder, 5, 5) is None
@@ -26,8 +26,12 @@ Test module for cars/orchestrator/cluster/cluster.py
 # Standard imports
 from __future__ import absolute_import
 
+import multiprocessing as mp
+import os
 import tempfile
+import time
 
+import numba
 import numpy as np
 
 # Third party imports
@@ -36,6 +40,7 @@ import xarray as xr
 
 # CARS imports
 from cars.orchestrator.cluster import abstract_cluster
+from cars.orchestrator.cluster.mp_cluster import mp_factorizer
 
 # CARS Tests imports
 from ...helpers import temporary_dir
@@ -62,6 +67,13 @@ def step3_mp(data):
     return data + "_step3"
 
 
+def step_fail_mp(data):
+    """
+    Failing step
+    """
+    raise ValueError("Failing step with {}".format(data))
+
+
 # Configurations
 
 conf_sequential = {"mode": "sequential"}
@@ -161,6 +173,50 @@ def test_tasks_pipeline(conf):
         cluster.cleanup()
 
 
+@pytest.mark.unit_tests
+def test_tasks_pipeline_failure():
+    """
+    Test that a failing task makes its depending tasks fail,
+    without blocking the other tasks
+    """
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        # Create cluster, without factorization: depending task
+        # is not fused into the failing one
+        cluster = abstract_cluster.AbstractCluster(  # pylint: disable=E0110
+            {"mode": "mp", "dump_to_disk": False, "factorize_tasks": False},
+            directory,
+        )
+
+        delayed_fail = cluster.create_task(step_fail_mp, nout=1)("bon")
+        delayed_after_fail = cluster.create_task(step3_mp, nout=1)(delayed_fail)
+        delayed_ok = cluster.create_task(step3_mp, nout=1)("jour")
+
+        futures = cluster.start_tasks([delayed_after_fail, delayed_ok])
+
+        # depending task is set as failed
+        futures[0].wait(timeout=60)
+        assert futures[0].ready()
+        assert not futures[0].successful()
+        assert futures[0].result == "Failed depending task"
+
+        # independent task is still computed
+        assert futures[1].get(timeout=60) == "jour_step3"
+
+        # fused depending task fails with the error of failing task
+        cluster.factorize_tasks = True
+        delayed_fail = cluster.create_task(step_fail_mp, nout=1)("bon")
+        futures = cluster.start_tasks(
+            [cluster.create_task(step3_mp, nout=1)(delayed_fail)]
+        )
+        futures[0].wait(timeout=60)
+        assert not futures[0].successful()
+        assert "Failing step with bon" in futures[0].result
+
+        # Close cluster
+        cluster.cleanup()
+
+
 def step1_array(data):
     """
     Step 1
@@ -208,9 +264,11 @@ def step2_array(dataset1, dataset2):
 
 conf_mp_dump = {"mode": "mp", "dump_to_disk": True}
 
+conf_mp_shared = {"mode": "mp", "shared_memory": True}
+
 
 @pytest.mark.unit_tests
-@pytest.mark.parametrize("conf", [conf_mp_dump])
+@pytest.mark.parametrize("conf", [conf_mp_dump, conf_mp_shared])
 def test_tasks_pipeline_dump_xarray(conf):
     """
     Test full distributed pipeline with task creation and execution
@@ -263,3 +321,364 @@ def test_tasks_pipeline_dump_xarray(conf):
 
         # Close cluster
         cluster.cleanup()
+
+
+def step_sleep_mp(data, duration):
+    """
+    Step sleeping during duration
+    """
+    time.sleep(duration)
+    return data
+
+
+@pytest.mark.unit_tests
+def test_future_iterator_blocking():
+    """
+    Test that mp future iterator waits for futures without using
+    the main process
+    """
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        # Create cluster
+        cluster = abstract_cluster.AbstractCluster(  # pylint: disable=E0110
+            conf_mp, directory
+        )
+
+        futures = cluster.start_tasks(
+            [
+                cluster.create_task(step_sleep_mp, nout=1)("slow", 2),
+                cluster.create_task(step_sleep_mp, nout=1)("fast", 0.5),
+            ]
+        )
+
+        start_time = time.time()
+        start_cpu_time = time.process_time()
+        futures_results = list(cluster.future_iterator(futures))
+
+        assert sorted(futures_results) == ["fast", "slow"]
+        assert (time.process_time() - start_cpu_time) < 0.5 * (
+            time.time() - start_time
+        )
+
+        # Close cluster
+        cluster.cleanup()
+
+
+def step_scattered_mp(array, index):
+    """
+    Step using a scattered array
+    """
+    return [id(array), float(array[index])]
+
+
+@pytest.mark.unit_tests
+def test_scatter():
+    """
+    Test that scattered data is dumped once for a given content,
+    and loaded once by each worker
+    """
+
+    array = np.arange(100000, dtype=np.float64)
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        # Create cluster
+        cluster = abstract_cluster.AbstractCluster(  # pylint: disable=E0110
+            conf_mp, directory
+        )
+
+        scattered_array = cluster.scatter(array)
+        assert cluster.scatter(array.copy()) == scattered_array
+        assert cluster.scatter(array + 1) != scattered_array
+
+        futures = cluster.start_tasks(
+            [
+                cluster.create_task(step_scattered_mp, nout=1)(
+                    scattered_array, index
+                )
+                for index in range(10)
+            ]
+        )
+        futures_results = list(cluster.future_iterator(futures))
+
+        assert sorted(res[1] for res in futures_results) == list(range(10))
+        # one object per worker
+        assert len({res[0] for res in futures_results}) <= (
+            cluster.nb_workers  # pylint: disable=no-member
+        )
+
+        # Close cluster
+        cluster.cleanup()
+        assert not os.path.exists(os.path.dirname(scattered_array))
+
+
+def step_memory_mp(size, duration):
+    """
+    Step allocating size Mb during duration
+    """
+    start = time.time()
+    array = np.ones(size * 125000, dtype=np.float64)
+    time.sleep(duration)
+    return [start, time.time(), float(np.sum(array))]
+
+
+@pytest.mark.unit_tests
+def test_memory_admission():
+    """
+    Test that jobs exceeding the memory budget are launched one at a time,
+    once their peak memory is measured, and that the memory given to tile
+    size estimation is scaled by the measured peak memory
+    """
+
+    conf = {
+        "mode": "mp",
+        "dump_to_disk": False,
+        "nb_workers": 2,
+        "max_ram_per_worker": 100,
+    }
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        # Create cluster
+        cluster = abstract_cluster.AbstractCluster(  # pylint: disable=E0110
+            conf, directory
+        )
+
+        futures = cluster.start_tasks(
+            [
+                cluster.create_task(step_memory_mp, nout=1)(150, 0.2)
+                for _ in range(5)
+            ]
+        )
+        intervals = [res[:2] for res in cluster.future_iterator(futures)]
+
+        # jobs launched after first measure do not overlap other jobs
+        first_end = min(end for _, end in intervals)
+        for start, end in intervals:
+            if start >= first_end:
+                for other_start, other_end in intervals:
+                    assert (other_start, other_end) == (start, end) or (
+                        other_end <= start or end <= other_start
+                    )
+
+        peak_memory = cluster.peak_memory[  # pylint: disable=no-member
+            "step_memory_mp"
+        ]
+        assert peak_memory >= 150
+        max_ram = cluster.get_max_ram_per_worker("step_memory_mp")
+        assert max_ram == pytest.approx(max(100 * 100 / peak_memory, 25))
+        # no new measure: same memory
+        assert cluster.get_max_ram_per_worker("step_memory_mp") == max_ram
+        assert cluster.get_max_ram_per_worker() == 100
+
+        # Close cluster
+        cluster.cleanup()
+
+
+def step_memory_sum_mp(res):
+    """
+    Step using the result of step_memory_mp
+    """
+    return res[2]
+
+
+@pytest.mark.unit_tests
+def test_memory_factorized_tasks():
+    """
+    Test that the peak memory of fused tasks is measured under their
+    combined name, and that tasks whose memory adapts tile size are not
+    fused
+    """
+
+    conf = {"mode": "mp", "dump_to_disk": False, "nb_workers": 2}
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        # Create cluster
+        cluster = abstract_cluster.AbstractCluster(  # pylint: disable=E0110
+            conf, directory
+        )
+
+        def run_chains():
+            """
+            Run chains of a producer and its consumer
+            """
+            futures = cluster.start_tasks(
+                [
+                    cluster.create_task(step_memory_sum_mp, nout=1)(
+                        cluster.create_task(step_memory_mp, nout=1)(10, 0)
+                    )
+                    for _ in range(3)
+                ]
+            )
+            assert list(cluster.future_iterator(futures)) == [1250000.0] * 3
+
+        run_chains()
+        assert set(cluster.peak_memory) == {  # pylint: disable=no-member
+            "step_memory_mp+step_memory_sum_mp"
+        }
+        cluster.peak_memory.clear()  # pylint: disable=no-member
+
+        # memory of step_memory_mp is now used to adapt tile size
+        cluster.get_max_ram_per_worker("step_memory_mp")
+        run_chains()
+        assert set(cluster.peak_memory) == {  # pylint: disable=no-member
+            "step_memory_mp",
+            "step_memory_sum_mp",
+        }
+        assert cluster.get_max_ram_per_worker("step_memory_mp") != (
+            cluster.max_ram_per_worker  # pylint: disable=no-member
+        )
+
+        # Close cluster
+        cluster.cleanup()
+
+
+def step_chain_mp(pids):
+    """
+    Step adding the pid of its worker to the pids of previous steps
+    """
+    time.sleep(0.05)
+    return pids + [os.getpid()]
+
+
+@pytest.mark.unit_tests
+def test_locality_placement():
+    """
+    Test that jobs depending on a single job run on the worker
+    which computed it, and that idle workers steal the jobs of
+    the other workers
+    """
+
+    # tasks are not factorized, so that each task is a job of its own
+    conf = {
+        "mode": "mp",
+        "dump_to_disk": False,
+        "nb_workers": 2,
+        "factorize_tasks": False,
+    }
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        # Create cluster
+        cluster = abstract_cluster.AbstractCluster(  # pylint: disable=E0110
+            conf, directory
+        )
+
+        chains = []
+        for _ in range(6):
+            delayed = cluster.create_task(step_chain_mp, nout=1)([])
+            for _ in range(3):
+                delayed = cluster.create_task(step_chain_mp, nout=1)(delayed)
+            chains.append(delayed)
+
+        futures = cluster.start_tasks(chains)
+        for pids in cluster.future_iterator(futures):
+            assert len(pids) == 4
+            assert len(set(pids)) == 1
+
+        # all jobs depend on the same job: idle workers steal them
+        delayed = cluster.create_task(step_chain_mp, nout=1)([])
+        futures = cluster.start_tasks(
+            [
+                cluster.create_task(step_chain_mp, nout=1)(delayed)
+                for _ in range(6)
+            ]
+        )
+        workers_pids = {pids[1] for pids in cluster.future_iterator(futures)}
+        assert len(workers_pids) == (
+            cluster.nb_workers  # pylint: disable=no-member
+        )
+
+        # Close cluster
+        cluster.cleanup()
+
+
+def create_factorizable_tasks(cluster):
+    """
+    Create chains with a multiple outputs task, a fan in task,
+    and a task with two consumers
+    """
+    chains = []
+    for index in range(3):
+        data1, data2 = cluster.create_task(step1_mp, nout=2)(str(index))
+        data = cluster.create_task(step2_mp, nout=1)(data1, data2)
+        chains.append(cluster.create_task(step3_mp, nout=1)(data))
+
+    fan_in = cluster.create_task(step2_mp, nout=1)(chains[0], chains[1])
+
+    data1, data2 = cluster.create_task(step1_mp, nout=2)("s")
+    return chains + [
+        fan_in,
+        cluster.create_task(step2_mp, nout=1)(data1, data2),
+        cluster.create_task(step3_mp, nout=1)(data1),
+    ]
+
+
+@pytest.mark.unit_tests
+def test_factorize_tasks():
+    """
+    Test that tasks whose outputs are only used by one task are fused
+    into it, and that results are not modified
+    """
+    expected_results = [
+        "{0}_step1a_{0}_step1b_step3".format(index) for index in range(3)
+    ] + [
+        "0_step1a_0_step1b_step3_1_step1a_1_step1b_step3",
+        "s_step1a_s_step1b",
+        "s_step1a_step3",
+    ]
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        # Create cluster
+        cluster = abstract_cluster.AbstractCluster(  # pylint: disable=E0110
+            conf_mp, directory
+        )
+
+        stats = mp_factorizer.factorize_delayed(
+            create_factorizable_tasks(cluster)
+        )
+        assert stats == {"nb_tasks": 13, "nb_fused_tasks": 6}
+
+        for factorize_tasks in [True, False]:
+            cluster.factorize_tasks = factorize_tasks
+            futures = cluster.start_tasks(create_factorizable_tasks(cluster))
+            assert sorted(cluster.future_iterator(futures)) == sorted(
+                expected_results
+            )
+
+        # Close cluster
+        cluster.cleanup()
+
+
+def step_numba_threads_mp(data):
+    """
+    Step returning the number of numba threads of its worker
+    """
+    return [data, numba.get_num_threads()]
+
+
+@pytest.mark.unit_tests
+def test_numba_threads():
+    """
+    Test that cpus are shared between the numba threads of workers
+    """
+
+    conf = {"mode": "mp", "dump_to_disk": False, "nb_workers": 2}
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        # Create cluster
+        cluster = abstract_cluster.AbstractCluster(  # pylint: disable=E0110
+            conf, directory
+        )
+
+        futures = cluster.start_tasks(
+            [
+                cluster.create_task(step_numba_threads_mp, nout=1)(index)
+                for index in range(4)
+            ]
+        )
+        nb_workers = cluster.nb_workers  # pylint: disable=no-member
+        max_threads = numba.config.NUMBA_NUM_THREADS  # pylint: disable=E1101
+        nb_threads = max(1, min(max_threads, mp.cpu_count() // nb_workers))
+        for _, nb_worker_threads in cluster.future_iterator(futures):
+            assert nb_worker_threads == nb_threads
+
+        # Close cluster
+        cluster.cleanup()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# coding: utf8
+#
+# Copyright (c) 2020 Centre National d'Etudes Spatiales (CNES).
+#
+# This file is part of CARS
+# (see https://github.com/CNES/cars).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Test module for cars/orchestrator/cluster/mp_cluster/mp_wrapper.py
+"""
+
+# Standard imports
+import os
+import tempfile
+import time
+
+# Third party imports
+import numpy as np
+import pandas
+import pytest
+import xarray as xr
+
+# CARS imports
+from cars.data_structures import cars_dict
+from cars.orchestrator.cluster.mp_cluster import mp_wrapper
+
+# CARS Tests imports
+from ...helpers import temporary_dir
+
+
+def create_dataset(data):
+    """
+    Create dataset filled with data
+    """
+    return xr.Dataset(
+        data_vars={"im": (("row", "col"), data * np.ones((3, 4)))},
+        coords={
+            "row": [0, 1, 2],
+            "col": [0, 1, 2, 3],
+        },
+        attrs={"attr": "test"},
+    )
+
+
+def step1_array(data):
+    """
+    Step 1
+    """
+    return create_dataset(2 * data), create_dataset(-data)
+
+
+def step2_array(dataset1, dataset2):
+    """
+    Step 2
+    """
+    return create_dataset(dataset1["im"].values + dataset2["im"].values)
+
+
+@pytest.mark.unit_tests
+def test_results_cache():
+    """
+    Test that dumped results are kept in memory only for a local
+    consumer, and dropped once released by scheduler
+    """
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        wrapper = mp_wrapper.WrapperDisk(directory)
+
+        paths = []
+        for keep_results in [False, True]:
+            func, kwargs = wrapper.get_function_and_kwargs(step1_array, {}, 2)
+            kwargs = wrapper.set_worker_cache_kwargs(kwargs, keep_results, [])
+            paths.append(func(101, **kwargs))
+
+        # results without local consumer are not kept
+        assert not any(path in mp_wrapper.results_cache for path in paths[0])
+        assert all(path in mp_wrapper.results_cache for path in paths[1])
+
+        # released results are dropped before the next job
+        func, kwargs = wrapper.get_function_and_kwargs(step2_array, {}, 1)
+        kwargs = wrapper.set_worker_cache_kwargs(kwargs, False, [paths[1]])
+        path = func(*paths[1], **kwargs)
+        assert len(mp_wrapper.results_cache) == 0
+
+        np.testing.assert_array_equal(
+            mp_wrapper.load(path)["im"].values, 101 * np.ones((3, 4))
+        )
+
+        wrapper.cleanup()
+
+
+def step_shared_outputs_mp(data):
+    """
+    Step returning a dataframe, a dict and no third output
+    """
+    dataframe = pandas.DataFrame(
+        {"x": np.arange(1000, dtype=np.float64), "y": np.zeros(1000)}
+    )
+    dataframe.attrs["attributes"] = {"epsg": 4326}
+    dict_data = cars_dict.CarsDict(
+        {"grid": data * np.ones((100, 100)), "name": "grid"},
+        attributes={"attr": "test"},
+    )
+    return dataframe, dict_data, None
+
+
+def step_unsupported_mp(data):
+    """
+    Step returning a result which can not be shared
+    """
+    return [data]
+
+
+def wait_removed(path, timeout=5):
+    """
+    Wait for path removal by the removing pool of wrapper
+
+    :return: True if path was removed before timeout
+    """
+    start = time.time()
+    while os.path.exists(path) and time.time() - start < timeout:
+        time.sleep(0.05)
+    return not os.path.exists(path)
+
+
+@pytest.mark.unit_tests
+def test_shared_memory_wrapper_cleanup():
+    """
+    Test that results in shared memory are removed once cleaned,
+    and that the shared memory directory is removed with wrapper
+    """
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        wrapper = mp_wrapper.WrapperSharedMemory(directory)
+        if os.path.isdir(mp_wrapper.SHARED_MEMORY_DIR):
+            assert os.path.dirname(wrapper.tmp_dir) == (
+                mp_wrapper.SHARED_MEMORY_DIR
+            )
+            assert os.path.basename(wrapper.tmp_dir).startswith("cars_mp_")
+
+        func, kwargs = wrapper.get_function_and_kwargs(step1_array, {}, 2)
+        paths = func(101, **kwargs)
+        assert all(os.path.isdir(path) for path in paths)
+
+        # arrays are shared without copy, and loaded as in memory arrays
+        dataset = wrapper.get_obj(paths[0])
+        np.testing.assert_array_equal(
+            dataset["im"].values, 202 * np.ones((3, 4))
+        )
+        assert dataset.attrs == {"attr": "test"}
+
+        wrapper.cleanup_future_res(paths)
+        assert all(wait_removed(path) for path in paths)
+
+        func, kwargs = wrapper.get_function_and_kwargs(step1_array, {}, 2)
+        paths = func(101, **kwargs)
+        wrapper.cleanup()
+        assert not os.path.exists(wrapper.tmp_dir)
+
+
+@pytest.mark.unit_tests
+def test_shared_memory_wrapper_outputs():
+    """
+    Test dataframe and dict round trips through shared memory,
+    results with None outputs, and unsupported results
+    """
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        wrapper = mp_wrapper.WrapperSharedMemory(directory)
+
+        func, kwargs = wrapper.get_function_and_kwargs(
+            step_shared_outputs_mp, {}, 3
+        )
+        dataframe_path, dict_path, none_path = func(3, **kwargs)
+        assert none_path is None
+        assert wrapper.get_obj(none_path) is None
+
+        # large arrays are saved to their own files
+        assert "array_0.npy" in os.listdir(dataframe_path)
+        assert "array_0.npy" in os.listdir(dict_path)
+
+        dataframe = wrapper.get_obj(dataframe_path)
+        assert isinstance(dataframe, pandas.DataFrame)
+        np.testing.assert_array_equal(dataframe["x"], np.arange(1000))
+        assert dataframe.attrs == {"attributes": {"epsg": 4326}}
+
+        dict_data = wrapper.get_obj(dict_path)
+        assert isinstance(dict_data, cars_dict.CarsDict)
+        np.testing.assert_array_equal(
+            dict_data.data["grid"], 3 * np.ones((100, 100))
+        )
+        assert dict_data.data["name"] == "grid"
+        assert dict_data.attrs == {"attr": "test"}
+
+        # mapped arrays are copied on write: shared result is unchanged
+        dict_data.data["grid"][0, 0] = 0
+        assert wrapper.get_obj(dict_path).data["grid"][0, 0] == 3
+
+        func, kwargs = wrapper.get_function_and_kwargs(
+            step_unsupported_mp, {}, 1
+        )
+        with pytest.raises(TypeError):
+            func(3, **kwargs)
+        assert sorted(os.listdir(wrapper.tmp_dir)) == sorted(
+            map(os.path.basename, [dataframe_path, dict_path])
+        )
+
+        wrapper.cleanup()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# coding: utf8
+#
+# Copyright (c) 2020 Centre National d'Etudes Spatiales (CNES).
+#
+# This file is part of CARS
+# (see https://github.com/CNES/cars).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Test module for cars/orchestrator/orchestrator.py
+"""
+
+# Standard imports
+import logging
+import os
+import tempfile
+import threading
+import time
+
+# Third party imports
+import numpy as np
+import pandas
+import pytest
+
+# CARS imports
+from cars.data_structures import cars_dataset
+from cars.orchestrator import orchestrator
+from cars.orchestrator.orchestrator_constants import (
+    CARS_DATASET_KEY,
+    SAVING_INFO,
+)
+from cars.orchestrator.registry import saver_registry
+
+# CARS Tests imports
+from ..helpers import temporary_dir
+
+
+def compute_tile(value, saving_info=None):
+    """
+    Synthetic task, returning a dict tile with its saving infos
+    """
+    return {"value": value, SAVING_INFO: saving_info}
+
+
+def run_replacing_pipeline(cars_ds_orchestrator, nb_cars_ds, shape):
+    """
+    Create CarsDatasets of synthetic tasks, registered to be replaced
+    by their results, and compute them
+
+    :return: created CarsDatasets
+    """
+    cars_ds_list = []
+    for _ in range(nb_cars_ds):
+        cars_ds = cars_dataset.CarsDataset("dict")
+        cars_ds.tiling_grid = np.zeros((shape[0], shape[1], 4))
+        cars_ds.generate_none_tiles()
+        cars_ds_orchestrator.add_to_replace_lists(cars_ds)
+        cars_ds_list.append(cars_ds)
+
+    saving_infos = cars_ds_orchestrator.get_saving_infos(cars_ds_list)
+    for cars_ds, saving_info in zip(cars_ds_list, saving_infos):  # noqa: B905
+        for row in range(shape[0]):
+            for col in range(shape[1]):
+                cars_ds[row, col] = cars_ds_orchestrator.cluster.create_task(
+                    compute_tile, nout=1
+                )(
+                    (saving_info[CARS_DATASET_KEY], row, col),
+                    saving_info=orchestrator.update_saving_infos(
+                        saving_info, row=row, col=col
+                    ),
+                )
+
+    cars_ds_orchestrator.breakpoint()
+
+    return cars_ds_list
+
+
+@pytest.mark.unit_tests
+def test_compute_futures_replace():
+    """
+    Test that computed tiles replace the tasks in their CarsDatasets
+    """
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        with orchestrator.Orchestrator(
+            orchestrator_conf={"mode": "sequential"}, out_dir=directory
+        ) as cars_orchestrator:
+            cars_ds_list = run_replacing_pipeline(cars_orchestrator, 3, (2, 3))
+
+            registry = cars_orchestrator.id_generator.unseen_registry
+            for cars_ds in cars_ds_list:
+                in_registry, obj_id = registry.cars_dataset_in_registry(cars_ds)
+                assert in_registry
+                for row in range(2):
+                    for col in range(3):
+                        assert cars_ds[row, col]["value"] == (obj_id, row, col)
+
+            # registering again a CarsDataset keeps its id
+            assert cars_orchestrator.get_saving_infos(
+                cars_ds_list[:1]
+            ) == cars_orchestrator.get_saving_infos(cars_ds_list[:1])
+
+
+def compute_points_tile(value, saving_info=None):
+    """
+    Synthetic task, returning a points tile with its saving infos
+    """
+    tile = pandas.DataFrame({"x": [value], "y": [value], "z": [value]})
+    cars_dataset.fill_dataframe(
+        tile,
+        saving_info=saving_info,
+        attributes={"save_points_cloud_as_csv": True},
+    )
+    return tile
+
+
+@pytest.mark.unit_tests
+def test_compute_futures_save():
+    """
+    Test that computed tiles are saved by writing threads,
+    with the tiles of a CarsDataset saved by a single thread
+    """
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        with orchestrator.Orchestrator(
+            orchestrator_conf={"mode": "sequential"}, out_dir=directory
+        ) as cars_orchestrator:
+            cars_ds_list = []
+            for pos in range(6):
+                cars_ds = cars_dataset.CarsDataset("points")
+                cars_ds.tiling_grid = np.zeros((2, 3, 4))
+                cars_ds.generate_none_tiles()
+                cars_orchestrator.add_to_save_lists(
+                    os.path.join(directory, "pc{}".format(pos)), None, cars_ds
+                )
+                cars_ds_list.append(cars_ds)
+
+            saving_infos = cars_orchestrator.get_saving_infos(cars_ds_list)
+            for cars_ds, saving_info in zip(  # noqa: B905
+                cars_ds_list, saving_infos
+            ):
+                for row in range(2):
+                    for col in range(3):
+                        cars_ds[
+                            row, col
+                        ] = cars_orchestrator.cluster.create_task(
+                            compute_points_tile, nout=1
+                        )(
+                            3 * row + col,
+                            saving_info=orchestrator.update_saving_infos(
+                                saving_info, row=row, col=col
+                            ),
+                        )
+
+            cars_orchestrator.breakpoint()
+
+            for pos in range(6):
+                points = pandas.concat(
+                    [
+                        pandas.read_csv(
+                            os.path.join(
+                                directory,
+                                "pc{}".format(pos),
+                                "{}.csv".format(tile),
+                            )
+                        )
+                        for tile in range(6)
+                    ]
+                )
+                assert sorted(points["x"]) == list(range(6))
+
+
+@pytest.mark.unit_tests
+def test_writing_thread_pool():
+    """
+    Test that tasks of a CarsDataset are run by a single thread,
+    in submission order, and that callbacks are called
+    """
+    written = {obj_id: [] for obj_id in range(5)}
+    threads = {obj_id: set() for obj_id in range(5)}
+    callbacks = []
+
+    def write(obj_id, value):
+        written[obj_id].append(value)
+        threads[obj_id].add(threading.get_ident())
+
+    with saver_registry.WritingThreadPool(nb_threads=3, queue_size=2) as pool:
+        for value in range(20):
+            for obj_id in range(5):
+                pool.submit(
+                    obj_id,
+                    lambda value, obj_id=obj_id: write(obj_id, value),
+                    value,
+                    callback=lambda: callbacks.append(1),
+                )
+
+    assert all(values == list(range(20)) for values in written.values())
+    assert all(len(thread_ids) == 1 for thread_ids in threads.values())
+    assert len(callbacks) == 100
+
+
+@pytest.mark.benchmark_tests
+def test_compute_futures_benchmark():
+    """
+    Benchmark orchestrator overhead in compute_futures
+    with 100k synthetic futures, from 100 CarsDatasets
+    """
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        with orchestrator.Orchestrator(
+            orchestrator_conf={"mode": "sequential"}, out_dir=directory
+        ) as cars_orchestrator:
+            start = time.perf_counter()
+            cars_ds_list = run_replacing_pipeline(
+                cars_orchestrator, 100, (25, 40)
+            )
+            logging.info(
+                "compute_futures of 100k futures: {:.2f}s".format(
+                    time.perf_counter() - start
+                )
+            )
+
+            assert all(cars_ds[24, 39] is not None for cars_ds in cars_ds_list)
@@ -305,11 +305,7 @@ def test_end2end_ventoux_unique():
                 == gt_used_conf_orchestrator["orchestrator"]
             )
             assert (
-                os.path.exists(
-                    os.path.join(
-                        out_dir, "points_cloud", "675240.0_4897185.0.laz"
-                    )
-                )
+                os.path.exists(os.path.join(out_dir, "points_cloud.laz"))
             ) is True
 
             for k in range(0, 8):
@@ -334,26 +330,16 @@ def test_end2end_ventoux_unique():
                         )
                     )
                 ) is True
-                assert (
-                    os.path.exists(
-                        os.path.join(
-                            out_dir,
-                            "left_right",
-                            "epi_pc",
-                            nb_str + ".laz",
-                        )
-                    )
-                ) is True
-                assert (
-                    os.path.exists(
-                        os.path.join(
-                            out_dir,
-                            "left_right",
-                            "epi_pc",
-                            nb_str + ".laz.prj",
-                        )
-                    )
-                ) is True
+            assert (
+                os.path.exists(
+                    os.path.join(out_dir, "left_right", "epi_pc.laz")
+                )
+            ) is True
+            assert (
+                os.path.exists(
+                    os.path.join(out_dir, "left_right", "epi_pc.laz.prj")
+                )
+            ) is True
 
             # check used_conf reentry
             _ = sensor_to_sparse_dsm.SensorSparseDsmPipeline(used_conf)
@@ -1510,11 +1496,7 @@ def test_end2end_ventoux_with_color():
             )
 
             assert (
-                os.path.exists(
-                    os.path.join(
-                        out_dir, "points_cloud", "675240.0_4897185.0.laz"
-                    )
-                )
+                os.path.exists(os.path.join(out_dir, "points_cloud.laz"))
                 and os.path.exists(
                     os.path.join(
                         out_dir, "points_cloud", "675375.0_4897185.0.csv"
@@ -1522,11 +1504,7 @@ def test_end2end_ventoux_with_color():
                 )
             ) is True
             assert (
-                os.path.exists(
-                    os.path.join(
-                        out_dir, "points_cloud", "675375.0_4897185.0.laz"
-                    )
-                )
+                os.path.exists(os.path.join(out_dir, "points_cloud.laz"))
                 and os.path.exists(
                     os.path.join(
                         out_dir, "points_cloud", "675240.0_4897185.0.csv"
@@ -1594,12 +1572,7 @@ def test_end2end_ventoux_with_color():
             )
             is True
         )
-        assert (
-            os.path.exists(
-                os.path.join(out_dir, "points_cloud", "675431.5_4897173.0.laz")
-            )
-            is True
-        )
+        assert os.path.exists(os.path.join(out_dir, "points_cloud.laz")) is True
         assert (
             os.path.exists(
                 os.path.join(out_dir, "points_cloud", "675431.5_4897173.0.csv")
@@ -1609,9 +1582,7 @@ def test_end2end_ventoux_with_color():
         assert (
             os.path.exists(
                 os.path.join(
-                    out_dir,
-                    "points_cloud_post_small_components_removing",
-                    "675248.0_4897173.0.laz",
+                    out_dir, "points_cloud_post_small_components_removing.laz"
                 )
             )
             is True
@@ -1629,9 +1600,7 @@ def test_end2end_ventoux_with_color():
         assert (
             os.path.exists(
                 os.path.join(
-                    out_dir,
-                    "points_cloud_post_statistical_removing",
-                    "675248.0_4897173.0.laz",
+                    out_dir, "points_cloud_post_statistical_removing.laz"
                 )
             )
             is True
@@ -1755,11 +1724,7 @@ def test_end2end_ventoux_with_classif():
             )
 
             assert (
-                os.path.exists(
-                    os.path.join(
-                        out_dir, "points_cloud", "675240.0_4897185.0.laz"
-                    )
-                )
+                os.path.exists(os.path.join(out_dir, "points_cloud.laz"))
                 and os.path.exists(
                     os.path.join(
                         out_dir, "points_cloud", "675375.0_4897185.0.csv"
@@ -1767,11 +1732,7 @@ def test_end2end_ventoux_with_classif():
                 )
             ) is True
             assert (
-                os.path.exists(
-                    os.path.join(
-                        out_dir, "points_cloud", "675375.0_4897185.0.laz"
-                    )
-                )
+                os.path.exists(os.path.join(out_dir, "points_cloud.laz"))
                 and os.path.exists(
                     os.path.join(
                         out_dir, "points_cloud", "675240.0_4897185.0.csv"
@@ -1833,12 +1794,7 @@ def test_end2end_ventoux_with_classif():
 
         out_dir = input_config_sparse_res["output"]["out_dir"]
 
-        assert (
-            os.path.exists(
-                os.path.join(out_dir, "points_cloud", "675431.5_4897173.0.laz")
-            )
-            is True
-        )
+        assert os.path.exists(os.path.join(out_dir, "points_cloud.laz")) is True
         assert (
             os.path.exists(
                 os.path.join(out_dir, "points_cloud", "675431.5_4897173.0.csv")
@@ -1848,9 +1804,7 @@ def test_end2end_ventoux_with_classif():
         assert (
             os.path.exists(
                 os.path.join(
-                    out_dir,
-                    "points_cloud_post_small_components_removing",
-                    "675248.0_4897173.0.laz",
+                    out_dir, "points_cloud_post_small_components_removing.laz"
                 )
             )
             is True
@@ -1868,9 +1822,7 @@ def test_end2end_ventoux_with_classif():
         assert (
             os.path.exists(
                 os.path.join(
-                    out_dir,
-                    "points_cloud_post_statistical_removing",
-                    "675248.0_4897173.0.laz",
+                    out_dir, "points_cloud_post_statistical_removing.laz"
                 )
             )
             is True